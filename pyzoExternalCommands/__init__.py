@@ -9,7 +9,14 @@ from json import load, loads, dump
 
 import pyzo
 from pyzo.util.qt import QtCore, QtGui, QtWidgets
-from pyzo import translate
+from pyzo import tools, translate
+
+try:
+    from ..pyzoShared.theme import currentStyle
+except ImportError:
+    # The plugins are in the user tools folder, see pyzoShared
+    tools.__path__.append(os.path.dirname(os.path.dirname(__file__)))
+    from ..pyzoShared.theme import currentStyle
 
 tool_name = translate("ExternalCommands", "External Commands")
 tool_summary = (
@@ -124,11 +131,8 @@ class PyzoExternalCommands(QtWidgets.QWidget):
         self._tree.sortItems(1, QtCore.Qt.AscendingOrder)
         self._tree.setRootIsDecorated(False)
         # set widget stye
-        background = self.getThemeItem(item="editor.text")
-        textcolor = self.getThemeItem(item="syntax.identifier")
-        styleKeys = ["background-color", "color"]
-        styleValues = [background["back"], textcolor["fore"]]
-        self.setWidgetStyleSheet(self._tree, styleKeys, styleValues)
+        style = currentStyle()
+        style.applyTo(self._tree)
 
         # self.setWidgetStyleSheet(self._tree)
         # event
@@ -139,7 +143,7 @@ class PyzoExternalCommands(QtWidgets.QWidget):
         initText = ""
         self._output.setText(initText)
         # style
-        self.setWidgetStyleSheet(self._output, styleKeys, styleValues)
+        style.applyTo(self._output)
 
         # Empty label
         self._empty = QtWidgets.QLabel(self)
@@ -168,41 +172,6 @@ class PyzoExternalCommands(QtWidgets.QWidget):
 
         self.fillTree(self.commands_all)
 
-    # Style
-    def getThemeItem(self, item="editor.text"):
-        theme = pyzo.themes[pyzo.config.settings.theme.lower()]["data"]
-        for k, v in theme.items():
-            key = k
-            val_dict = {}
-            if key == item:
-                for x in v.split(","):
-                    item = x.split(":")
-                    item_key = item[0].strip()
-                    item_value = item[1].strip()
-                    val_dict[item_key] = item_value
-                break
-        return val_dict
-
-    def setWidgetStyleSheet(self, widget, keys, values):
-        wdg = str(type(widget))
-        wdg = wdg.replace("<class 'PyQt5.QtWidgets.", "").replace("'>", "")
-        t = ""
-        for n in range(len(keys)):
-            t = t + keys[n] + ":" + values[n] + ";"
-        ss = wdg + "{" + t + "}"
-        widget.setStyleSheet(ss)
-        widget.setAutoFillBackground(True)
-
-    def setWidgetTextStyle(self, widget):
-        theme = pyzo.themes[pyzo.config.settings.theme.lower()]["data"]
-        background = self.getThemeItem(item="editor.text")["back"]
-        textcolor = self.getThemeItem(item="editor.text")["fore"]
-        wdg = str(type(widget))
-        wdg = wdg.replace("<class 'PyQt5.QtWidgets.", "").replace("'>", "")
-        ss = wdg + "{background-color:%s; color:%s;}" % (background, textcolor)
-        widget.setStyleSheet(ss)
-        widget.setAutoFillBackground(True)
-
     # ---------
 
     def terminateCommand(self):
@@ -1,11 +1,43 @@
 """ Static code analysis tool - pylint"""
 
+import functools
+import json
 import os
+import shutil
 import sys
+import time
 
 import pyzo
 from pyzo.util.qt import QtCore, QtGui, QtWidgets
-from pyzo import translate
+from pyzo import tools, translate
+
+try:
+    from ..pyzoShared.theme import currentStyle
+except ImportError:
+    # The plugins are in the user tools folder, see pyzoShared
+    tools.__path__.append(os.path.dirname(os.path.dirname(__file__)))
+    from ..pyzoShared.theme import currentStyle
+
+from ..pyzoShared.discovery import git_root, project_root
+from .annotations import Annotations
+from .client import PylintWorker, find_python
+from .worker import REPORTER_DIR
+from .cache import (
+    LintCache,
+    TabCache,
+    count_statements,
+    python_files,
+    rating,
+)
+from .discovery import ProjectFiles
+from .engines import category, fast_engine
+from .gitdiff import changed_lines
+from .history import History
+from .jobs import Job, JobQueue
+from .jsonstream import JsonStream, record_message
+from .lookup import CacheLookup
+from .lintprofile import PROFILE_KEY, PROFILE_SCRIPT, RunProfile
+from .model import CATEGORIES, IssueFilter, IssueModel
 
 tool_name = translate("pyzoLinter", "Pyzo pylint")
 TOOL_SUMMARY = "Shows the structure of your source code."
@@ -16,6 +48,84 @@ REFACTOR = "Refactor"
 WARNING = "Warning"
 ERROR = "Error"
 
+PYLINT_EXE = "pylint"
+# Each message is written as a JSON line as soon as it is found
+PYLINT_ARGS = ["-rn", "--output-format=pyzo_json_lines.JsonLinesReporter"]
+
+# Files per batch of the background lint of the open files
+BACKGROUND_BATCH = 10
+
+
+def split_shards(files, count):
+    """ split_shards(files, count)
+    Split files in count shards of about the same total size,
+    the biggest files are distributed first
+    """
+    def size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    shards = [[] for _ in range(max(1, min(count, len(files))))]
+    loads = [0] * len(shards)
+    for path in sorted(files, key=size, reverse=True):
+        i = loads.index(min(loads))
+        shards[i].append(path)
+        loads[i] += size(path) or 1
+    return [shard for shard in shards if shard]
+
+
+def empty_stats():
+    """returns the statistics of a run without messages"""
+    return {"statements": 0, "C": 0, "R": 0, "W": 0, "E": 0}
+
+
+def exit_failure(process, messages):
+    """ exit_failure(process, messages)
+    Get why a pylint process that finished did not lint its files,
+    empty when it did. messages are the messages it wrote.
+    """
+    if process.exitStatus() == QtCore.QProcess.CrashExit:
+        return "pylint crashed or was killed"
+    code = process.exitCode()
+    # pylint sets bit 32 for a usage error and bit 1 for a fatal
+    # message, a traceback also exits with 1 but writes no message
+    if code & 32 or code > 63 or (code & 1 and not any(messages.values())):
+        return "pylint failed with exit code {}".format(code)
+    return ""
+
+
+def editor_path(editor):
+    """returns the path of the python file of an editor or None"""
+    filename = getattr(editor, "filename", "")
+    if not filename or not filename.endswith(".py"):
+        return None
+    return os.path.normpath(os.path.abspath(filename))
+
+
+class Shard:
+    """A pylint process linting part of the files"""
+    def __init__(self, files, generation, engine=None):
+        self.files = files
+        # Generation of the job, output of an older job is dropped
+        self.generation = generation
+        # FastEngine of the fast pass, None for pylint
+        self.engine = engine
+        self.process = None
+        # Request id when the shard is linted by the worker
+        self.request = None
+        # Unsaved text of the only file
+        self.source = None
+        self.decoder = None
+        # Decodes the json records of the output read so far
+        self.stream = JsonStream()
+        # Parsed messages, path -> [[line, column, msg_id, msg], ...]
+        self.messages = {path: [] for path in files}
+        # Why the files were not linted, empty when they were
+        self.failed = ""
+
+
 class PyzoLinter(QtWidgets.QWidget):
     """PyzoLinter is a gui implimentation of pylint for pyzo"""
     def __init__(self, parent):
@@ -32,27 +142,105 @@ class PyzoLinter(QtWidgets.QWidget):
                 self._config.fontSize = 12
             else:
                 self._config.fontSize = 10
+        if not hasattr(self._config, "workers"):
+            self._config.workers = os.cpu_count() or 1
+        # "pylint": a pylint process per run, "worker": a long-lived
+        # worker process that keeps parsed modules between runs
+        if not hasattr(self._config, "engine"):
+            self._config.engine = "pylint"
+        # Interpreter of the worker, found from pylint when empty
+        if not hasattr(self._config, "pythonExe"):
+            self._config.pythonExe = ""
+        # Lint the current document automatically: "off", "save", "typing"
+        if not hasattr(self._config, "autoLint"):
+            self._config.autoLint = "off"
+        # Milliseconds without typing before the document is linted
+        if not hasattr(self._config, "lintDelay"):
+            self._config.lintDelay = 1000
+        # Files passed to pylint at once, later batches wait for the
+        # previous one so memory does not grow with the project size
+        if not hasattr(self._config, "batchSize"):
+            self._config.batchSize = 200
+        # Checker showing the errors it finds before pylint is done:
+        # "auto", "ruff", "pyflakes" or "off"
+        if not hasattr(self._config, "fastEngine"):
+            self._config.fastEngine = "auto"
+        # Draw the messages in the editors
+        if not hasattr(self._config, "annotations"):
+            self._config.annotations = True
+        # Time pylint per file and per checker, the profile is shown
+        if not hasattr(self._config, "profile"):
+            self._config.profile = False
+        # Milliseconds between the batches of the "Open files" scope
+        if not hasattr(self._config, "backgroundDelay"):
+            self._config.backgroundDelay = 500
 
-        # Style
-        theme = pyzo.themes[pyzo.config.settings.theme.lower()]["data"]
-        background_style = theme["editor.text"].split(",")
-        background = background_style[1].split(":")[1]
-        textcolor_style = theme["syntax.identifier"].split(",")
-        textcolor = textcolor_style[0].split(":")[1]
-
-        # Keep track of linter output
-        self.output = ""
+        # Linter output is written to this file while it arrives
+        self.output_file = None
 
         # Folder for linter output file
         self.output_folder = os.path.join(
             pyzo.appDataDir, "tools", "pyzoLinter"
         )
 
-        self.process = None
+        self.shards = []
+        # Files of the current run still waiting to be linted
+        self.batches = []
+        # The fast pass, its messages are shown until pylint is done
+        self.fast_shard = None
+        self.fast_shown = False
+        # Files of the fast pass still waiting to be checked
+        self.fast_batches = []
+        self.worker = None
         self.locale_codec = pyzo.QtCore.QTextCodec.codecForLocale()
 
         self.cur_dir_path = ""
 
+        # Per-file results of the current run, path -> cache entry
+        self.results = {}
+        # Files passed to pylint in the current run, path -> cache key
+        self.linted = {}
+        # Statements of the files passed to pylint, path -> count
+        self.statements = {}
+        # Unsaved text of the files of the current run, path -> text
+        self.sources = {}
+        self.cache = LintCache(os.path.join(self.output_folder, "cache"))
+        # Makes the cache keys of a run in a thread
+        self.lookup = CacheLookup(self.cache, self)
+        self.lookup.done.connect(self.on_lookup_done)
+        self.lookup.failed.connect(self.on_lookup_failed)
+        self.lookup_started = 0.0
+        self.project_files = ProjectFiles(
+            os.path.join(self.output_folder, "discovery")
+        )
+        self.history = History(
+            os.path.join(self.output_folder, "history.sqlite")
+        )
+        # Runs one lint job at a time
+        self.jobs = JobQueue(self.run_job, self.cancel_run)
+        # The current run lints the open files in the background
+        self.background = False
+        # Results of the open editors, shown again when switching tabs
+        self.tab_cache = TabCache()
+        # Linted files shown by an editor, path -> (editor id, revision)
+        self.revisions = {}
+        # Scope and target (file or directory) of the current run
+        self.scope = ""
+        self.target = ""
+        # The current run lints unsaved text, it is not kept in the history
+        self.unsaved = False
+        # Why a pylint process of the current run did not lint its
+        # files, such a run is not kept in the history either
+        self.failed = ""
+        # Merged statistics of the current run
+        self.stats = {}
+        # Timings of the current run
+        self.profile = RunProfile()
+        self.lint_started = 0.0
+        # "Changed lines" scope: path -> IntervalIndex of the lines
+        # changed since git HEAD, None shows all messages
+        self.changed = None
+
         # Create button for parsing scope
         self._reload = QtWidgets.QToolButton(self)
         self._reload.setIcon(pyzo.icons.arrow_refresh)
@@ -61,7 +249,13 @@ class PyzoLinter(QtWidgets.QWidget):
         self._reload.clicked.connect(self.start)
 
         # Create combo box Scope
-        scope_list = ["Current document", "Current document directory"]
+        scope_list = [
+            "Current document",
+            "Current document directory",
+            "Changed lines",
+            "Project",
+            "Open files",
+        ]
         self._scope = QtWidgets.QComboBox(self)
         self._scope.setToolTip("Get by index")
         self._scope.addItems(scope_list)
@@ -94,6 +288,31 @@ class PyzoLinter(QtWidgets.QWidget):
         # event
         self._open_file.clicked.connect(self.on_open_output_file)
 
+        # Create button for showing the lint history
+        self._history = QtWidgets.QToolButton(self)
+        self._history.setIcon(pyzo.icons.report)
+        self._history.setIconSize(QtCore.QSize(16, 16))
+        self._history.setStyleSheet(
+            "QToolButton { border: none; padding: 0px; }"
+        )
+        self._history.setToolTip("Show lint history")
+        # event
+        self._history.clicked.connect(self.on_show_history)
+
+        # Create button for showing the lint profile
+        self._profile = QtWidgets.QToolButton(self)
+        self._profile.setIcon(pyzo.icons.sum)
+        self._profile.setIconSize(QtCore.QSize(16, 16))
+        self._profile.setCheckable(True)
+        self._profile.setChecked(self._config.profile)
+        self._profile.setToolTip("Profile the lint runs")
+        # event
+        self._profile.toggled.connect(self.on_profile_toggled)
+
+        # Timings of the last run
+        self._profile_view = ProfileView(self)
+        self._profile_view.setVisible(self._config.profile)
+
         # Ratings label
         self._ratings = QtWidgets.QLabel(self)
         self._ratings.setText("")
@@ -144,26 +363,23 @@ class PyzoLinter(QtWidgets.QWidget):
             lambda: self.on_radio_change_state(self._error)
         )
 
-        # Create tree widget
-        self._tree = QtWidgets.QTreeWidget(self)
-        self._tree.setColumnCount(5)
-        self._tree.setHeaderLabels(
-            ["Description", "File", "Code", "Line", "Column"]
-        )
+        # Create issue model and the filter on top of it
+        self._model = IssueModel(self)
+        self._proxy = IssueFilter(self)
+        self._proxy.setSourceModel(self._model)
+
+        # Create tree view
+        self._tree = QtWidgets.QTreeView(self)
+        self._tree.setModel(self._proxy)
+        self._tree.setUniformRowHeights(True)
         self._tree.setColumnWidth(0, 400)
         self._tree.setColumnWidth(1, 80)
         self._tree.setHeaderHidden(False)
         self._tree.setSortingEnabled(True)
-        self._tree.sortItems(1, QtCore.Qt.AscendingOrder)
-        self._tree.sortItems(2, QtCore.Qt.AscendingOrder)
+        self._tree.sortByColumn(2, QtCore.Qt.AscendingOrder)
         self._tree.setRootIsDecorated(False)
         # style
-        # set widget stye
-        background = self.get_theme_item(item="editor.text")
-        textcolor = self.get_theme_item(item="syntax.identifier")
-        style_keys = ["background-color", "color"]
-        style_values = [background["back"], textcolor["fore"]]
-        self.set_widget_style_sheet(self._tree, style_keys, style_values)
+        currentStyle().applyTo(self._tree)
         # event
         self._tree.clicked.connect(self.on_item_clicked)
 
@@ -178,6 +394,7 @@ class PyzoLinter(QtWidgets.QWidget):
         # Set layout
         self._sizer1.addLayout(self._sizer2, 0)
         self._sizer1.addLayout(self._sizer4, 0)
+        self._sizer1.addWidget(self._profile_view, 0)
         self._sizer1.addWidget(self._tree, 1)
         #
         self._sizer2.addWidget(self._reload, 0)
@@ -191,112 +408,57 @@ class PyzoLinter(QtWidgets.QWidget):
         self._sizer4.addWidget(self._warning, 0)
         self._sizer4.addWidget(self._error, 0)
         self._sizer4.addWidget(self._open_file, 0)
+        self._sizer4.addWidget(self._history, 0)
+        self._sizer4.addWidget(self._profile, 0)
         #
         self.setLayout(self._sizer1)
 
-    # Style
-    def get_theme_item(self, item="editor.text"):
-        """gets theme items"""
-        theme = pyzo.themes[pyzo.config.settings.theme.lower()]["data"]
-        for key, value in theme.items():
-            val_dict = {}
-            if key == item:
-                for thing in value.split(","):
-                    item = thing.split(":")
-                    item_key = item[0].strip()
-                    item_value = item[1].strip()
-                    val_dict[item_key] = item_value
-                break
-        return val_dict
-
-    def set_widget_style_sheet(self, widget, keys, values):
-        """sets widget styles"""
-        wdg = str(type(widget))
-        wdg = wdg.replace("<class 'PyQt5.QtWidgets.", "").replace("'>", "")
-        text = ""
-        for num in range(len(keys)):
-            text = text + keys[num] + ":" + values[num] + ";"
-        style_sheet = wdg + "{" + text + "}"
-        widget.setStyleSheet(style_sheet)
-        widget.setAutoFillBackground(True)
-
-    def set_widget_text_style(self, widget):
-        """sets widget test style"""
-        #theme = pyzo.themes[pyzo.config.settings.theme.lower()]["data"]
-        background = self.getThemeItem(item="editor.text")["back"]
-        textcolor = self.getThemeItem(item="editor.text")["fore"]
-        wdg = str(type(widget))
-        wdg = wdg.replace("<class 'PyQt5.QtWidgets.", "").replace("'>", "")
-        style_sheet = wdg + "{background-color:%s; color:%s;}" % (background, textcolor)
-        widget.setStyleSheet(style_sheet)
-        widget.setAutoFillBackground(True)
+        # Debounce automatic linting
+        self._lint_timer = QtCore.QTimer(self)
+        self._lint_timer.setSingleShot(True)
+        self._lint_timer.timeout.connect(self.lint_buffer)
+
+        # Follow the current editor for automatic linting
+        self._watched_editor = None
+        self._revision = -1
+        pyzo.editors.currentChanged.connect(self.on_editor_changed)
+        self.on_editor_changed()
 
     # ---------
 
     def on_radio_change_state(self, radiobox):
         """ Filter the tree
         """
-        root = self._tree.invisibleRootItem()
-        child_count = root.childCount()
-        for i in range(child_count):
-            item = root.child(i)
-            # code number column
-            code = item.text(2)
-
-            # All
-            if (
-                    radiobox.text().startswith("All")
-                    and radiobox.isChecked() is True
-            ):
-                if code[0] in ['C', 'R', 'W', 'E']:
-                    self._tree.setRowHidden(i, QtCore.QModelIndex(), False)
-                else:
-                    self._tree.setRowHidden(i, QtCore.QModelIndex(), True)
-
-            # Convention
-            if (
-                    radiobox.text().startswith("Convention")
-                    and radiobox.isChecked() is True
-            ):
-                if code[0] == "C":
-                    self._tree.setRowHidden(i, QtCore.QModelIndex(), False)
-                else:
-                    self._tree.setRowHidden(i, QtCore.QModelIndex(), True)
-
-            # Refactor
-            if (
-                    radiobox.text().startswith("Refactor")
-                    and radiobox.isChecked() is True
-            ):
-                if code[0] == "R":
-                    self._tree.setRowHidden(i, QtCore.QModelIndex(), False)
-                else:
-                    self._tree.setRowHidden(i, QtCore.QModelIndex(), True)
-
-            # Warning
-            if (
-                    radiobox.text().startswith("Warning")
-                    and radiobox.isChecked() is True
-            ):
-                if code[0] == "W":
-                    self._tree.setRowHidden(i, QtCore.QModelIndex(), False)
-                else:
-                    self._tree.setRowHidden(i, QtCore.QModelIndex(), True)
-
-            # Error
-            if (
-                    radiobox.text().startswith("Error")
-                    and radiobox.isChecked() is True
-            ):
-                if code[0] == "E":
-                    self._tree.setRowHidden(i, QtCore.QModelIndex(), False)
-                else:
-                    self._tree.setRowHidden(i, QtCore.QModelIndex(), True)
+        if radiobox.isChecked() is not True:
+            return
+        for name, categories in CATEGORIES.items():
+            if radiobox.text().startswith(name):
+                self._proxy.set_categories(categories)
+                break
+
+    def cancel_run(self, job=None):
+        """ cancel_run(job=None)
+        Stop the processes and worker requests of the running job
+        """
+        for shard in self.shards:
+            if shard.process is None:
+                self.worker.cancel(shard.request)
+                continue
+            shard.process.finished.disconnect()
+            shard.process.kill()
+            shard.process.deleteLater()
+        self.stop_fast_pass()
+        if self.output_file is not None:
+            self.output_file.close()
+            self.output_file = None
+        self.shards = []
+        self.batches = []
 
     def reset(self):
         """ reset()
         Reset widgets
         """
+        self.cancel_run()
         self._ratings.setText("Pylint running...")
         self._all.setChecked(True)
         self._all.setText(ALL)
@@ -304,108 +466,571 @@ class PyzoLinter(QtWidgets.QWidget):
         self._refactor.setText(REFACTOR)
         self._warning.setText(WARNING)
         self._error.setText(ERROR)
-        self._tree.clear()
-        self.output = ""
+        self._model.clear()
         self.cur_dir_path = ""
+        self.results = {}
+        self.linted = {}
+        self.statements = {}
+        self.sources = {}
+        self.fast_shown = False
+        self.stats = empty_stats()
+        self.unsaved = False
+        self.failed = ""
+        self.changed = None
+        self.background = False
+        self.revisions = {}
+        self.profile = RunProfile()
 
     def start(self):
         """ start()
-        Start code inspection
+        Start code inspection of the selected scope
         """
-        self.reset()
-        self.process = pyzo.QtCore.QProcess(self)
-        self.process.finished.connect(self.show_output)
-        self.process.setProcessChannelMode(
-            pyzo.QtCore.QProcess.SeparateChannels
-        )
-        self.process.readyReadStandardOutput.connect(self.read_output)
-        self.process.readyReadStandardError.connect(
-            lambda: self.read_output(error=True)
-        )
+        editor = pyzo.editors.getCurrentEditor()
+        if editor is None or not editor.filename:
+            self._ratings.setText("")
+            return
+        path = os.path.abspath(editor.filename)
+        self.jobs.submit(Job(self._scope.currentText(), path))
 
+    def lint_buffer(self):
+        """ lint_buffer()
+        Lint the current document as it is in the editor, unsaved
+        text is passed to pylint through stdin
+        """
+        self._lint_timer.stop()
         editor = pyzo.editors.getCurrentEditor()
-        scope = self._scope.currentText()
-        self.cur_dir_path = os.path.dirname(os.path.abspath(editor.filename))
+        if editor is None or not editor.filename:
+            return
+        path = os.path.abspath(editor.filename)
+        source = None
+        if editor.document().isModified():
+            source = editor.toPlainText()
+        self.jobs.submit(Job("Current document", path, source))
+
+    def run_job(self, job):
+        """ run_job(job)
+        Find the files of the scope of a job and lint them
+        """
+        self.reset()
+        scope = job.scope
+        self.cur_dir_path = os.path.dirname(job.path)
+        sources = {}
+        if job.source is not None:
+            sources[job.path] = job.source
 
         if scope == "Current document":
-            pylint_exe = "pylint"
-            params = [
-                "-rn",
-                "--msg-template",
-                "{path}:{line}:{column}: {msg_id}: {msg} ({symbol})",
-                editor.filename,
-            ]
+            files = [job.path]
+            self.target = job.path
         elif scope == "Current document directory":
+            # Folders are walked in the lookup thread
+            files = functools.partial(python_files, self.cur_dir_path)
+            self.target = self.cur_dir_path
+        elif scope == "Changed lines":
+            root = git_root(self.cur_dir_path)
+            changed = changed_lines(root) if root else None
+            if changed is None:
+                self._ratings.setText("Not a git repository")
+                self.jobs.finished(job)
+                return
+            # Only the changed files are linted
+            files = sorted(changed)
+            self.cur_dir_path = root
+            self.target = root
+            self.changed = changed
+        elif scope == "Project":
+            root = project_root(self.cur_dir_path)
+            files = functools.partial(self.project_files.files, root)
+            self.cur_dir_path = root
+            self.target = root
+        elif scope == "Open files":
+            files = []
+            for editor in pyzo.editors:
+                path = editor_path(editor)
+                if path is None or path in files:
+                    continue
+                files.append(path)
+                if editor.document().isModified():
+                    sources[path] = editor.toPlainText()
+            if files:
+                folders = [os.path.dirname(path) for path in files]
+                self.cur_dir_path = os.path.commonpath(folders)
+            self.target = self.cur_dir_path
+            self.background = True
+
+        # Editors showing the text that is linted, their results are
+        # kept in the tab cache
+        for editor in pyzo.editors:
+            path = editor_path(editor)
+            if path is not None and (
+                    path in sources or not editor.document().isModified()
+            ):
+                revision = editor.document().revision()
+                self.revisions[path] = (id(editor), revision)
+
+        self.scope = scope
+        self.unsaved = bool(sources)
+        self.lint_files(files, sources)
+
+    def lint_files(self, files, sources=None):
+        """ lint_files(files, sources=None)
+        Lint files, only files without a valid cache entry are passed
+        to pylint. files is a list or a function returning it. The files
+        are found and looked up in the cache in a thread, the run goes
+        on in on_lookup_done. sources is path -> unsaved text of a file.
+        """
+        self.sources = sources or {}
+        self.lookup_started = time.perf_counter()
+        self.lookup.start(
+            self.jobs.generation,
+            files,
+            self.sources,
+            self.cur_dir_path,
+            PYLINT_EXE,
+        )
+
+    def on_lookup_failed(self, generation, error):
+        """ on_lookup_failed(generation, error)
+        The files of the run could not be found or read, nothing is
+        linted
+        """
+        if not self.jobs.is_current(generation):
+            return
+        self.failed = "Could not look up the files: {}".format(error)
+        self.write_output(self.failed + "\n")
+        self.show_output()
 
-            pylint_exe = "pylint"
-            params = [
-                "-rn",
-                "--msg-template",
-                "{path}:{line}:{column}: {msg_id}: {msg} ({symbol})",
-                self.cur_dir_path,
+    def on_lookup_done(self, generation, result):
+        """ on_lookup_done(generation, result)
+        Show the cached results of a LookupResult and lint the other
+        files
+        """
+        if not self.jobs.is_current(generation):
+            return  # the job was stopped during the lookup
+        self.profile.add("discovery", result.discovery)
+        self.profile.add(
+            "cache lookup",
+            time.perf_counter() - self.lookup_started - result.discovery,
+        )
+        sources = self.sources
+        cached = result.cached
+        self.linted = result.linted
+        self.statements = result.statements
+
+        files = set(result.files)
+        self.revisions = {
+            path: revision
+            for path, revision in self.revisions.items()
+            if path in files
+        }
+
+        # Cached results are shown right away
+        self._model.clear(self.cur_dir_path)
+        self.add_results(cached)
+
+        if not self.linted:
+            self.show_output()
+            return
+
+        self.output_file = open(
+            os.path.join(self.output_folder, "pylinter_output.txt"), "w"
+        )
+        saved = [path for path in self.linted if path not in sources]
+        unsaved = [path for path in self.linted if path in sources]
+        self.lint_started = time.perf_counter()
+        size = max(1, int(self._config.batchSize))
+        if self.background:
+            size = min(size, BACKGROUND_BATCH)
+        elif saved:
+            # Batches keep the command line short
+            self.fast_batches = [
+                saved[i:i + size] for i in range(0, len(saved), size)
             ]
+            self.start_fast_pass(self.fast_batches.pop(0))
+        else:
+            self.start_fast_pass(unsaved[:1], sources[unsaved[0]])
+        # pylint reads the text of one file from stdin, so every unsaved
+        # file is a batch of its own
+        self.batches = [
+            (saved[i:i + size], None) for i in range(0, len(saved), size)
+        ]
+        self.batches.extend(([path], sources[path]) for path in unsaved)
+        self.start_batch()
 
-        self.process.start(pylint_exe, params)
+    def start_fast_pass(self, files, source=None):
+        """ start_fast_pass(files, source=None)
+        Check the files with the fast engine while pylint runs
+        """
+        python_exe = self._config.pythonExe or find_python(PYLINT_EXE)
+        engine = fast_engine(self._config.fastEngine, python_exe)
+        if engine is None:
+            return
+        environment = pyzo.QtCore.QProcessEnvironment.systemEnvironment()
+        environment.insert("PYTHONIOENCODING", "utf-8")
+        shard = Shard(files, self.jobs.generation, engine)
+        codec = pyzo.QtCore.QTextCodec.codecForName("UTF-8")
+        shard.decoder = codec.makeDecoder()
+        shard.process = pyzo.QtCore.QProcess(self)
+        shard.process.setProcessEnvironment(environment)
+        shard.process.setWorkingDirectory(self.cur_dir_path)
+        shard.process.readyReadStandardOutput.connect(
+            lambda shard=shard: self.read_output(shard)
+        )
+        shard.process.finished.connect(
+            lambda *args, shard=shard: self.on_fast_finished(shard)
+        )
+        shard.process.errorOccurred.connect(
+            lambda error, shard=shard: self.on_fast_error(shard, error)
+        )
+        self.fast_shard = shard
+        program, args = engine.command(files, source)
+        shard.process.start(program, args)
+        if source is not None:
+            shard.process.write(source.encode("utf-8"))
+            shard.process.closeWriteChannel()
 
-    def read_output(self):
-        """reads output of pylint"""
-        qba = pyzo.QtCore.QByteArray()
-        while self.process.bytesAvailable():
-            qba += self.process.readAllStandardOutput()
-        text = self.locale_codec.toUnicode(qba.data())
+    def stop_fast_pass(self):
+        """kills the fast pass if it is still running"""
+        self.fast_batches = []
+        if self.fast_shard is not None:
+            self.fast_shard.process.finished.disconnect()
+            self.fast_shard.process.kill()
+            self.fast_shard.process.deleteLater()
+            self.fast_shard = None
 
-        self.output += text
+    def on_fast_finished(self, shard):
+        """the fast pass is done, its messages stay until pylint is"""
+        if not self.jobs.is_current(shard.generation):
+            return
+        if shard.process.bytesAvailable():
+            self.read_output(shard)
+        shard.process.deleteLater()
+        if shard is not self.fast_shard:
+            return
+        self.fast_shard = None
+        if self.fast_batches:
+            self.start_fast_pass(self.fast_batches.pop(0))
+        else:
+            self.profile.add(
+                "fast pass", time.perf_counter() - self.lint_started
+            )
 
-    def show_output(self):
-        """ show_output()
-        Fill the tree
+    def on_fast_error(self, shard, error):
+        """ on_fast_error(shard, error)
+        The fast engine did not start, pylint goes on alone
         """
+        if error != QtCore.QProcess.FailedToStart:
+            return  # finished follows
+        if not self.jobs.is_current(shard.generation):
+            return
+        self.write_output(
+            "Could not start the fast pass with {}\n".format(shard.engine.exe)
+        )
+        self.fast_batches = []
+        self.on_fast_finished(shard)
 
-        num_c = 0
-        num_r = 0
-        num_w = 0
-        num_e = 0
-        num_a = 0
+    def start_batch(self):
+        """ start_batch()
+        Lint the next batch of files
+        """
+        files, source = self.batches.pop(0)
+        if self._config.engine == "worker":
+            self.start_worker(files, PYLINT_EXE, source)
+        else:
+            self.start_shards(files, PYLINT_EXE, source)
 
-        # write output in the file
-        output_file = os.path.join(self.output_folder, "pylinter_output.txt")
-        with open(output_file, "w") as res:
-            res.write(self.output)
+    def start_shards(self, files, pylint_exe, source=None):
+        """ start_shards(files, pylint_exe, source=None)
+        Lint the files in parallel pylint processes
+        """
+        # pylint should write every message as soon as it is found
+        environment = pyzo.QtCore.QProcessEnvironment.systemEnvironment()
+        environment.insert("PYTHONUNBUFFERED", "1")
+        # The folder of the reporter of PYLINT_ARGS
+        python_path = environment.value("PYTHONPATH")
+        environment.insert(
+            "PYTHONPATH",
+            os.pathsep.join(p for p in [REPORTER_DIR, python_path] if p),
+        )
 
-        for line in self.output.splitlines():
-            line = line.split(":")
-            try:
-                editor = pyzo.editors.getCurrentEditor()
-                path = os.path.join(os.path.curdir, editor.filename)
-                #path = l[-5].strip()
-                line_num = line[-4].strip()
-                col = line[-3].strip()
-                msg_id = line[-2].strip()
-                msg = line[-1].strip()
+        # The background lint keeps to one process
+        workers = 1 if self.background else self._config.workers
+        for shard_files in split_shards(files, workers):
+            shard = Shard(shard_files, self.jobs.generation)
+            shard.decoder = self.locale_codec.makeDecoder()
+            shard.process = pyzo.QtCore.QProcess(self)
+            shard.process.setProcessEnvironment(environment)
+            shard.process.finished.connect(
+                lambda *args, shard=shard: self.on_shard_finished(shard)
+            )
+            shard.process.errorOccurred.connect(
+                lambda error, shard=shard: self.on_shard_error(shard, error)
+            )
+            shard.process.setProcessChannelMode(
+                pyzo.QtCore.QProcess.SeparateChannels
+            )
+            shard.process.setWorkingDirectory(self.cur_dir_path)
+            shard.process.readyReadStandardOutput.connect(
+                lambda shard=shard: self.read_output(shard)
+            )
+            shard.process.readyReadStandardError.connect(
+                lambda shard=shard: self.read_output(shard, error=True)
+            )
+            self.shards.append(shard)
 
-                QtWidgets.QTreeWidgetItem(
-                    self._tree, [msg, path, msg_id, line_num, col]
+            params = list(PYLINT_ARGS)
+            if source is not None:
+                params.append("--from-stdin")
+                shard.source = source
+            params.extend(shard_files)
+            program = pylint_exe
+            if self._config.profile:
+                # The same pylint, run by the profiling script
+                program = self._config.pythonExe or find_python(pylint_exe)
+                params = ["-u", PROFILE_SCRIPT] + params
+            nice = shutil.which("nice")
+            if self.background and nice:
+                # Leave the processor to the editor and the shell
+                params = ["-n", "10", program] + params
+                program = nice
+            shard.process.start(program, params)
+            if source is not None:
+                shard.process.write(source.encode("utf-8"))
+                shard.process.closeWriteChannel()
+
+    def start_worker(self, files, pylint_exe, source=None):
+        """ start_worker(files, pylint_exe, source=None)
+        Lint the files in the long-lived worker process
+        """
+        if self.worker is None:
+            python_exe = self._config.pythonExe or find_python(pylint_exe)
+            self.worker = PylintWorker(python_exe, self)
+            self.worker.output.connect(self.on_worker_output)
+            self.worker.done.connect(self.on_worker_done)
+            self.worker.error.connect(self.write_output)
+
+        shard = Shard(files, self.jobs.generation)
+        shard.source = source
+        shard.request = self.worker.lint(
+            shard.files,
+            self.cur_dir_path,
+            PYLINT_ARGS,
+            source,
+            self._config.profile,
+        )
+        self.shards.append(shard)
+
+    def _worker_shard(self, request_id):
+        for shard in self.shards:
+            if shard.process is None and shard.request == request_id:
+                return shard
+        return None
+
+    def on_worker_output(self, request_id, lines):
+        """ on_worker_output(request_id, lines)
+        Lines written by the worker for a request
+        """
+        shard = self._worker_shard(request_id)
+        if shard is not None:
+            text = "\n".join(lines) + "\n"
+            self.write_output(text)
+            self.parse_output(shard, text)
+
+    def on_worker_done(self, request_id, ok):
+        """ on_worker_done(request_id, ok)
+        The worker finished a request, ok is False when pylint failed
+        or the worker died
+        """
+        shard = self._worker_shard(request_id)
+        if shard is not None:
+            if not ok:
+                shard.failed = "pylint failed in the worker"
+            self.on_shard_finished(shard)
+
+    def write_output(self, text):
+        """writes text to the output file"""
+        if self.output_file is not None:
+            self.output_file.write(text)
+
+    def read_output(self, shard, error=False):
+        """ read_output(shard, error=False)
+        Read the output of pylint and add each complete record to the
+        tree right away
+        """
+        if not self.jobs.is_current(shard.generation):
+            return  # a process of a cancelled job
+        if error:
+            qba = shard.process.readAllStandardError()
+            text = self.locale_codec.toUnicode(qba.data())
+        else:
+            qba = shard.process.readAllStandardOutput()
+            # the decoder keeps incomplete characters for the next chunk
+            text = shard.decoder.toUnicode(qba.data())
+        if shard.engine is None:
+            self.write_output(text)
+        if error:
+            return
+        self.parse_output(shard, text)
+
+    def parse_output(self, shard, text):
+        """ parse_output(shard, text)
+        Turn pylint json records into tree rows
+        """
+        started = time.perf_counter()
+        records = shard.stream.feed(text)
+        decoded = time.perf_counter()
+        self.profile.add("decoding", decoded - started)
+        for record in records:
+            if PROFILE_KEY in record:
+                self.profile.merge(record[PROFILE_KEY])
+                continue
+            if shard.engine is None:
+                path, message = record_message(record)
+            else:
+                path, message = shard.engine.message(record)
+            if not message[2]:
+                continue
+            path = os.path.normpath(os.path.join(self.cur_dir_path, path))
+            if shard.engine is not None:
+                if path in self.results:
+                    continue  # pylint was faster
+                self.fast_shown = True
+            shard.messages.setdefault(path, []).append(message)
+            self.add_message(path, *message)
+        self._model.flush()
+        self.update_counters()
+        self.profile.add("issue list", time.perf_counter() - decoded)
+
+    def on_shard_finished(self, shard):
+        """ on_shard_finished(shard)
+        Store the results of a shard as soon as it is done
+        """
+        if not self.jobs.is_current(shard.generation):
+            return
+        if shard.process is not None and shard.process.bytesAvailable():
+            self.read_output(shard)
+        shard.stream.flush()
+        if shard.process is not None and not shard.failed:
+            shard.failed = exit_failure(shard.process, shard.messages)
+        if shard.failed:
+            # Its files are neither cached nor rated
+            self.failed = self.failed or shard.failed
+            self.write_output(shard.failed + "\n")
+        else:
+            self.store_output(shard)
+
+        self.shards.remove(shard)
+        if shard.process is not None:
+            shard.process.deleteLater()
+        if self.shards:
+            return
+        if not self.batches:
+            self.show_output()
+        elif self.background:
+            # Give the editor and the shell room between the batches
+            generation = self.jobs.generation
+            QtCore.QTimer.singleShot(
+                int(self._config.backgroundDelay),
+                lambda: self.start_next_batch(generation),
+            )
+        else:
+            self.start_batch()
+
+    def on_shard_error(self, shard, error):
+        """ on_shard_error(shard, error)
+        A pylint process did not start, finished is not emitted for it
+        """
+        if error != QtCore.QProcess.FailedToStart:
+            return  # finished follows
+        if not self.jobs.is_current(shard.generation):
+            return
+        shard.failed = "Could not start {}: {}".format(
+            shard.process.program(), shard.process.errorString()
+        )
+        self.on_shard_finished(shard)
+
+    def start_next_batch(self, generation):
+        """starts the next batch unless the job was stopped"""
+        if self.jobs.is_current(generation) and self.batches:
+            self.start_batch()
+
+    def store_output(self, shard):
+        """ store_output(shard)
+        Update the cache with the messages of a shard per file
+        """
+        for path, msgs in shard.messages.items():
+            statements = self.statements.get(path)
+            if statements is None:
+                statements = count_statements(path, shard.source)
+            self.stats["statements"] += statements
+            if path in self.linted:
+                self.results[path] = self.cache.set(
+                    path, self.linted[path], msgs, statements
                 )
+            else:
+                # Messages for a file that was not asked for
+                self.results[path] = {
+                    "statements": statements,
+                    "messages": msgs,
+                }
+
+    def add_message(self, path, line_num, col, msg_id, msg):
+        """ add_message(path, line_num, col, msg_id, msg)
+        Add one message to the issue store and the statistics,
+        it shows up in the tree on the next flush
+        """
+        if not self.is_shown(path, line_num):
+            return
+        self._model.store.append(path, line_num, col, msg_id, msg)
+        letter = category(msg_id)
+        self.stats[letter] = self.stats.get(letter, 0) + 1
+
+    def is_shown(self, path, line_num):
+        """returns False for messages outside the changed lines"""
+        if self.changed is None:
+            return True
+        lines = self.changed.get(path)
+        return lines is not None and line_num in lines
+
+    def annotate(self, editor):
+        """ annotate(editor)
+        Draw the messages of the current run in an editor
+        """
+        if editor is None or not editor.filename:
+            return
+        path = os.path.normpath(os.path.abspath(editor.filename))
+        if not self._config.annotations:
+            annotations = Annotations.of(editor, create=False)
+            if annotations is not None:
+                annotations.set_messages([])
+            return
+        entry = self.results.get(path)
+        if entry is None:
+            return
+        Annotations.of(editor).set_messages(
+            [m for m in entry["messages"] if self.is_shown(path, m[0])]
+        )
+
+    def add_results(self, results):
+        """ add_results(results)
+        Add the messages of some files to the tree and the statistics
+        """
+        for path, entry in sorted(results.items()):
+            self.results[path] = entry
+            self.stats["statements"] += entry["statements"]
+            for message in entry["messages"]:
+                self.add_message(path, *message)
+        self._model.flush()
+        self.update_counters()
 
-                if msg_id[0] == "C":
-                    num_c += 1
-                elif msg_id[0] == "R":
-                    num_r += 1
-                elif msg_id[0] == "W":
-                    num_w += 1
-                elif msg_id[0] == "E":
-                    num_e += 1
-                num_a = num_c + num_r + num_w + num_e
-            except:
-                if line[0].strip().startswith("Your code"):
-                    res = line[0].replace("Your code has been rated at", "")
-                    res = res.replace("(previous run", "")
-                    try:
-                        prevsplit = line[1].split(",")
-                        prev = prevsplit[1].replace(")", "")
-                        self._ratings.setText(res + prev)
-                    except:
-                        pass
+    def update_counters(self):
+        """ update_counters()
+        Show the number of messages per category
+        """
+        num_c = self.stats["C"]
+        num_r = self.stats["R"]
+        num_w = self.stats["W"]
+        num_e = self.stats["E"]
+        num_a = num_c + num_r + num_w + num_e
 
         self._all.setText("{} ({})".format(ALL, str(num_a)))
         self._convention.setText("{} ({})".format(CONVENTION, str(num_c)))
@@ -413,19 +1038,172 @@ class PyzoLinter(QtWidgets.QWidget):
         self._warning.setText("{} ({})".format(WARNING, str(num_w)))
         self._error.setText("{} ({})".format(ERROR, str(num_e)))
 
-        self.on_radio_change_state(self._convention)
+    def show_output(self):
+        """ show_output()
+        All files are done, show the rating of the merged statistics
+        """
+        started = time.perf_counter()
+        if self.lint_started:
+            self.profile.add("lint", started - self.lint_started)
+
+        # output file is complete
+        if self.output_file is not None:
+            self.output_file.close()
+            self.output_file = None
+
+        # The pylint results replace the messages of the fast pass
+        self.stop_fast_pass()
+        if self.fast_shown:
+            self.fast_shown = False
+            results, self.results = self.results, {}
+            self.stats = empty_stats()
+            self._model.clear(self.cur_dir_path)
+            self.add_results(results)
+
+        # Rating of all files, cached ones included
+        score = rating(self.stats)
+        text = "{:.2f}/10".format(score)
+        tooltip = ""
+        # Runs of unsaved text, of a part of the messages or of the
+        # open files are not kept in the history
+        partial = self.changed is not None or self.background
+        if self.failed:
+            text = "Pylint failed"
+            tooltip = self.failed
+        elif not self.unsaved and not partial:
+            run_id = self.history.add_run(
+                self.scope, self.target, self.results, self.stats
+            )
+            previous = self.history.previous_run(run_id)
+            if previous is not None:
+                text += " ({:+.2f})".format(score - previous.rating)
+                new, fixed = self.history.diff(run_id, previous.id)
+                tooltip = "{} new, {} fixed since the last run".format(
+                    len(new), len(fixed)
+                )
+        self._ratings.setText(text)
+        self._ratings.setToolTip(tooltip)
+
+        # Rows streamed in after the last sort are put in place
+        self._model.resort()
+
+        for editor in pyzo.editors:
+            self.annotate(editor)
+
+        # A failed run is linted again when switching tabs
+        revisions = {} if self.failed else self.revisions
+        for path, (editor_id, revision) in revisions.items():
+            if path in self.results:
+                self.tab_cache.set(
+                    editor_id, revision, path, self.results[path]
+                )
+        self.tab_cache.prune(id(editor) for editor in pyzo.editors)
+
+        finished = time.perf_counter()
+        self.profile.add("results", finished - started)
+        self.profile.add("total", finished - self.profile.started)
+        self._profile_view.set_profile(self.profile)
+
+        # Start the next job
+        self.jobs.finished(self.jobs.running)
+
+    def on_editor_changed(self):
+        """ on_editor_changed()
+        Watch the document of the current editor for edits and saves
+        """
+        editor = pyzo.editors.getCurrentEditor()
+        if editor is self._watched_editor:
+            return
+        if self._watched_editor is not None:
+            document = self._watched_editor.document()
+            try:
+                document.contentsChanged.disconnect(self.on_text_changed)
+                document.modificationChanged.disconnect(
+                    self.on_modification_changed
+                )
+            except (TypeError, RuntimeError):
+                pass  # editor already closed
+        self._watched_editor = editor
+        self._lint_timer.stop()
+        if editor is None:
+            return
+        self.annotate(editor)
+        self.show_tab(editor)
+        document = editor.document()
+        self._revision = document.revision()
+        document.contentsChanged.connect(self.on_text_changed)
+        document.modificationChanged.connect(self.on_modification_changed)
+
+    def show_tab(self, editor):
+        """ show_tab(editor)
+        Show the results of the tab cache for an editor that did not
+        change since it was linted
+        """
+        if self._scope.currentText() != "Current document":
+            return
+        if self.jobs.running is not None:
+            return
+        cached = self.tab_cache.get(id(editor), editor.document().revision())
+        if cached is None:
+            return
+        path, entry = cached
+        self.reset()
+        self.cur_dir_path = os.path.dirname(path)
+        self.scope = "Current document"
+        self.target = path
+        self._model.clear(self.cur_dir_path)
+        self.add_results({path: entry})
+        self._model.resort()
+        self._ratings.setText("{:.2f}/10".format(rating(self.stats)))
+        self._ratings.setToolTip("")
+
+    def on_text_changed(self):
+        """ on_text_changed()
+        Lint when typing stopped for lintDelay milliseconds
+        """
+        if self._config.autoLint != "typing":
+            return
+        # Highlighting also emits contentsChanged, the revision only
+        # changes on edits
+        revision = self._watched_editor.document().revision()
+        if revision == self._revision:
+            return
+        self._revision = revision
+        self._lint_timer.start(int(self._config.lintDelay))
+
+    def on_modification_changed(self, modified):
+        """lint after the document was saved"""
+        if not modified and self._config.autoLint in ["save", "typing"]:
+            self._lint_timer.start(0)
+
+    def closeEvent(self, event):
+        """stop the worker together with the tool"""
+        self._lint_timer.stop()
+        self.jobs.clear()
+        try:
+            pyzo.editors.currentChanged.disconnect(self.on_editor_changed)
+        except (TypeError, RuntimeError):
+            pass
+        if self.worker is not None:
+            self.worker.stop()
+        self.history.close()
+        QtWidgets.QWidget.closeEvent(self, event)
 
     def on_item_clicked(self):
         """ on_item_clicked()
         If item clicked in the tree select a line in editor
         """
-        editor = pyzo.editors.getCurrentEditor()
-        fname = self._tree.currentItem().text(1)
-        filepath = os.path.join(self.cur_dir_path, fname)
-        lineno = self._tree.currentItem().text(3)
+        index = self._proxy.mapToSource(self._tree.currentIndex())
+        if not index.isValid():
+            return
+        store = self._model.store
+        record = self._model.record(index)
+        filepath = store.paths[store.file[record]]
+        lineno = store.line[record]
 
         # load file in the editor
         pyzo.editors.loadFile(filepath)
+        editor = pyzo.editors.getCurrentEditor()
         cursor = QtGui.QTextCursor(
             editor.document().findBlockByLineNumber(int(lineno) - 1)
         )
@@ -439,6 +1217,26 @@ class PyzoLinter(QtWidgets.QWidget):
         fpath = os.path.join(self.output_folder, "pylinter_output.txt")
         pyzo.editors.loadFile(fpath)
 
+    def on_show_history(self):
+        """ on_show_history()
+        Show the history of the last linted target
+        """
+        target = self.target
+        if not target:
+            editor = pyzo.editors.getCurrentEditor()
+            if editor is None or not editor.filename:
+                return
+            target = os.path.abspath(editor.filename)
+        dialog = HistoryDialog(self.history, target, self)
+        dialog.exec_()
+
+    def on_profile_toggled(self, checked):
+        """ on_profile_toggled(checked)
+        Profile the next runs and show the timings
+        """
+        self._config.profile = checked
+        self._profile_view.setVisible(checked)
+
     def on_font_options_press(self):
         """ Create the menu for the button, Do each time to make sure
         the checks are right. """
@@ -454,6 +1252,41 @@ class PyzoLinter(QtWidgets.QWidget):
             action.setCheckable(True)
             action.setChecked(i == current_size)
 
+        # Add number of parallel pylint processes
+        menu.addSeparator()
+        for i in range(1, (os.cpu_count() or 1) + 1):
+            action = menu.addAction("workers: %i" % i)
+            action.setCheckable(True)
+            action.setChecked(i == self._config.workers)
+
+        # Add automatic lint options
+        menu.addSeparator()
+        for mode in ["off", "save", "typing"]:
+            action = menu.addAction("auto lint: %s" % mode)
+            action.setCheckable(True)
+            action.setChecked(mode == self._config.autoLint)
+
+        # Add engine options
+        menu.addSeparator()
+        for engine in ["pylint", "worker"]:
+            action = menu.addAction("engine: %s" % engine)
+            action.setCheckable(True)
+            action.setChecked(engine == self._config.engine)
+
+        # Add annotation options
+        menu.addSeparator()
+        for value in ["on", "off"]:
+            action = menu.addAction("annotations: %s" % value)
+            action.setCheckable(True)
+            action.setChecked((value == "on") == self._config.annotations)
+
+        # Add fast pass options
+        menu.addSeparator()
+        for engine in ["auto", "ruff", "pyflakes", "off"]:
+            action = menu.addAction("fast pass: %s" % engine)
+            action.setCheckable(True)
+            action.setChecked(engine == self._config.fastEngine)
+
     def on_font_option_menu_tiggered(self, action):
         """  The user decides what to show in the structure. """
         # Get text
@@ -469,4 +1302,185 @@ class PyzoLinter(QtWidgets.QWidget):
             font.setPointSize(self._config.fontSize)
             self._tree.setFont(QtGui.QFont(font))
 
+        elif "workers" in text:
+            self._config.workers = int(text.split(":", 1)[1])
+
+        elif "engine" in text:
+            self._config.engine = text.split(":", 1)[1].strip()
+
+        elif "annotations" in text:
+            self._config.annotations = text.endswith("on")
+            for editor in pyzo.editors:
+                self.annotate(editor)
+
+        elif "fast pass" in text:
+            self._config.fastEngine = text.split(":", 1)[1].strip()
+
+        elif "auto lint" in text:
+            self._config.autoLint = text.split(":", 1)[1].strip()
+            self._lint_timer.stop()
+
         self._tree.updateGeometries()
+
+
+class HistoryDialog(QtWidgets.QDialog):
+    """Shows the runs, the file ratings and the changes of a target"""
+
+    def __init__(self, history, target, *args):
+        QtWidgets.QDialog.__init__(self, *args)
+        self.setWindowTitle("Lint history - " + target)
+        self.resize(700, 400)
+
+        runs = history.runs(target)
+
+        # Runs
+        self._runs = QtWidgets.QTreeWidget(self)
+        self._runs.setRootIsDecorated(False)
+        self._runs.setHeaderLabels(
+            ["Date", "Rating", CONVENTION, REFACTOR, WARNING, ERROR]
+        )
+        for run in runs:
+            date = QtCore.QDateTime.fromMSecsSinceEpoch(
+                int(run.started * 1000)
+            )
+            QtWidgets.QTreeWidgetItem(
+                self._runs,
+                [
+                    date.toString("yyyy-MM-dd hh:mm:ss"),
+                    "{:.2f}".format(run.rating),
+                    str(run.num_c),
+                    str(run.num_r),
+                    str(run.num_w),
+                    str(run.num_e),
+                ],
+            )
+
+        # Files of the last run with their rating trend
+        self._files = QtWidgets.QTreeWidget(self)
+        self._files.setRootIsDecorated(False)
+        self._files.setHeaderLabels(["File", "Rating", "Trend"])
+        self._files.setColumnWidth(0, 300)
+        # Changes since the run before the last run
+        self._changes = QtWidgets.QTreeWidget(self)
+        self._changes.setRootIsDecorated(False)
+        self._changes.setHeaderLabels(
+            ["Change", "File", "Code", "Line", "Description"]
+        )
+        if runs:
+            root = target if os.path.isdir(target) else os.path.dirname(target)
+            for path, score in history.run_files(runs[0].id):
+                trend = [r for _, r in history.file_trend(path, 6)]
+                QtWidgets.QTreeWidgetItem(
+                    self._files,
+                    [
+                        os.path.relpath(path, root),
+                        "{:.2f}".format(score),
+                        " > ".join("{:.2f}".format(r) for r in trend),
+                    ],
+                )
+            if len(runs) > 1:
+                new, fixed = history.diff(runs[0].id, runs[1].id)
+                for change, messages in [("new", new), ("fixed", fixed)]:
+                    for path, line, msg_id, msg in messages:
+                        QtWidgets.QTreeWidgetItem(
+                            self._changes,
+                            [
+                                change,
+                                os.path.relpath(path, root),
+                                msg_id,
+                                str(line),
+                                msg,
+                            ],
+                        )
+
+        self._tabs = QtWidgets.QTabWidget(self)
+        self._tabs.addTab(self._runs, "Runs")
+        self._tabs.addTab(self._files, "Files")
+        self._tabs.addTab(self._changes, "Changes")
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self._tabs, 1)
+        self.setLayout(layout)
+
+
+class ProfileView(QtWidgets.QWidget):
+    """Shows the timings of a run per phase, file and checker"""
+
+    # Rows shown for files and checkers, the slowest first
+    MAX_ROWS = 100
+
+    def __init__(self, *args):
+        QtWidgets.QWidget.__init__(self, *args)
+        self._data = {}
+
+        self._tree = QtWidgets.QTreeWidget(self)
+        self._tree.setHeaderLabels(["Profile", "Seconds", "%"])
+        self._tree.setColumnWidth(0, 300)
+        self._tree.setMinimumHeight(150)
+
+        # Create button for exporting the profile
+        self._export = QtWidgets.QToolButton(self)
+        self._export.setIcon(pyzo.icons.disk)
+        self._export.setIconSize(QtCore.QSize(16, 16))
+        self._export.setToolTip("Export the profile as JSON")
+        # event
+        self._export.clicked.connect(self.on_export)
+
+        layout = QtWidgets.QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self._tree, 1)
+        layout.addWidget(self._export, 0, QtCore.Qt.AlignTop)
+        self.setLayout(layout)
+
+    def set_profile(self, profile):
+        """ set_profile(profile)
+        Show a RunProfile, groups keep their expanded state
+        """
+        self._data = profile.to_dict()
+        expanded = {}
+        for i in range(self._tree.topLevelItemCount()):
+            item = self._tree.topLevelItem(i)
+            expanded[item.text(0)] = item.isExpanded()
+        self._tree.clear()
+
+        total = profile.phases.get("total", 0.0)
+        root = self._tree.invisibleRootItem()
+        groups = [
+            ("Phases", profile.phases, True),
+            ("Files", profile.files, False),
+            ("Checkers", profile.checkers, False),
+        ]
+        for name, timings, default in groups:
+            # Phases overlap, their total is the time of the run
+            seconds = total if timings is profile.phases else sum(
+                timings.values()
+            )
+            group = QtWidgets.QTreeWidgetItem(
+                root, [name, "{:.3f}".format(seconds)]
+            )
+            ranked = sorted(timings.items(), key=lambda t: -t[1])
+            for key, seconds in ranked[:self.MAX_ROWS]:
+                share = 100.0 * seconds / total if total else 0.0
+                QtWidgets.QTreeWidgetItem(
+                    group,
+                    [key, "{:.3f}".format(seconds), "{:.1f}".format(share)],
+                )
+            if len(ranked) > self.MAX_ROWS:
+                QtWidgets.QTreeWidgetItem(
+                    group, ["... {} more".format(len(ranked) - self.MAX_ROWS)]
+                )
+            group.setExpanded(expanded.get(name, default))
+
+    def on_export(self):
+        """ on_export()
+        Write the profile to a JSON file
+        """
+        filename = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export lint profile", "lint_profile.json", "JSON (*.json)"
+        )
+        if isinstance(filename, tuple):
+            filename = filename[0]
+        if not filename:
+            return
+        with open(filename, "w", encoding="utf-8") as fd:
+            json.dump(self._data, fd, indent=2)
@@ -0,0 +1,179 @@
+""" Lint messages drawn in the editor
+
+An Annotations widget lies over the viewport of an editor. It paints a
+marker at the left edge and a wavy underline for the lines that have
+messages, only for the blocks that are visible. The messages are kept
+per line and shifted when lines are added or removed, so they stay on
+their line until the file is linted again.
+"""
+
+from pyzo.util.qt import QtCore, QtGui, QtWidgets
+
+from .engines import category
+
+# Category -> colour of the marker and the underline
+COLOURS = {
+    "E": "#e03030",
+    "F": "#e03030",
+    "W": "#e09020",
+    "R": "#3080e0",
+    "C": "#3080e0",
+}
+
+# The worst category of a line sets its colour
+SEVERITY = "FEWRCI"
+
+
+class LineIndex:
+    """Messages per 0-based line, [(column, msg_id, msg), ...]"""
+
+    def __init__(self, messages=()):
+        self.lines = {}
+        for line, column, msg_id, msg in messages:
+            if line > 0:
+                self.lines.setdefault(line - 1, []).append(
+                    (column, msg_id, msg)
+                )
+
+    def get(self, line):
+        """returns the messages of a line"""
+        return self.lines.get(line, ())
+
+    def shift(self, line, delta):
+        """ shift(line, delta)
+        Move the messages below line by delta lines, messages of
+        removed lines are dropped
+        """
+        if not delta:
+            return
+        lines = {}
+        for number, messages in self.lines.items():
+            if number <= line:
+                lines[number] = messages
+            elif delta < 0 and number <= line - delta:
+                continue  # removed
+            else:
+                lines[number + delta] = messages
+        self.lines = lines
+
+
+class Annotations(QtWidgets.QWidget):
+    """Paints the messages of one editor over its viewport"""
+
+    def __init__(self, editor):
+        QtWidgets.QWidget.__init__(self, editor.viewport())
+        self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+        self.setAttribute(QtCore.Qt.WA_NoSystemBackground)
+        self._editor = editor
+        self.index = LineIndex()
+        self._block_count = editor.document().blockCount()
+
+        editor.document().contentsChange.connect(self.on_contents_change)
+        editor.updateRequest.connect(self.on_update_request)
+        editor.viewport().installEventFilter(self)
+        self.resize(editor.viewport().size())
+        self.show()
+
+    @classmethod
+    def of(cls, editor, create=True):
+        """returns the annotations of an editor"""
+        widget = editor.viewport().findChild(cls)
+        if widget is None and create:
+            widget = cls(editor)
+        return widget
+
+    def set_messages(self, messages):
+        """ set_messages(messages)
+        Show [line, column, msg_id, msg] messages
+        """
+        self.index = LineIndex(messages)
+        self._block_count = self._editor.document().blockCount()
+        self.update()
+
+    def on_contents_change(self, position, removed, added):
+        """shift the messages below an edit that added or removed lines"""
+        document = self._editor.document()
+        count = document.blockCount()
+        if count != self._block_count:
+            block = document.findBlock(position)
+            line = block.blockNumber()
+            if position == block.position():
+                line -= 1  # the whole line moved
+            self.index.shift(line, count - self._block_count)
+            self._block_count = count
+
+    def on_update_request(self, rect, dy):
+        """the editor scrolled or repainted"""
+        if dy:
+            # Scrolling the viewport moves its children along
+            self.setGeometry(self._editor.viewport().rect())
+        self.update()
+
+    def eventFilter(self, obj, event):
+        """follow the size of the viewport and show tooltips"""
+        if event.type() == QtCore.QEvent.Resize:
+            self.resize(event.size())
+        elif event.type() == QtCore.QEvent.ToolTip:
+            cursor = self._editor.cursorForPosition(event.pos())
+            messages = self.index.get(cursor.blockNumber())
+            if messages:
+                text = "\n".join(
+                    "{}: {}".format(msg_id, msg)
+                    for _, msg_id, msg in messages
+                )
+                QtWidgets.QToolTip.showText(event.globalPos(), text, obj)
+                return True
+        return False
+
+    def paintEvent(self, event):
+        """paint the messages of the visible blocks"""
+        if not self.index.lines:
+            return
+        editor = self._editor
+        painter = QtGui.QPainter(self)
+        height = self.height()
+        offset = editor.contentOffset()
+        block = editor.firstVisibleBlock()
+        while block.isValid():
+            geometry = editor.blockBoundingGeometry(block).translated(offset)
+            if geometry.top() > height:
+                break
+            messages = self.index.get(block.blockNumber())
+            if messages and block.isVisible():
+                self._paint_line(painter, block, geometry, messages)
+            block = block.next()
+        painter.end()
+
+    def _paint_line(self, painter, block, geometry, messages):
+        letters = [category(msg_id) for _, msg_id, _ in messages]
+        worst = min(letters, key=SEVERITY.find)
+        colour = QtGui.QColor(COLOURS.get(worst, COLOURS["C"]))
+
+        # Marker at the left edge
+        painter.fillRect(
+            QtCore.QRectF(0, geometry.top(), 3, geometry.height()), colour
+        )
+
+        # Wavy underline from the first column to the end of the line
+        column = min(message[0] for message in messages)
+        length = len(block.text())
+        if length == 0:
+            return
+        cursor = QtGui.QTextCursor(block)
+        cursor.setPosition(block.position() + min(column, length - 1))
+        start = self._editor.cursorRect(cursor)
+        cursor.setPosition(block.position() + length)
+        end = self._editor.cursorRect(cursor)
+        if end.top() != start.top():
+            end = QtCore.QRect(self.width(), start.top(), 0, start.height())
+        path = QtGui.QPainterPath()
+        y = start.bottom() - 1
+        x = start.left()
+        path.moveTo(x, y)
+        up = True
+        while x < end.left():
+            x += 2
+            path.lineTo(x, y - 2 if up else y)
+            up = not up
+        painter.setPen(QtGui.QPen(colour, 1))
+        painter.drawPath(path)
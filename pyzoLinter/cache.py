@@ -0,0 +1,344 @@
+""" Persistent per-file cache of pylint results"""
+
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+
+RC_FILES = ["pylintrc", ".pylintrc", "pyproject.toml", "setup.cfg"]
+
+# Messages about the other files of a run, cyclic-import and
+# duplicate-code. They are not cached per file, they are only right for
+# the files linted together.
+CROSS_FILE_IDS = {"R0401", "R0801"}
+
+
+def hash_bytes(data):
+    """returns the hex digest used for all cache keys"""
+    return hashlib.sha1(data).hexdigest()
+
+
+def hash_file(filepath):
+    """returns the hash of the file content or an empty string"""
+    try:
+        with open(filepath, "rb") as fd:
+            return hash_bytes(fd.read())
+    except OSError:
+        return ""
+
+
+def find_rcfile(start_dir):
+    """ find_rcfile(start_dir)
+    Find the configuration file pylint would most likely pick up
+    when started in start_dir
+    """
+    env_rc = os.environ.get("PYLINTRC", "")
+    path = os.path.abspath(start_dir)
+    while True:
+        for name in RC_FILES:
+            candidate = os.path.join(path, name)
+            if os.path.isfile(candidate):
+                return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    if env_rc and os.path.isfile(env_rc):
+        return env_rc
+    for candidate in [
+            os.path.join(os.path.expanduser("~"), ".pylintrc"),
+            os.path.join(os.path.expanduser("~"), ".config", "pylintrc"),
+    ]:
+        if os.path.isfile(candidate):
+            return candidate
+    return ""
+
+
+def count_statements(filepath, source=None):
+    """ count_statements(filepath, source=None)
+    Count the statements of a module, used to compute the rating
+    the same way pylint does. source is the unsaved text of the file.
+    """
+    try:
+        if source is None:
+            with open(filepath, "rb") as fd:
+                source = fd.read()
+        tree = ast.parse(source)
+    except (OSError, SyntaxError, ValueError):
+        return 0
+    return sum(isinstance(node, ast.stmt) for node in ast.walk(tree))
+
+
+def import_names(tree):
+    """ import_names(tree)
+    Get (level, dotted name) of the modules a module imports, for
+    "from a import b" both a and a.b as b may be a module
+    """
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend((0, alias.name) for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            names.append((node.level, module))
+            for alias in node.names:
+                if alias.name != "*":
+                    name = module + "." + alias.name if module else alias.name
+                    names.append((node.level, name))
+    return names
+
+
+def import_folders(filepath, start_dir):
+    """ import_folders(filepath, start_dir)
+    Get the folders pylint finds the absolute imports of a file in:
+    the folder of the file, the folder above its top package and the
+    folder pylint runs in
+    """
+    folder = os.path.dirname(os.path.abspath(filepath))
+    top = folder
+    while os.path.isfile(os.path.join(top, "__init__.py")):
+        parent = os.path.dirname(top)
+        if parent == top:
+            break
+        top = parent
+    folders = []
+    for path in [folder, top, start_dir]:
+        if path and path not in folders:
+            folders.append(path)
+    return folders
+
+
+def python_files(dir_path):
+    """returns all python files pylint would lint in dir_path"""
+    files = []
+    for root, dirs, names in os.walk(dir_path):
+        dirs[:] = sorted(
+            d for d in dirs if not d.startswith(".") and d != "__pycache__"
+        )
+        for name in sorted(names):
+            if name.endswith(".py"):
+                files.append(os.path.join(root, name))
+    return files
+
+
+def rating(stats):
+    """ rating(stats)
+    Compute the pylint rating from the merged statistics
+    """
+    if stats.get("F", 0):
+        return 0.0
+    statements = stats.get("statements", 0)
+    if not statements:
+        return 10.0
+    penalty = (
+        5 * stats.get("E", 0)
+        + stats.get("W", 0)
+        + stats.get("R", 0)
+        + stats.get("C", 0)
+    )
+    return max(0.0, 10.0 - (float(penalty) / statements) * 10)
+
+
+class RunKeys:
+    """ RunKeys makes the cache keys of the files of one run. A key
+    covers the content of the file, the environment and the content of
+    the local modules the file imports, so the messages about imported
+    names are not served once such a module changed. The files are
+    read and their imports resolved once per run, their statements are
+    counted on the way.
+    """
+
+    def __init__(self, environment, start_dir):
+        self.environment = environment
+        self.start_dir = start_dir
+        # path -> statements of the files keyed so far
+        self.statements = {}
+        # path -> hash of the content
+        self._hashes = {}
+        # (folder, name) -> module file or None
+        self._modules = {}
+
+    def key(self, filepath, source=None):
+        """returns the cache key of a file or of its unsaved text"""
+        if source is None:
+            try:
+                with open(filepath, "rb") as fd:
+                    data = fd.read()
+            except OSError:
+                data = b""
+            content_hash = self._hashes[filepath] = hash_bytes(data)
+        else:
+            data = source.encode("utf-8")
+            content_hash = hash_bytes(data)
+        try:
+            tree = ast.parse(data)
+        except (SyntaxError, ValueError, RecursionError):
+            tree = None
+        parts = [content_hash, self.environment]
+        self.statements[filepath] = 0
+        if tree is not None:
+            self.statements[filepath] = sum(
+                isinstance(node, ast.stmt) for node in ast.walk(tree)
+            )
+            for path in self.imports(filepath, tree):
+                parts.append("{}={}".format(path, self._hash(path)))
+        return hash_bytes("|".join(parts).encode("utf-8"))
+
+    def imports(self, filepath, tree):
+        """ imports(filepath, tree)
+        Get the files of the local modules imported by the module tree
+        of filepath, in a sorted list
+        """
+        folders = import_folders(filepath, self.start_dir)
+        modules = set()
+        for level, name in import_names(tree):
+            if level:
+                folder = folders[0]
+                for _ in range(level - 1):
+                    folder = os.path.dirname(folder)
+                path = self._module(folder, name)
+            else:
+                for folder in folders:
+                    path = self._module(folder, name)
+                    if path is not None:
+                        break
+            if path is not None:
+                modules.add(path)
+        modules.discard(os.path.normpath(os.path.abspath(filepath)))
+        return sorted(modules)
+
+    def _module(self, folder, name):
+        if (folder, name) not in self._modules:
+            # "from . import x" imports the package of folder
+            path = os.path.join(folder, *name.split(".")) if name else folder
+            candidates = [os.path.join(path, "__init__.py")]
+            if name:
+                candidates.insert(0, path + ".py")
+            found = None
+            for candidate in candidates:
+                if os.path.isfile(candidate):
+                    found = os.path.normpath(candidate)
+                    break
+            self._modules[(folder, name)] = found
+        return self._modules[(folder, name)]
+
+    def _hash(self, path):
+        if path not in self._hashes:
+            self._hashes[path] = hash_file(path)
+        return self._hashes[path]
+
+
+class LintCache:
+    """ LintCache stores pylint messages per file on disk.
+    An entry is valid as long as the file content, the content of the
+    local modules it imports, the pylint version and the rc-file are
+    the same as when the file was linted.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._versions = {}
+
+    def _entry_path(self, filepath):
+        name = hash_bytes(os.path.normcase(filepath).encode("utf-8"))
+        return os.path.join(self.folder, name + ".json")
+
+    def pylint_version(self, pylint_exe="pylint"):
+        """ pylint_version(pylint_exe)
+        Get the pylint version, it is only asked again if the
+        executable changed
+        """
+        exe = shutil.which(pylint_exe) or pylint_exe
+        try:
+            stat = os.stat(exe)
+            stamp = (exe, stat.st_mtime, stat.st_size)
+        except OSError:
+            stamp = (exe, 0, 0)
+        if stamp not in self._versions:
+            try:
+                proc = subprocess.run(
+                    [exe, "--version"],
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    timeout=30,
+                )
+                version = proc.stdout.decode("utf-8", "replace").strip()
+            except (OSError, subprocess.SubprocessError):
+                version = ""
+            self._versions[stamp] = version
+        return self._versions[stamp]
+
+    def environment(self, start_dir, pylint_exe="pylint"):
+        """ environment(start_dir, pylint_exe)
+        Get the part of the key shared by all files of one run
+        """
+        rcfile = find_rcfile(start_dir)
+        rc_hash = hash_file(rcfile) if rcfile else ""
+        return "{}|{}".format(self.pylint_version(pylint_exe), rc_hash)
+
+    def get(self, filepath, key):
+        """ get(filepath, key)
+        Get the cached entry of a file, None if there is no valid entry
+        """
+        try:
+            with open(self._entry_path(filepath), encoding="utf-8") as fd:
+                entry = json.load(fd)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key:
+            return None
+        return entry
+
+    def set(self, filepath, key, messages, statements):
+        """ set(filepath, key, messages, statements)
+        Store messages [line, column, msg_id, msg] of a file, returns
+        the entry. The messages of CROSS_FILE_IDS are not stored.
+        """
+        entry = {
+            "key": key,
+            "path": filepath,
+            "statements": statements,
+            "messages": messages,
+        }
+        stored = dict(entry)
+        stored["messages"] = [
+            message for message in messages
+            if message[2] not in CROSS_FILE_IDS
+        ]
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = self._entry_path(filepath) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fd:
+            json.dump(stored, fd)
+        os.replace(tmp_path, self._entry_path(filepath))
+        return entry
+
+
+class TabCache:
+    """ TabCache keeps the results of the files open in the editors.
+    An entry is valid as long as the document revision of its editor is
+    the same as when the file was linted.
+    """
+
+    def __init__(self):
+        # editor id -> (revision, path, entry)
+        self._entries = {}
+
+    def set(self, editor_id, revision, path, entry):
+        """stores the entry of the file shown by an editor"""
+        self._entries[editor_id] = (revision, path, entry)
+
+    def get(self, editor_id, revision):
+        """returns (path, entry) if the editor did not change, else None"""
+        cached = self._entries.get(editor_id)
+        if cached is None or cached[0] != revision:
+            return None
+        return cached[1], cached[2]
+
+    def prune(self, editor_ids):
+        """drops the entries of editors that are closed"""
+        editor_ids = set(editor_ids)
+        for editor_id in list(self._entries):
+            if editor_id not in editor_ids:
+                del self._entries[editor_id]
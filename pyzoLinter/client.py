@@ -0,0 +1,187 @@
+""" Client side of the long-lived pylint worker"""
+
+import json
+import os
+import shutil
+
+import pyzo
+from pyzo.util.qt import QtCore
+
+from .worker import DONE, FAILED
+
+WORKER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "worker.py"
+)
+
+
+def find_python(pylint_exe="pylint"):
+    """ find_python(pylint_exe)
+    Find the interpreter pylint is installed in, the worker has to
+    run in the same environment
+    """
+    exe = shutil.which(pylint_exe)
+    if not exe:
+        return "python"
+    try:
+        with open(exe, "rb") as fd:
+            first = fd.readline().decode("utf-8", "replace")
+    except OSError:
+        first = ""
+    if first.startswith("#!"):
+        parts = first[2:].split()
+        if parts and os.path.basename(parts[0]) == "env":
+            parts = parts[1:]
+        if parts:
+            return parts[0]
+    # Windows: Scripts/pylint.exe next to or below python.exe
+    folder = os.path.dirname(exe)
+    for candidate in [
+            os.path.join(folder, "python.exe"),
+            os.path.join(os.path.dirname(folder), "python.exe"),
+    ]:
+        if os.path.isfile(candidate):
+            return candidate
+    return "python"
+
+
+class PylintWorker(QtCore.QObject):
+    """ PylintWorker runs worker.py in a QProcess and sends it requests.
+    One request is sent at a time, a newer request replaces the one
+    waiting to be sent. The output of a cancelled request is dropped so
+    the worker (and its warm cache) can be kept.
+    """
+
+    # request id, list of output lines
+    output = QtCore.Signal(int, object)
+    # request id, False when pylint did not lint the files
+    done = QtCore.Signal(int, bool)
+    # text written to stderr
+    error = QtCore.Signal(str)
+
+    def __init__(self, python_exe, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self._python = python_exe
+        self.process = None
+        self._decoder = None
+        self._buffer = ""
+        # [request id, wanted] in the order they were sent
+        self._pending = []
+        # request waiting for the worker to finish the pending one
+        self._waiting = None
+        self._next_id = 0
+
+    def _start(self):
+        codec = QtCore.QTextCodec.codecForName("UTF-8")
+        self._decoder = codec.makeDecoder()
+        self._buffer = ""
+        self._pending = []
+
+        environment = QtCore.QProcessEnvironment.systemEnvironment()
+        environment.insert("PYTHONIOENCODING", "utf-8")
+        self.process = QtCore.QProcess(self)
+        self.process.setProcessEnvironment(environment)
+        self.process.setProcessChannelMode(QtCore.QProcess.SeparateChannels)
+        self.process.readyReadStandardOutput.connect(self._on_output)
+        self.process.readyReadStandardError.connect(self._on_error)
+        self.process.finished.connect(self._on_finished)
+        self.process.errorOccurred.connect(self._on_process_error)
+        self.process.start(self._python, ["-u", WORKER_SCRIPT])
+
+    def lint(self, files, cwd, args, source=None, profile=False):
+        """ lint(files, cwd, args, source=None, profile=False)
+        Queue a request, returns its id. source is the unsaved text
+        of the only file. With profile the timings are written after
+        the messages.
+        """
+        self._next_id += 1
+        self._waiting = {
+            "id": self._next_id,
+            "cwd": cwd,
+            "files": list(files),
+            "args": list(args),
+        }
+        if source is not None:
+            self._waiting["source"] = source
+        if profile:
+            self._waiting["profile"] = True
+        self._send()
+        return self._next_id
+
+    def _send(self):
+        if self._waiting is None or self._pending:
+            return
+        if (
+                self.process is None
+                or self.process.state() == QtCore.QProcess.NotRunning
+        ):
+            self._start()
+        request, self._waiting = self._waiting, None
+        self._pending.append([request["id"], True])
+        self.process.write((json.dumps(request) + "\n").encode("utf-8"))
+
+    def cancel(self, request_id):
+        """the output of the request is not wanted anymore"""
+        if self._waiting is not None and self._waiting["id"] == request_id:
+            self._waiting = None
+        for pending in self._pending:
+            if pending[0] == request_id:
+                pending[1] = False
+
+    def stop(self):
+        """ stop()
+        Let the worker exit by closing its input
+        """
+        if self.process is None:
+            return
+        self.process.finished.disconnect()
+        self.process.closeWriteChannel()
+        if not self.process.waitForFinished(1000):
+            self.process.kill()
+        self.process = None
+
+    def _on_output(self):
+        qba = self.process.readAllStandardOutput()
+        text = self._decoder.toUnicode(qba.data())
+        lines = (self._buffer + text).split("\n")
+        self._buffer = lines.pop()
+
+        chunk = []
+        for line in lines:
+            if line.startswith(DONE):
+                request_id, wanted = self._pending.pop(0)
+                if wanted:
+                    if chunk:
+                        self.output.emit(request_id, chunk)
+                    self.done.emit(request_id, FAILED not in line.split())
+                chunk = []
+                self._send()
+            else:
+                chunk.append(line)
+        if chunk and self._pending and self._pending[0][1]:
+            self.output.emit(self._pending[0][0], chunk)
+
+    def _on_error(self):
+        qba = self.process.readAllStandardError()
+        self.error.emit(bytes(qba.data()).decode("utf-8", "replace"))
+
+    def _on_process_error(self, error):
+        if error == QtCore.QProcess.FailedToStart:
+            self.error.emit(
+                "Could not start the pylint worker with {}\n".format(
+                    self._python
+                )
+            )
+            self._on_finished()
+
+    def _on_finished(self):
+        # The worker died, do not leave the requests hanging
+        process, self.process = self.process, None
+        pending, self._pending = self._pending, []
+        for request_id, wanted in pending:
+            if wanted:
+                self.done.emit(request_id, False)
+        if process is not None:
+            process.finished.disconnect()
+            pyzo.callLater(process.deleteLater)
+        # A new worker takes the waiting request
+        self._send()
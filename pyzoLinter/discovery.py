@@ -0,0 +1,121 @@
+""" Discovery of the python files of a project for the "Project" scope
+
+The project and its files are found by pyzoShared.discovery, the files
+and folders pylint is told to ignore are skipped too.
+"""
+
+import configparser
+import os
+import re
+
+from ..pyzoShared import discovery
+from .cache import find_rcfile
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# Sections of the pylint options in ini files
+PYLINT_SECTIONS = ["MAIN", "MASTER", "pylint.main", "pylint.master"]
+
+
+def _split_option(value):
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v.strip() for v in re.split(r"[,\n]", value) if v.strip()]
+
+
+class PylintIgnore:
+    """ The ignore, ignore-patterns and ignore-paths options of pylint.
+    ignore-paths are matched against the absolute path and the path
+    relative to root, both also with forward slashes.
+    """
+
+    def __init__(self, rcfile="", root=""):
+        self.root = root
+        self.names = {"CVS"}
+        self.patterns = [re.compile(r"^\.#")]
+        self.paths = []
+        options = {}
+        try:
+            if rcfile.endswith(".toml"):
+                options = self._read_toml(rcfile)
+            elif rcfile:
+                options = self._read_ini(rcfile)
+        except (OSError, ValueError, configparser.Error):
+            options = {}
+        try:
+            if "ignore" in options:
+                self.names = set(_split_option(options["ignore"]))
+            if "ignore-patterns" in options:
+                self.patterns = [
+                    re.compile(p)
+                    for p in _split_option(options["ignore-patterns"])
+                ]
+            if "ignore-paths" in options:
+                self.paths = [
+                    re.compile(p)
+                    for p in _split_option(options["ignore-paths"])
+                ]
+        except re.error:
+            pass
+
+    @staticmethod
+    def _read_toml(rcfile):
+        if tomllib is None:
+            return {}
+        with open(rcfile, "rb") as fd:
+            data = tomllib.load(fd)
+        pylint = data.get("tool", {}).get("pylint", {})
+        options = {}
+        for section in ["master", "main"]:
+            options.update(pylint.get(section, {}))
+        return options
+
+    @staticmethod
+    def _read_ini(rcfile):
+        parser = configparser.ConfigParser(interpolation=None)
+        parser.read(rcfile, encoding="utf-8")
+        options = {}
+        for section in PYLINT_SECTIONS + ["tool:pylint"]:
+            if parser.has_section(section):
+                options.update(parser.items(section))
+        return options
+
+    def ignored(self, path):
+        """returns True if pylint would skip the file or folder path"""
+        name = os.path.basename(path)
+        if name in self.names:
+            return True
+        if any(pattern.match(name) for pattern in self.patterns):
+            return True
+        if self.paths:
+            candidates = [path, path.replace("\\", "/")]
+            if self.root:
+                relative = os.path.relpath(path, self.root)
+                candidates.append(relative.replace("\\", "/"))
+            return any(
+                pattern.match(candidate)
+                for pattern in self.paths
+                for candidate in candidates
+            )
+        return False
+
+
+class ProjectFiles(discovery.ProjectFiles):
+    """ ProjectFiles finds the python files of a project that pylint
+    does not ignore
+    """
+
+    def files(self, root, ignore=None):
+        """ files(root, ignore=None)
+        Get the python files of the project in root, ignore defaults to
+        the ignore options of the pylint configuration of root
+        """
+        if ignore is None:
+            ignore = PylintIgnore(find_rcfile(root), root)
+        return discovery.ProjectFiles.files(self, root, ignore)
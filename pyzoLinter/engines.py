@@ -0,0 +1,149 @@
+""" Lint engines of pyzoLinter and the message schema they share
+
+Every engine reports [line, column, msg_id, msg] per file, with a
+0-based column like pylint. pylint message ids are a category letter
+and four digits. The fast engines (ruff, pyflakes) use the pyflakes
+codes of ruff, their category is looked up in ERROR_CODES.
+"""
+
+import abc
+import os
+import shutil
+
+FLAKES_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "flakes.py"
+)
+
+# Codes of the fast engines that are errors, the others are warnings
+ERROR_CODES = {
+    "E902",  # file could not be read
+    "E999",  # syntax error
+    "F406",
+    "F407",
+    "F502",
+    "F503",
+    "F505",
+    "F506",
+    "F507",
+    "F508",
+    "F509",
+    "F521",
+    "F524",
+    "F525",
+    "F621",
+    "F622",
+    "F633",
+    "F701",
+    "F702",
+    "F704",
+    "F706",
+    "F707",
+    "F722",
+    "F821",
+    "F822",
+    "F823",
+    "F831",
+}
+
+
+def category(msg_id):
+    """ category(msg_id)
+    Get the pylint category letter (C, R, W, E, F, I) of a message id
+    of any engine
+    """
+    if len(msg_id) == 5 and msg_id[1:].isdigit():
+        return msg_id[0]  # pylint
+    if msg_id in ERROR_CODES:
+        return "E"
+    return "W"
+
+
+class FastEngine(abc.ABC):
+    """ A checker much faster than pylint that finds a part of its
+    messages. It prints JSON, records are turned into messages by
+    message().
+    """
+
+    name = ""
+
+    def __init__(self, exe):
+        self.exe = exe
+
+    @abc.abstractmethod
+    def command(self, files, source=None):
+        """returns the program and arguments to check files"""
+
+    @abc.abstractmethod
+    def message(self, record):
+        """returns (path, [line, column, msg_id, msg]) of a record"""
+
+
+class Ruff(FastEngine):
+    """ruff limited to the pyflakes checks and syntax errors"""
+
+    name = "ruff"
+
+    def command(self, files, source=None):
+        args = [
+            "check",
+            "--output-format=json",
+            "--select=F,E9",
+            "--exit-zero",
+            "--no-cache",
+        ]
+        if source is not None:
+            args.extend(["--stdin-filename", files[0], "-"])
+        else:
+            args.extend(files)
+        return self.exe, args
+
+    def message(self, record):
+        code = record.get("code") or "E999"
+        msg = record.get("message", "")
+        if record.get("name"):
+            msg = "{} ({})".format(msg, record["name"])
+        location = record.get("location") or {}
+        return record.get("filename", ""), [
+            location.get("row") or 0,
+            max(0, (location.get("column") or 1) - 1),
+            code,
+            msg,
+        ]
+
+
+class Pyflakes(FastEngine):
+    """pyflakes run by flakes.py, exe is the python interpreter"""
+
+    name = "pyflakes"
+
+    def command(self, files, source=None):
+        if source is not None:
+            return self.exe, ["-u", FLAKES_SCRIPT, "--stdin", files[0]]
+        return self.exe, ["-u", FLAKES_SCRIPT] + list(files)
+
+    def message(self, record):
+        return record.get("path", ""), [
+            record.get("line") or 0,
+            record.get("column") or 0,
+            record.get("code", ""),
+            record.get("message", ""),
+        ]
+
+
+def fast_engine(mode, python_exe):
+    """ fast_engine(mode, python_exe)
+    Get the fast engine for the mode "auto", "ruff", "pyflakes" or
+    "off", None if it is off or not installed. pyflakes has to be
+    installed in the environment of python_exe.
+    """
+    if mode in ["auto", "ruff"]:
+        exe = shutil.which("ruff")
+        if exe:
+            return Ruff(exe)
+    if mode in ["auto", "pyflakes"]:
+        # The pyflakes script sits next to the interpreter
+        folder = os.path.dirname(shutil.which(python_exe) or python_exe)
+        for name in ["pyflakes", os.path.join("Scripts", "pyflakes.exe")]:
+            if os.path.isfile(os.path.join(folder, name)):
+                return Pyflakes(python_exe)
+    return None
@@ -0,0 +1,113 @@
+""" pyflakes runner for the fast pass of pyzoLinter
+
+Run as a script by the linter in the interpreter pylint is installed
+in. It checks the files given as arguments and writes every message as
+a JSON line with the pyflakes code ruff uses for it. With --stdin the
+only file is read from stdin.
+"""
+
+import json
+import sys
+
+# pyflakes message class -> code
+CODES = {
+    "UnusedImport": "F401",
+    "ImportShadowedByLoopVar": "F402",
+    "ImportStarUsed": "F403",
+    "LateFutureImport": "F404",
+    "ImportStarUsage": "F405",
+    "ImportStarNotPermitted": "F406",
+    "FutureFeatureNotDefined": "F407",
+    "PercentFormatInvalidFormat": "F501",
+    "PercentFormatExpectedMapping": "F502",
+    "PercentFormatExpectedSequence": "F503",
+    "PercentFormatExtraNamedArguments": "F504",
+    "PercentFormatMissingArgument": "F505",
+    "PercentFormatMixedPositionalAndNamed": "F506",
+    "PercentFormatPositionalCountMismatch": "F507",
+    "PercentFormatStarRequiresSequence": "F508",
+    "PercentFormatUnsupportedFormatCharacter": "F509",
+    "StringDotFormatInvalidFormat": "F521",
+    "StringDotFormatExtraNamedArguments": "F522",
+    "StringDotFormatExtraPositionalArguments": "F523",
+    "StringDotFormatMissingArgument": "F524",
+    "StringDotFormatMixingAutomatic": "F525",
+    "FStringMissingPlaceholders": "F541",
+    "MultiValueRepeatedKeyLiteral": "F601",
+    "MultiValueRepeatedKeyVariable": "F602",
+    "TooManyExpressionsInStarredAssignment": "F621",
+    "TwoStarredExpressions": "F622",
+    "AssertTuple": "F631",
+    "IsLiteral": "F632",
+    "InvalidPrintSyntax": "F633",
+    "IfTuple": "F634",
+    "BreakOutsideLoop": "F701",
+    "ContinueOutsideLoop": "F702",
+    "YieldOutsideFunction": "F704",
+    "ReturnOutsideFunction": "F706",
+    "DefaultExceptNotLast": "F707",
+    "DoctestSyntaxError": "F721",
+    "ForwardAnnotationSyntaxError": "F722",
+    "RedefinedWhileUnused": "F811",
+    "UndefinedName": "F821",
+    "UndefinedExport": "F822",
+    "UndefinedLocal": "F823",
+    "DuplicateArgument": "F831",
+    "UnusedVariable": "F841",
+    "UnusedAnnotation": "F842",
+    "RaiseNotImplemented": "F901",
+}
+
+
+def write(path, line, column, code, message):
+    """writes one message as a JSON line"""
+    sys.stdout.write(
+        json.dumps(
+            {
+                "path": path,
+                "line": line or 0,
+                "column": column or 0,
+                "code": code,
+                "message": message,
+            }
+        )
+        + "\n"
+    )
+
+
+class JsonReporter:
+    """pyflakes reporter writing JSON lines"""
+
+    def unexpectedError(self, filename, msg):
+        write(filename, 0, 0, "E902", str(msg))
+
+    def syntaxError(self, filename, msg, lineno, offset, text):
+        write(filename, lineno, (offset or 1) - 1, "E999", msg)
+
+    def flake(self, message):
+        code = CODES.get(message.__class__.__name__, "F000")
+        write(
+            message.filename,
+            message.lineno,
+            getattr(message, "col", 0),
+            code,
+            message.message % message.message_args,
+        )
+
+
+def main():
+    """Check the files of the command line"""
+    from pyflakes import api
+
+    reporter = JsonReporter()
+    args = sys.argv[1:]
+    if args and args[0] == "--stdin":
+        source = sys.stdin.buffer.read().decode("utf-8", "replace")
+        api.check(source, args[1], reporter)
+        return
+    for path in args:
+        api.checkPath(path, reporter)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+""" Lines changed since git HEAD, used by the "Changed lines" scope"""
+
+import bisect
+import os
+import re
+
+from ..pyzoShared.discovery import git
+
+# @@ -start[,count] +start[,count] @@
+HUNK = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+# Untracked files are new from the first to the last line
+WHOLE_FILE = (1, 2 ** 31 - 1)
+
+# The escapes of a C-quoted file name other than octal bytes
+C_ESCAPES = {
+    "a": 7, "b": 8, "t": 9, "n": 10, "v": 11, "f": 12, "r": 13,
+    '"': 34, "\\": 92,
+}
+
+
+class IntervalIndex:
+    """ IntervalIndex holds line ranges, merged and sorted, so a line
+    is looked up with a binary search
+    """
+
+    def __init__(self, ranges=()):
+        self.starts = []
+        self.ends = []
+        for start, end in sorted(ranges):
+            if self.ends and start <= self.ends[-1] + 1:
+                self.ends[-1] = max(self.ends[-1], end)
+            else:
+                self.starts.append(start)
+                self.ends.append(end)
+
+    def __contains__(self, line):
+        i = bisect.bisect_right(self.starts, line) - 1
+        return i >= 0 and line <= self.ends[i]
+
+    def __len__(self):
+        return len(self.starts)
+
+
+def unquote_path(name):
+    """ unquote_path(name)
+    Get a file name of a diff header. git ends a name with a space
+    with a tab, and quotes a name with special characters like a C
+    string, its bytes may be written as octal escapes.
+    """
+    if name.endswith("\t"):
+        name = name[:-1]
+    if len(name) < 2 or name[0] != '"' or name[-1] != '"':
+        return name
+    text = name[1:-1]
+    data = bytearray()
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\" and i + 1 < len(text):
+            char = text[i + 1]
+            if char in "01234567":
+                data.append(int(text[i + 1:i + 4], 8) & 0xFF)
+                i += 4
+                continue
+            data.append(C_ESCAPES.get(char, ord(char) & 0xFF))
+            i += 2
+            continue
+        data.extend(char.encode("utf-8"))
+        i += 1
+    return data.decode("utf-8", "replace")
+
+
+def git_files(args, cwd):
+    """ git_files(args, cwd)
+    Run a git command that lists files, args should ask for names
+    separated by NUL. Returns the names or None if git failed.
+    """
+    output = git(args, cwd)
+    if output is None:
+        return None
+    return [name for name in output.split("\0") if name]
+
+
+def parse_diff(text, root):
+    """ parse_diff(text, root)
+    Get the added and changed line ranges per file of a unified diff
+    made with -U0, returns path -> [(first, last), ...]
+    """
+    ranges = {}
+    path = None
+    for line in text.splitlines():
+        if line.startswith("+++ "):
+            name = unquote_path(line[4:])
+            if name == "/dev/null":
+                path = None  # deleted file
+            else:
+                if name.startswith("b/"):
+                    name = name[2:]
+                path = os.path.normpath(os.path.join(root, name))
+                ranges.setdefault(path, [])
+            continue
+        match = HUNK.match(line)
+        if match is None or path is None:
+            continue
+        start = int(match.group(1))
+        count = 1 if match.group(2) is None else int(match.group(2))
+        # count 0 is a pure deletion, no line of the new file changed
+        if count:
+            ranges[path].append((start, start + count - 1))
+    return ranges
+
+
+def changed_lines(root):
+    """ changed_lines(root)
+    Get the lines of python files changed since HEAD, committed or not,
+    untracked files count as changed. Returns path -> IntervalIndex,
+    None if root is not in a git repository.
+    """
+    diff = git(
+        ["diff", "-U0", "--no-color", "--no-ext-diff", "HEAD", "--", "*.py"],
+        root,
+    )
+    if diff is None:
+        # No commit yet, everything is new
+        diff = ""
+        new_files = git_files(["ls-files", "-z", "--", "*.py"], root)
+        if new_files is None:
+            return None
+    else:
+        new_files = []
+    untracked = git_files(
+        ["ls-files", "-z", "--others", "--exclude-standard", "--", "*.py"],
+        root,
+    )
+    if untracked:
+        new_files.extend(untracked)
+
+    ranges = parse_diff(diff, root)
+    for name in new_files:
+        ranges[os.path.normpath(os.path.join(root, name))] = [WHOLE_FILE]
+    return {
+        path: IntervalIndex(lines)
+        for path, lines in ranges.items()
+        if lines and os.path.isfile(path)
+    }
@@ -0,0 +1,253 @@
+""" Lint history of pyzoLinter stored in a SQLite database
+
+The messages of a file are stored once per file content (result), a
+run only refers to the results of its files. Comparing two runs only
+looks at the files whose result differs.
+"""
+
+import collections
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from .cache import rating
+from .engines import category
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    statements INTEGER NOT NULL,
+    rating REAL NOT NULL,
+    UNIQUE (file_id, key)
+);
+CREATE TABLE IF NOT EXISTS messages (
+    result_id INTEGER NOT NULL,
+    line INTEGER NOT NULL,
+    col INTEGER NOT NULL,
+    msg_id TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_result ON messages (result_id);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    scope TEXT NOT NULL,
+    target TEXT NOT NULL,
+    rating REAL NOT NULL,
+    statements INTEGER NOT NULL,
+    num_c INTEGER NOT NULL,
+    num_r INTEGER NOT NULL,
+    num_w INTEGER NOT NULL,
+    num_e INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_target ON runs (target, id);
+CREATE TABLE IF NOT EXISTS run_files (
+    run_id INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    result_id INTEGER NOT NULL,
+    PRIMARY KEY (run_id, file_id)
+);
+CREATE INDEX IF NOT EXISTS run_files_file ON run_files (file_id, run_id);
+"""
+
+Run = collections.namedtuple(
+    "Run",
+    "id started scope target rating statements num_c num_r num_w num_e",
+)
+
+
+def result_stats(entry):
+    """returns the statistics of one file, as used by rating()"""
+    stats = {"statements": entry["statements"]}
+    for message in entry["messages"]:
+        letter = category(message[2])
+        stats[letter] = stats.get(letter, 0) + 1
+    return stats
+
+
+class History:
+    """History stores lint runs and answers trend and diff queries"""
+
+    def __init__(self, path):
+        self.path = path
+        # The tool folder does not exist before the first run
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.executescript(SCHEMA)
+        self._file_ids = {}
+
+    def close(self):
+        """closes the database"""
+        self._db.close()
+
+    def _file_id(self, path):
+        if path not in self._file_ids:
+            self._db.execute(
+                "INSERT OR IGNORE INTO files (path) VALUES (?)", (path,)
+            )
+            row = self._db.execute(
+                "SELECT id FROM files WHERE path = ?", (path,)
+            ).fetchone()
+            self._file_ids[path] = row[0]
+        return self._file_ids[path]
+
+    def _result_id(self, file_id, entry):
+        key = entry.get("key")
+        if not key:
+            key = hashlib.sha1(
+                json.dumps(entry["messages"]).encode("utf-8")
+            ).hexdigest()
+        row = self._db.execute(
+            "SELECT id FROM results WHERE file_id = ? AND key = ?",
+            (file_id, key),
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        cursor = self._db.execute(
+            "INSERT INTO results (file_id, key, statements, rating) "
+            "VALUES (?, ?, ?, ?)",
+            (file_id, key, entry["statements"], rating(result_stats(entry))),
+        )
+        result_id = cursor.lastrowid
+        self._db.executemany(
+            "INSERT INTO messages (result_id, line, col, msg_id, message) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [
+                (result_id, line, col, msg_id, msg)
+                for line, col, msg_id, msg in entry["messages"]
+            ],
+        )
+        return result_id
+
+    def add_run(self, scope, target, results, stats):
+        """ add_run(scope, target, results, stats)
+        Store a run, results is path -> cache entry. Messages are only
+        stored for file contents that were not seen before.
+        Returns the run id.
+        """
+        with self._db:
+            cursor = self._db.execute(
+                "INSERT INTO runs (started, scope, target, rating, "
+                "statements, num_c, num_r, num_w, num_e) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    time.time(),
+                    scope,
+                    target,
+                    rating(stats),
+                    stats.get("statements", 0),
+                    stats.get("C", 0),
+                    stats.get("R", 0),
+                    stats.get("W", 0),
+                    stats.get("E", 0),
+                ),
+            )
+            run_id = cursor.lastrowid
+            rows = []
+            for path, entry in results.items():
+                file_id = self._file_id(path)
+                rows.append((run_id, file_id, self._result_id(file_id, entry)))
+            self._db.executemany(
+                "INSERT INTO run_files (run_id, file_id, result_id) "
+                "VALUES (?, ?, ?)",
+                rows,
+            )
+        return run_id
+
+    def run(self, run_id):
+        """returns a run by id"""
+        row = self._db.execute(
+            "SELECT * FROM runs WHERE id = ?", (run_id,)
+        ).fetchone()
+        return Run(*row) if row else None
+
+    def previous_run(self, run_id):
+        """returns the run before run_id of the same target"""
+        row = self._db.execute(
+            "SELECT * FROM runs WHERE target = (SELECT target FROM runs "
+            "WHERE id = ?) AND id < ? ORDER BY id DESC LIMIT 1",
+            (run_id, run_id),
+        ).fetchone()
+        return Run(*row) if row else None
+
+    def runs(self, target, limit=100):
+        """returns the last runs of a target, newest first"""
+        rows = self._db.execute(
+            "SELECT * FROM runs WHERE target = ? ORDER BY id DESC LIMIT ?",
+            (target, limit),
+        ).fetchall()
+        return [Run(*row) for row in rows]
+
+    def file_trend(self, path, limit=20):
+        """ file_trend(path, limit=20)
+        returns [(started, rating), ...] of a file, oldest first
+        """
+        rows = self._db.execute(
+            "SELECT runs.started, results.rating FROM run_files "
+            "JOIN files ON files.id = run_files.file_id "
+            "JOIN runs ON runs.id = run_files.run_id "
+            "JOIN results ON results.id = run_files.result_id "
+            "WHERE files.path = ? ORDER BY run_files.run_id DESC LIMIT ?",
+            (path, limit),
+        ).fetchall()
+        return rows[::-1]
+
+    def run_files(self, run_id):
+        """returns [(path, rating), ...] of the files of a run"""
+        return self._db.execute(
+            "SELECT files.path, results.rating FROM run_files "
+            "JOIN files ON files.id = run_files.file_id "
+            "JOIN results ON results.id = run_files.result_id "
+            "WHERE run_files.run_id = ? ORDER BY files.path",
+            (run_id,),
+        ).fetchall()
+
+    def _messages(self, result_id):
+        if result_id is None:
+            return []
+        return self._db.execute(
+            "SELECT line, col, msg_id, message FROM messages "
+            "WHERE result_id = ?",
+            (result_id,),
+        ).fetchall()
+
+    def diff(self, run_id, previous_id):
+        """ diff(run_id, previous_id)
+        Compare two runs, returns (new, fixed) as lists of
+        (path, line, msg_id, message). Messages are matched on code
+        and text, so moved lines are not reported.
+        """
+        rows = self._db.execute(
+            "SELECT files.path, cur.result_id, prev.result_id "
+            "FROM run_files AS cur "
+            "JOIN files ON files.id = cur.file_id "
+            "LEFT JOIN run_files AS prev "
+            "ON prev.run_id = ? AND prev.file_id = cur.file_id "
+            "WHERE cur.run_id = ? "
+            "AND (prev.result_id IS NULL OR prev.result_id != cur.result_id)",
+            (previous_id, run_id),
+        ).fetchall()
+        new = []
+        fixed = []
+        for path, result_id, previous_result_id in rows:
+            current = self._messages(result_id)
+            previous = self._messages(previous_result_id)
+            counts = collections.Counter((m[2], m[3]) for m in previous)
+            for line, _col, msg_id, message in current:
+                if counts[(msg_id, message)] > 0:
+                    counts[(msg_id, message)] -= 1
+                else:
+                    new.append((path, line, msg_id, message))
+            for line, _col, msg_id, message in previous:
+                if counts[(msg_id, message)] > 0:
+                    counts[(msg_id, message)] -= 1
+                    fixed.append((path, line, msg_id, message))
+        return new, fixed
@@ -0,0 +1,97 @@
+""" Lint jobs of pyzoLinter
+
+One job runs at a time. A new job of the same scope replaces the
+waiting and the running one of that scope. A job with a higher priority
+stops a running job with a lower priority, which waits to be run again
+(the files it already linted are cached). Each started job gets a new
+generation, output of an older generation is dropped.
+"""
+
+# Higher runs first
+PRIORITIES = {
+    "Current document": 2,
+    "Current document directory": 1,
+    "Changed lines": 1,
+    "Project": 0,
+    "Open files": -1,
+}
+
+
+class Job:
+    """A request to lint a scope"""
+
+    def __init__(self, scope, path, source=None):
+        self.scope = scope
+        # File of the current editor when the job was made
+        self.path = path
+        # Unsaved text of path
+        self.source = source
+        self.priority = PRIORITIES.get(scope, 0)
+        # Order of the requests, older jobs of a priority run first
+        self.order = 0
+        # Set when the job starts
+        self.generation = 0
+
+
+class JobQueue:
+    """ JobQueue runs jobs one at a time by priority.
+    run(job) starts a job, cancel(job) stops the running job.
+    """
+
+    def __init__(self, run, cancel):
+        self._run = run
+        self._cancel = cancel
+        self._waiting = []
+        self._order = 0
+        self.generation = 0
+        self.running = None
+
+    def submit(self, job):
+        """ submit(job)
+        Queue a job, it replaces the jobs of the same scope
+        """
+        self._order += 1
+        job.order = self._order
+        self._waiting = [j for j in self._waiting if j.scope != job.scope]
+        running = self.running
+        if running is not None:
+            if running.scope == job.scope:
+                self._stop()
+            elif job.priority > running.priority:
+                self._stop()
+                self._waiting.append(running)
+        self._waiting.append(job)
+        self._next()
+
+    def _stop(self):
+        job, self.running = self.running, None
+        self.generation += 1  # output still on its way is stale
+        self._cancel(job)
+
+    def _next(self):
+        if self.running is not None or not self._waiting:
+            return
+        job = min(self._waiting, key=lambda j: (-j.priority, j.order))
+        self._waiting.remove(job)
+        self.generation += 1
+        job.generation = self.generation
+        self.running = job
+        self._run(job)
+
+    def finished(self, job):
+        """ finished(job)
+        The job is done, the next one is started
+        """
+        if job is self.running:
+            self.running = None
+            self._next()
+
+    def clear(self):
+        """stops the running job and drops the waiting ones"""
+        self._waiting = []
+        if self.running is not None:
+            self._stop()
+
+    def is_current(self, generation):
+        """returns True if generation is the running job"""
+        return self.running is not None and generation == self.generation
@@ -0,0 +1,99 @@
+""" Streaming decoder for pylint's JSON output"""
+
+import json
+import re
+
+# Characters between the records of a JSON array or of JSON lines
+SEPARATORS = " \t\r\n,[]"
+
+# Values that may be cut by the end of a chunk
+LITERALS = ["true", "false", "null", "NaN", "Infinity", "-Infinity"]
+
+# The end of a number cut after its digits, "1." or "1e+"
+NUMBER_TAIL = re.compile(r"(?:\.|[eE][-+]?)\Z")
+
+# A \uXXXX escape cut by the end of a chunk, the decoder reports it at
+# the u. The second half of a surrogate pair may follow the fourth digit.
+ESCAPE_TAIL = re.compile(r"u[0-9a-fA-F]{0,4}\Z")
+
+
+def incomplete(buffer, error):
+    """ incomplete(buffer, error)
+    Get whether decoding buffer failed with error because the text
+    ended before the object did
+    """
+    if error.msg.startswith("Unterminated string"):
+        return True  # the string runs to the end of buffer
+    rest = buffer[error.pos:]
+    if error.msg.startswith("Invalid \\uXXXX escape"):
+        return bool(ESCAPE_TAIL.match(rest))
+    if error.pos and buffer[error.pos - 1].isdigit():
+        if NUMBER_TAIL.match(rest):
+            return True
+    return not rest.strip() or any(
+        literal.startswith(rest) for literal in LITERALS
+    )
+
+
+class JsonStream:
+    """ JsonStream decodes the objects of a JSON array (ruff) or of
+    JSON lines (pylint, the worker) while the text arrives. An object
+    split over two chunks is decoded once it is complete, other text
+    is skipped.
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+
+    def feed(self, text):
+        """ feed(text)
+        Add text, returns the objects that are complete
+        """
+        buffer = self._buffer + text
+        records = []
+        pos = 0
+        end = len(buffer)
+        while pos < end:
+            if buffer[pos] in SEPARATORS:
+                pos += 1
+                continue
+            if buffer[pos] != "{":
+                # Not pylint output, skip to the next object
+                start = buffer.find("{", pos)
+                if start < 0:
+                    pos = end
+                    break
+                pos = start
+            try:
+                record, pos = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as error:
+                if incomplete(buffer, error):
+                    break  # wait for more text
+                pos += 1  # not an object, skip to the next one
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+        self._buffer = buffer[pos:]
+        return records
+
+    def flush(self):
+        """drops what is left, the stream is done"""
+        self._buffer = ""
+
+
+def record_message(record):
+    """ record_message(record)
+    Get the path and the [line, column, msg_id, msg] of a pylint
+    json record
+    """
+    msg = record.get("message", "")
+    symbol = record.get("symbol")
+    if symbol:
+        msg = "{} ({})".format(msg, symbol)
+    return record.get("path", ""), [
+        record.get("line") or 0,
+        record.get("column") or 0,
+        record.get("message-id", ""),
+        msg,
+    ]
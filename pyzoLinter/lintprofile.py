@@ -0,0 +1,190 @@
+""" Timing of lint runs
+
+RunProfile collects the wall time per phase, per file and per checker
+of a run. In a pylint process install() patches pylint so the time
+spent building astroid modules, per file and in the callbacks of every
+checker is recorded. Run as a script it lints like pylint and writes
+the profile as a JSON object after the messages.
+"""
+
+import functools
+import json
+import os
+import sys
+import time
+
+PROFILE_SCRIPT = os.path.abspath(__file__)
+
+# Key of the JSON object written by a profiled pylint process
+PROFILE_KEY = "pyzo-profile"
+
+# Profile of the pylint run in this process, None when not profiling
+ACTIVE = None
+
+
+class RunProfile:
+    """Seconds per phase, per file and per checker"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.files = {}
+        self.checkers = {}
+
+    def add(self, phase, seconds):
+        """adds seconds to a phase"""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def timer(self, phase):
+        """returns a context manager adding its duration to phase"""
+        return _Timer(self, phase)
+
+    def merge(self, data):
+        """ merge(data)
+        Add the profile of a pylint process, as made by to_dict()
+        """
+        for name in ["phases", "files", "checkers"]:
+            totals = getattr(self, name)
+            for key, seconds in data.get(name, {}).items():
+                totals[key] = totals.get(key, 0.0) + seconds
+
+    def to_dict(self):
+        """returns the profile as a dict that can be dumped as JSON"""
+        return {
+            "phases": dict(self.phases),
+            "files": dict(self.files),
+            "checkers": dict(self.checkers),
+        }
+
+
+class _Timer:
+    def __init__(self, profile, phase):
+        self._profile = profile
+        self._phase = phase
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self._profile.add(self._phase, time.perf_counter() - self._start)
+
+
+def _timed(method, name):
+    """wrap a checker method so its time is added to checker name"""
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            if ACTIVE is not None:
+                seconds = time.perf_counter() - start
+                checkers = ACTIVE.checkers
+                checkers[name] = checkers.get(name, 0.0) + seconds
+
+    return wrapper
+
+
+def install():
+    """ install()
+    Patch pylint to record timings in ACTIVE, patching twice is a no-op
+    """
+    from pylint.lint import PyLinter
+    from pylint.utils.ast_walker import ASTWalker
+
+    if getattr(PyLinter, "_pyzo_profiled", False):
+        return
+    PyLinter._pyzo_profiled = True
+
+    add_checker = ASTWalker.add_checker
+    set_current_module = PyLinter.set_current_module
+    get_ast = PyLinter.get_ast
+    # [file, start] of the file being linted
+    current = [None, 0.0]
+
+    def close_file():
+        if ACTIVE is not None and current[0] is not None:
+            seconds = time.perf_counter() - current[1]
+            ACTIVE.files[current[0]] = (
+                ACTIVE.files.get(current[0], 0.0) + seconds
+            )
+        current[0] = None
+
+    def profiled_add_checker(walker, checker):
+        if ACTIVE is not None:
+            name = getattr(checker, "name", checker.__class__.__name__)
+            for member in dir(checker):
+                if member.startswith(("visit_", "leave_")) or member in (
+                        "process_module",
+                        "process_tokens",
+                ):
+                    method = getattr(checker, member, None)
+                    if callable(method):
+                        setattr(checker, member, _timed(method, name))
+        return add_checker(walker, checker)
+
+    def profiled_set_current_module(linter, modname, filepath=None):
+        close_file()
+        if ACTIVE is not None and "pylint startup" not in ACTIVE.phases:
+            # Options and checkers are ready when the first file starts
+            ACTIVE.add("pylint startup", time.perf_counter() - ACTIVE.started)
+        if filepath:
+            current[0] = filepath
+            current[1] = time.perf_counter()
+        return set_current_module(linter, modname, filepath)
+
+    def profiled_get_ast(linter, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return get_ast(linter, *args, **kwargs)
+        finally:
+            if ACTIVE is not None:
+                ACTIVE.add("astroid", time.perf_counter() - start)
+
+    ASTWalker.add_checker = profiled_add_checker
+    PyLinter.set_current_module = profiled_set_current_module
+    PyLinter.get_ast = profiled_get_ast
+    PyLinter._pyzo_close_file = staticmethod(close_file)
+
+
+def start():
+    """start profiling a pylint run in this process"""
+    global ACTIVE
+    install()
+    ACTIVE = RunProfile()
+    return ACTIVE
+
+
+def stop():
+    """ stop()
+    Stop profiling, returns the profile with the time spent in checkers
+    as the "checks" phase
+    """
+    global ACTIVE
+    from pylint.lint import PyLinter
+
+    PyLinter._pyzo_close_file()
+    profile, ACTIVE = ACTIVE, None
+    profile.add("checks", sum(profile.checkers.values()))
+    return profile
+
+
+def main():
+    """Run pylint with the arguments of the command line and profile it"""
+    profile = start()
+    from worker import run_pylint
+
+    code = run_pylint(sys.argv[1:])
+    profile = stop()
+    profile.add("pylint", time.perf_counter() - profile.started)
+    sys.stdout.write("\n" + json.dumps({PROFILE_KEY: profile.to_dict()}))
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
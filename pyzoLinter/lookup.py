@@ -0,0 +1,98 @@
+""" Discovery and cache lookup of pyzoLinter in a thread
+
+Before a run the files of the scope are found and the key of every
+file is made: the file and the local modules it imports are read and
+parsed, and pylint is asked for its version the first time. For a
+project this is too slow for the GUI thread, so CacheLookup does it in
+a thread and emits done with the files that are cached and the ones
+that have to be linted, or failed when the files could not be read. A
+lookup stops as soon as a newer one starts.
+"""
+
+import collections
+import threading
+import time
+
+from pyzo.util.qt import QtCore
+
+from .cache import RunKeys
+
+# The files of a run in the order they were found, the cached
+# {path: entry}, the {path: key} and {path: statements} of the files to
+# lint and the seconds it took to find the files
+LookupResult = collections.namedtuple(
+    "LookupResult", ["files", "cached", "linted", "statements", "discovery"]
+)
+
+
+class CacheLookup(QtCore.QObject):
+    """Finds the files of a run and looks them up in a LintCache"""
+
+    # Emitted on the GUI thread with the generation of the run and its
+    # LookupResult
+    done = QtCore.Signal(int, object)
+    # Emitted instead of done with the generation and the error
+    failed = QtCore.Signal(int, str)
+
+    def __init__(self, cache, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.cache = cache
+        self.generation = None
+        # One lookup at a time, discovery writes its listings to disk
+        self._lock = threading.Lock()
+
+    def start(self, generation, files, sources, start_dir, pylint_exe):
+        """ start(generation, files, sources, start_dir, pylint_exe)
+        Look up files in a thread. files is a list, or a function that
+        returns the list in the thread. sources is path -> unsaved text
+        of a file.
+        """
+        self.generation = generation
+        thread = threading.Thread(
+            target=self._run,
+            args=(generation, files, dict(sources), start_dir, pylint_exe),
+            name="pyzoLinter lookup",
+            daemon=True,
+        )
+        thread.start()
+
+    def _run(self, generation, *args):
+        try:
+            with self._lock:
+                result = self._lookup(generation, *args)
+        except Exception as err:  # the run must not wait forever
+            error = "{}: {}".format(type(err).__name__, err)
+            self._emit(self.failed, generation, error)
+            return
+        if result is not None:
+            self._emit(self.done, generation, result)
+
+    def _emit(self, signal, generation, value):
+        try:
+            signal.emit(generation, value)
+        except RuntimeError:
+            pass  # the linter was closed
+
+    def _lookup(self, generation, files, sources, start_dir, pylint_exe):
+        if generation != self.generation:
+            return None  # a newer run started
+        started = time.perf_counter()
+        if callable(files):
+            files = files()
+        discovery = time.perf_counter() - started
+        environment = self.cache.environment(start_dir, pylint_exe)
+        keys = RunKeys(environment, start_dir)
+        cached = {}
+        linted = {}
+        statements = {}
+        for path in files:
+            if generation != self.generation:
+                return None
+            key = keys.key(path, sources.get(path))
+            entry = self.cache.get(path, key)
+            if entry is None:
+                linted[path] = key
+                statements[path] = keys.statements[path]
+            else:
+                cached[path] = entry
+        return LookupResult(files, cached, linted, statements, discovery)
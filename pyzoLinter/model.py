@@ -0,0 +1,217 @@
+""" Issue list of the linter, a columnar store behind a Qt model"""
+
+import os
+from array import array
+
+from pyzo.util.qt import QtCore
+
+from .engines import category
+
+COLUMNS = ["Description", "File", "Code", "Line", "Column"]
+
+# Categories shown by each filter
+CATEGORIES = {
+    "All": b"CRWE",
+    "Convention": b"C",
+    "Refactor": b"R",
+    "Warning": b"W",
+    "Error": b"E",
+}
+
+
+class IssueStore:
+    """ IssueStore keeps the messages in flat arrays, file names,
+    codes and message texts are stored once and referred to by index.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self, root=""):
+        """removes all messages, file names are shown relative to root"""
+        self.root = root
+        self.paths = []
+        self.names = []
+        self.codes = []
+        self.texts = []
+        self._interned = ({}, {}, {})
+        self.file = array("i")
+        self.line = array("i")
+        self.column = array("i")
+        self.code = array("i")
+        self.message = array("i")
+        self.category = bytearray()
+
+    def __len__(self):
+        return len(self.line)
+
+    def _intern(self, table, values, value):
+        index = table.get(value)
+        if index is None:
+            index = table[value] = len(values)
+            values.append(value)
+        return index
+
+    def append(self, path, line, column, msg_id, msg):
+        """ append(path, line, column, msg_id, msg)
+        Add a message
+        """
+        files, codes, texts = self._interned
+        index = files.get(path)
+        if index is None:
+            index = files[path] = len(self.paths)
+            self.paths.append(path)
+            if self.root:
+                self.names.append(os.path.relpath(path, self.root))
+            else:
+                self.names.append(os.path.basename(path))
+        self.file.append(index)
+        self.line.append(line)
+        self.column.append(column)
+        self.code.append(self._intern(codes, self.codes, msg_id))
+        self.message.append(self._intern(texts, self.texts, msg))
+        self.category.append(ord(category(msg_id)))
+
+    def sort_keys(self, column):
+        """returns the values of a column to sort on"""
+        if column == 0:
+            return [self.texts[i] for i in self.message]
+        if column == 1:
+            return [self.names[i] for i in self.file]
+        if column == 2:
+            return [self.codes[i] for i in self.code]
+        if column == 3:
+            return self.line
+        return self.column
+
+
+class IssueModel(QtCore.QAbstractTableModel):
+    """ IssueModel shows an IssueStore as a flat list.
+    Rows added to the store become visible on flush(), sorting is done
+    here on the arrays instead of by the proxy one comparison at a time.
+    The table model keeps index() and parent() in C++, the proxy calls
+    them for every row.
+    """
+
+    def __init__(self, parent=None):
+        QtCore.QAbstractTableModel.__init__(self, parent)
+        self.store = IssueStore()
+        # Row -> position in the store
+        self.order = array("i")
+        self._sort_column = -1
+        self._sort_order = QtCore.Qt.AscendingOrder
+
+    def clear(self, root=""):
+        """removes all messages, file names are shown relative to root"""
+        self.beginResetModel()
+        self.store.clear(root)
+        self.order = array("i")
+        self.endResetModel()
+
+    def flush(self):
+        """ flush()
+        Show the messages added to the store since the last flush
+        """
+        first = len(self.order)
+        last = len(self.store) - 1
+        if last < first:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), first, last)
+        self.order.extend(range(first, last + 1))
+        self.endInsertRows()
+
+    def record(self, index):
+        """returns the position in the store of a model index"""
+        return self.order[index.row()]
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.order)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return len(COLUMNS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if (
+                orientation == QtCore.Qt.Horizontal
+                and role == QtCore.Qt.DisplayRole
+        ):
+            return COLUMNS[section]
+        return None
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole or not index.isValid():
+            return None
+        store = self.store
+        i = self.order[index.row()]
+        column = index.column()
+        if column == 0:
+            return store.texts[store.message[i]]
+        if column == 1:
+            return store.names[store.file[i]]
+        if column == 2:
+            return store.codes[store.code[i]]
+        if column == 3:
+            return str(store.line[i])
+        return str(store.column[i])
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        """ sort(column, order)
+        Sort all rows in one pass over the column array
+        """
+        self._sort_column = column
+        self._sort_order = order
+        if column < 0 or not self.order:
+            return
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        records = [self.order[index.row()] for index in persistent]
+
+        keys = self.store.sort_keys(column)
+        self.order = array(
+            "i",
+            sorted(
+                range(len(self.order)),
+                key=keys.__getitem__,
+                reverse=order == QtCore.Qt.DescendingOrder,
+            ),
+        )
+
+        rows = {record: row for row, record in enumerate(self.order)}
+        self.changePersistentIndexList(
+            persistent,
+            [
+                self.index(rows[record], index.column())
+                for record, index in zip(records, persistent)
+            ],
+        )
+        self.layoutChanged.emit()
+
+    def resort(self):
+        """sort again, rows flushed since the last sort are unsorted"""
+        self.sort(self._sort_column, self._sort_order)
+
+
+class IssueFilter(QtCore.QSortFilterProxyModel):
+    """ IssueFilter shows the messages of the selected categories,
+    sorting is passed on to the source model.
+    """
+
+    def __init__(self, parent=None):
+        QtCore.QSortFilterProxyModel.__init__(self, parent)
+        self._categories = CATEGORIES["All"]
+
+    def set_categories(self, categories):
+        """shows only messages of the given categories"""
+        if categories != self._categories:
+            self._categories = categories
+            # One layout change instead of a removal per hidden range
+            self.invalidate()
+
+    def filterAcceptsRow(self, row, parent):
+        source = self.sourceModel()
+        return source.store.category[source.order[row]] in self._categories
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        self.sourceModel().sort(column, order)
@@ -0,0 +1,42 @@
+""" pylint reporter of pyzoLinter
+
+pylint loads it with --output-format=pyzo_json_lines.JsonLinesReporter
+when this folder is on the python path. It writes each message as a
+JSON line as soon as it is found, with the fields of pylint's json
+reporter, so the linter shows the messages while pylint runs. The
+folder holds nothing else, pylint finds no other modules through it.
+"""
+
+import json
+
+from pylint.reporters import BaseReporter
+
+
+class JsonLinesReporter(BaseReporter):
+    """Writes a JSON line per message"""
+
+    name = "pyzo-json-lines"
+    extension = "json"
+
+    def handle_message(self, msg):
+        self.writeln(
+            json.dumps(
+                {
+                    "type": msg.category,
+                    "module": msg.module,
+                    "obj": msg.obj,
+                    "line": msg.line,
+                    "column": msg.column,
+                    "path": msg.path,
+                    "symbol": msg.symbol,
+                    "message": msg.msg or "",
+                    "message-id": msg.msg_id,
+                }
+            )
+        )
+
+    def display_reports(self, layout):
+        pass
+
+    def _display(self, layout):
+        pass
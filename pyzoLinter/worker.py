@@ -0,0 +1,230 @@
+""" Long-lived pylint worker for pyzoLinter
+
+Run as a script by the linter. It reads requests as JSON lines from
+stdin, lints the files in this process and writes the messages to
+stdout as JSON lines, followed by a line "DONE <id>", or "DONE <id>
+FAILED" when pylint did not lint the files. A request
+with "profile" also gets the timings of lintprofile. Modules parsed by
+astroid stay in memory between requests, only modules whose file
+changed are dropped. Unsaved text of a file can be sent along, it is
+linted as if it was read from stdin.
+"""
+
+import inspect
+import io
+import json
+import os
+import sys
+import time
+import traceback
+
+DONE = "@@pyzoLinter-done"
+FAILED = "failed"
+
+# Folder of the reporter module pylint loads to write JSON lines
+REPORTER_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "reporter"
+)
+
+
+def file_stamp(path):
+    """returns what is compared to see if a file changed"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def clear_inference_caches():
+    """Drop inference results that may refer to dropped modules"""
+    try:
+        from pylint.checkers.clear_lru_cache import clear_lru_caches
+
+        clear_lru_caches()
+    except ImportError:
+        pass
+    try:
+        from astroid.context import _invalidate_cache
+
+        _invalidate_cache()
+    except ImportError:
+        pass
+    try:
+        from astroid.inference_tip import clear_inference_tip_cache
+
+        clear_inference_tip_cache()
+    except ImportError:
+        pass
+
+
+def strip_output_format(args):
+    """ strip_output_format(args)
+    Drop the options choosing the output format, pylint would replace
+    the reporter of the worker by the one they name
+    """
+    result = []
+    skip = False
+    for arg in args:
+        if skip:
+            skip = False
+        elif arg in ["--output-format", "-f"]:
+            skip = True  # the value is the next argument
+        elif not arg.startswith("--output-format="):
+            result.append(arg)
+    return result
+
+
+def run_pylint(args, reporter=None):
+    """ run_pylint(args, reporter=None)
+    Run pylint in this process, it does not exit when done. Returns
+    the exit code pylint would have exited with.
+    """
+    from pylint.lint import Run
+
+    kwargs = {}
+    if reporter is not None:
+        kwargs["reporter"] = reporter
+    # pylint < 2.5 names the argument do_exit
+    if "exit" in inspect.signature(Run.__init__).parameters:
+        kwargs["exit"] = False
+    else:
+        kwargs["do_exit"] = False
+    try:
+        run = Run(args, **kwargs)
+    except SystemExit as err:
+        return err.code if isinstance(err.code, int) else 1
+    return run.linter.msg_status
+
+
+def json_lines_reporter():
+    """ json_lines_reporter()
+    Create the reporter that writes each message as a JSON line as
+    soon as it is found
+    """
+    if REPORTER_DIR not in sys.path:
+        sys.path.append(REPORTER_DIR)
+    from pyzo_json_lines import JsonLinesReporter
+
+    return JsonLinesReporter(sys.stdout)
+
+
+class Worker:
+    """Worker lints files and keeps the astroid module cache warm"""
+
+    def __init__(self):
+        # module file -> stamp of the file the cached module was built from
+        self.stamps = {}
+
+    def invalidate(self, files):
+        """ invalidate(files)
+        Drop cached modules whose file changed since they were built
+        """
+        from astroid import MANAGER
+
+        changed = False
+        for name, module in list(MANAGER.astroid_cache.items()):
+            path = getattr(module, "file", None)
+            if not path or path not in self.stamps:
+                continue
+            if file_stamp(path) != self.stamps[path]:
+                del MANAGER.astroid_cache[name]
+                del self.stamps[path]
+                changed = True
+        if changed:
+            clear_inference_caches()
+
+        # The files to lint are stamped before they are parsed, so
+        # an edit during the run is seen next time
+        for path in files:
+            path = os.path.abspath(path)
+            if path not in self.stamps:
+                self.stamps[path] = file_stamp(path)
+
+    def forget(self, files):
+        """ forget(files)
+        Drop the modules of files, used for modules built from unsaved
+        text that must not be used for the file on disk
+        """
+        from astroid import MANAGER
+
+        paths = set(os.path.abspath(path) for path in files)
+        for name, module in list(MANAGER.astroid_cache.items()):
+            if getattr(module, "file", None) in paths:
+                del MANAGER.astroid_cache[name]
+        for path in paths:
+            self.stamps.pop(path, None)
+        clear_inference_caches()
+
+    def remember(self):
+        """Stamp the modules that were built during the last run"""
+        from astroid import MANAGER
+
+        for module in list(MANAGER.astroid_cache.values()):
+            path = getattr(module, "file", None)
+            if path and path not in self.stamps:
+                self.stamps[path] = file_stamp(path)
+
+    def lint(self, request):
+        """ lint(request)
+        Lint the files of a request, messages are written to stdout.
+        Returns False when pylint failed to lint them.
+        """
+        os.chdir(request.get("cwd") or os.getcwd())
+        files = request["files"]
+        self.invalidate(files)
+        args = strip_output_format(request.get("args", []))
+        stdin = sys.stdin
+        if "source" in request:
+            args.append("--from-stdin")
+            # pylint wants a real text stream it can detach
+            sys.stdin = io.TextIOWrapper(
+                io.BytesIO(request["source"].encode("utf-8")), encoding="utf-8"
+            )
+        args.extend(files)
+        profile = None
+        if request.get("profile"):
+            import lintprofile
+
+            profile = lintprofile.start()
+        try:
+            # pylint sets bit 32 for a usage error
+            ok = not run_pylint(args, json_lines_reporter()) & 32
+        except Exception:  # a crash must not stop the worker
+            traceback.print_exc()
+            ok = False
+        finally:
+            sys.stdin = stdin
+        if profile is not None:
+            profile = lintprofile.stop()
+            profile.add("pylint", time.perf_counter() - profile.started)
+            sys.stdout.write(
+                json.dumps({lintprofile.PROFILE_KEY: profile.to_dict()})
+                + "\n"
+            )
+        if "source" in request:
+            self.forget(files)
+        self.remember()
+        return ok
+
+
+def main():
+    """Serve requests until stdin is closed"""
+    worker = Worker()
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError:
+            continue
+        done = [DONE, str(request.get("id", ""))]
+        if not worker.lint(request):
+            done.append(FAILED)
+        sys.stdout.write(" ".join(done) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,33 @@
 
 # Add sort option
 
+import os
+
 import pyzo
 from pyzo.util.qt import QtCore, QtGui, QtWidgets
-from pyzo import translate
+from pyzo import tools, translate
+
+try:
+    from ..pyzoShared.theme import currentStyle
+except ImportError:
+    # The plugins are in the user tools folder, see pyzoShared
+    tools.__path__.append(os.path.dirname(os.path.dirname(__file__)))
+    from ..pyzoShared.theme import currentStyle
+
+from ..pyzoShared.discovery import project_root
+from .builder import OutlineBuilder, filterItems, itemPath
+from .cache import CachedOutline, OutlineCache
+from .model import SORT_LABELS, OutlineModel
+from .positions import PositionIndex
+from .project import ProjectSymbols
 
 tool_name = translate("pyzoOutline", "Outline")
 tool_summary = "Shows the structure of your source code."
 
+# The rows of the matches of the filter are expanded when there are
+# not more matches than this
+EXPAND_MAX = 200
+
 
 class Navigation:
     def __init__(self):
@@ -33,13 +53,20 @@ class PyzoOutline(QtWidgets.QWidget):
             self._config.showTypes = ["class", "def", "cell", "todo"]
         if not hasattr(self._config, "level"):
             self._config.level = 2
+        # Interpreter that parses the files of the project, "" for the
+        # one running pyzo
+        if not hasattr(self._config, "pythonExe"):
+            self._config.pythonExe = ""
+        # Number of editors whose outline is kept when they are not
+        # current
+        if not hasattr(self._config, "cacheSize"):
+            self._config.cacheSize = 10
+        if getattr(self._config, "sortMode", None) not in SORT_LABELS:
+            self._config.sortMode = "source"
 
         # Keep track of clicks so we can "go back"
         self._nav = {}  # editor-id -> Navigation object
 
-        # Keep track of sorting order
-        self._sort_order = None
-
         # Create buttons for navigation
         self._navbut_back = QtWidgets.QToolButton(self)
         self._navbut_back.setIcon(pyzo.icons.arrow_left)
@@ -64,14 +91,26 @@ class PyzoOutline(QtWidgets.QWidget):
         self._sortbut.setStyleSheet(
             "QToolButton { border: none; padding: 0px; }"
         )
-        self._sortbut.setText("A-z")
-        self._sortbut.setToolTip("Sorted")
-        self._sortbut.clicked.connect(self.onSortPress)
+        self._sortbut.setText(SORT_LABELS[self._config.sortMode])
+        self._sortbut.setToolTip("Sort order")
+        self._sortbut.setPopupMode(self._sortbut.InstantPopup)
+
+        # Create sort menu
+        self._sortbut._menu = QtWidgets.QMenu()
+        self._sortbut.setMenu(self._sortbut._menu)
+        group = QtWidgets.QActionGroup(self._sortbut._menu)
+        for mode, label in SORT_LABELS.items():
+            action = self._sortbut._menu.addAction(label)
+            action.setData(mode)
+            action.setCheckable(True)
+            action.setChecked(mode == self._config.sortMode)
+            group.addAction(action)
+        self._sortbut._menu.triggered.connect(self.onSortMenuTriggered)
 
         # Create button for reload
         self._reload = QtWidgets.QToolButton(self)
         self._reload.setIcon(pyzo.icons.arrow_refresh)
-        self._reload.setToolTip("Not sorted")
+        self._reload.setToolTip("Reload")
         self._reload.clicked.connect(self.onReloadPress)
 
         # # Create icon for slider
@@ -103,18 +142,48 @@ class PyzoOutline(QtWidgets.QWidget):
         self._options._menu = QtWidgets.QMenu()
         self._options.setMenu(self._options._menu)
 
-        # Create tree widget
-        self._tree = QtWidgets.QTreeWidget(self)
+        # Create button for the symbols of the whole project
+        self._projectbut = QtWidgets.QToolButton(self)
+        self._projectbut.setText("Project")
+        self._projectbut.setToolTip("Search the symbols of the project")
+        self._projectbut.setCheckable(True)
+        self._projectbut.toggled.connect(self.onProjectToggled)
+
+        # Create search field, it filters the outline or searches the
+        # symbols of the project
+        self._search = QtWidgets.QLineEdit(self)
+        self._search.setPlaceholderText("Filter")
+        self._search.setClearButtonEnabled(True)
+        self._search.textChanged.connect(self.onSearchChanged)
+
+        # Create list of the symbols of the project
+        self._symbols = QtWidgets.QTreeWidget(self)
+        self._symbols.setHeaderHidden(True)
+        self._symbols.setColumnCount(2)
+        self._symbols.setRootIsDecorated(False)
+        self._symbols.setUniformRowHeights(True)
+        self._symbols.itemClicked.connect(self.onSymbolClick)
+        self._symbols.hide()
+
+        # The index of the symbols of the project, parsed in processes
+        self._project = ProjectSymbols(
+            os.path.join(pyzo.appDataDir, "tools", "pyzoOutline"), self
+        )
+        self._project.updated.connect(self.onProjectUpdated)
+
+        # Create tree view, rows are made when they are expanded
+        self._model = self._newModel()
+        self._tree = QtWidgets.QTreeView(self)
         self._tree.setHeaderHidden(True)
-        self._tree.setSortingEnabled(False)
-        self._tree.itemCollapsed.connect(self.updateStructure)  # keep expanded
-        self._tree.itemClicked.connect(self.onItemClick)
+        self._tree.setUniformRowHeights(True)
+        self._tree.setModel(self._model)
+        self._tree.clicked.connect(self.onItemClick)
+        self._model.rowsInserted.connect(self.onRowsInserted)
+        # The nodes whose row is hidden in the tree
+        self._hiddenNodes = set()
         # set widget stye
-        background = self.getThemeItem(item="editor.text")
-        textcolor = self.getThemeItem(item="syntax.identifier")
-        styleKeys = ["background-color", "color"]
-        styleValues = [background["back"], textcolor["fore"]]
-        self.setWidgetStyleSheet(self._tree, styleKeys, styleValues)
+        self._model.style.applyTo(self._tree)
+        self._model.style.applyTo(self._symbols)
 
         # Create two sizers
         self._sizer1 = QtWidgets.QVBoxLayout(self)
@@ -124,7 +193,9 @@ class PyzoOutline(QtWidgets.QWidget):
 
         # Set layout
         self._sizer1.addLayout(self._sizer2, 0)
+        self._sizer1.addWidget(self._search, 0)
         self._sizer1.addWidget(self._tree, 1)
+        self._sizer1.addWidget(self._symbols, 1)
         # self._sizer2.addWidget(self._sliderIcon, 0)
         self._sizer2.addWidget(self._reload, 0)
         self._sizer2.addWidget(self._sortbut, 0)
@@ -133,6 +204,7 @@ class PyzoOutline(QtWidgets.QWidget):
         self._sizer2.addStretch(1)
         self._sizer2.addWidget(self._slider, 6)
         self._sizer2.addStretch(1)
+        self._sizer2.addWidget(self._projectbut, 0)
         self._sizer2.addWidget(self._options, 0)
         #
         self.setLayout(self._sizer1)
@@ -140,6 +212,22 @@ class PyzoOutline(QtWidgets.QWidget):
         # Init current-file name
         self._currentEditorId = 0
 
+        # The level the tree was expanded to
+        self._expandedLevel = None
+
+        # The outlines of the editors shown before
+        self._cache = OutlineCache(self._config.cacheSize)
+
+        # The items of the last parse, flattened in a worker thread
+        self._builder = OutlineBuilder(self)
+        self._builder.done.connect(self.onSnapshotBuilt)
+        self._snapshot = None
+
+        # The item at each line, to follow the cursor
+        self._positions = PositionIndex()
+        self._cursorEditor = None
+        self._currentLine = 0
+
         # Bind to events
         pyzo.editors.currentChanged.connect(self.onEditorsCurrentChanged)
         pyzo.editors.parserDone.connect(self.updateStructure)
@@ -153,41 +241,6 @@ class PyzoOutline(QtWidgets.QWidget):
         self.onOptionsPress()  # Create menu now
         self.onEditorsCurrentChanged()
 
-    # Style
-    def getThemeItem(self, item="editor.text"):
-        theme = pyzo.themes[pyzo.config.settings.theme.lower()]["data"]
-        for k, v in theme.items():
-            key = k
-            val_dict = {}
-            if key == item:
-                for x in v.split(","):
-                    item = x.split(":")
-                    item_key = item[0].strip()
-                    item_value = item[1].strip()
-                    val_dict[item_key] = item_value
-                break
-        return val_dict
-
-    def setWidgetStyleSheet(self, widget, keys, values):
-        wdg = str(type(widget))
-        wdg = wdg.replace("<class 'PyQt5.QtWidgets.", "").replace("'>", "")
-        t = ""
-        for n in range(len(keys)):
-            t = t + keys[n] + ":" + values[n] + ";"
-        ss = wdg + "{" + t + "}"
-        widget.setStyleSheet(ss)
-        widget.setAutoFillBackground(True)
-
-    def setWidgetTextStyle(self, widget):
-        theme = pyzo.themes[pyzo.config.settings.theme.lower()]["data"]
-        background = self.getThemeItem(item="editor.text")["back"]
-        textcolor = self.getThemeItem(item="editor.text")["fore"]
-        wdg = str(type(widget))
-        wdg = wdg.replace("<class 'PyQt5.QtWidgets.", "").replace("'>", "")
-        ss = wdg + "{background-color:%s; color:%s;}" % (background, textcolor)
-        widget.setStyleSheet(ss)
-        widget.setAutoFillBackground(True)
-
     # ---------
 
     def onOptionsPress(self):
@@ -217,33 +270,147 @@ class PyzoOutline(QtWidgets.QWidget):
         else:
             self._config.showTypes.append(type)
 
-        # Update
-        self.updateStructure()
+        # Hide or show the rows, the model stays as it is
+        self._model.showTypes = self._config.showTypes
+        if self._snapshot is not None:
+            self._positions = PositionIndex(
+                self._snapshot.roots, self._config.showTypes
+            )
+        self._updateHidden()
+        self._model.refresh()
+        self._currentLine = 0
+        self.onCursorPositionChanged()
 
     def onEditorsCurrentChanged(self):
-        """ Notify that the file is being parsed and make
-        sure that not the structure of a previously selected
-        file is shown. """
+        """ Show the outline of the new current editor. The outline it
+        had before is shown at once when its document did not change,
+        else notify that the file is being parsed. """
+
+        # Keep the outline of the previous editor, forget closed ones
+        self._keepOutline()
+        editorIds = set(id(editor) for editor in pyzo.editors)
+        self._cache.size = self._config.cacheSize
+        self._cache.prune(editorIds)
+        for editorId in list(self._nav):
+            if editorId not in editorIds:
+                del self._nav[editorId]
 
-        # Get editor and clear list
+        # Get editor
         editor = pyzo.editors.getCurrentEditor()
-        self._tree.clear()
-
-        if editor is None:
-            # Set editor id
-            self._currentEditorId = 0
+        self._followCursor(editor)
+        self._currentEditorId = id(editor) if editor is not None else 0
 
+        entry = None
         if editor is not None:
-            # Set editor id
-            self._currentEditorId = id(editor)
+            revision = editor.document().revision()
+            entry = self._cache.take(id(editor), revision)
 
+        if entry is not None:
+            self._restoreOutline(editor, entry)
+        else:
+            # Clear list
+            self._setModel(self._newModel())
+            self._snapshot = None
+            self._expandedLevel = None
+            self._positions = PositionIndex()
+            self._currentLine = 0
+
+        if self._projectbut.isChecked():
+            self._updateProject()
+
+        if editor is not None and entry is None:
             # Notify
             text = translate("pyzoOutline", "Parsing ") + editor._name + " ..."
-            QtWidgets.QTreeWidgetItem(self._tree, [text])
+            self._model.clear(text)
 
             # Try getting the  structure right now
             self.updateStructure()
 
+    def _newModel(self):
+        """ _newModel()
+        Make an empty model in the style of the theme
+        """
+        model = OutlineModel(self)
+        model.currentBrush = QtGui.QBrush(QtGui.QColor("#CCC"))
+        model.style = currentStyle()
+        model.showTypes = self._config.showTypes
+        model.sortMode = self._config.sortMode
+        return model
+
+    def _setModel(self, model):
+        """ _setModel(model)
+        Show the rows of model, the previous model is deleted unless
+        it is kept in the cache
+        """
+        if model is self._model:
+            return
+        old, self._model = self._model, model
+        selection = self._tree.selectionModel()
+        self._tree.setModel(model)
+        self._hiddenNodes = set()
+        if selection is not None:
+            selection.deleteLater()
+        old.rowsInserted.disconnect(self.onRowsInserted)
+        model.rowsInserted.connect(self.onRowsInserted)
+        if not self._cache.holds(old):
+            old.deleteLater()
+
+    def _keepOutline(self):
+        """ _keepOutline()
+        Put the outline of the current editor in the cache, with the
+        expanded rows and the scroll position
+        """
+        editor = self._cursorEditor
+        if editor is None or self._snapshot is None:
+            return
+        if id(editor) != self._currentEditorId:
+            return
+        try:
+            revision = editor.document().revision()
+        except RuntimeError:
+            return  # the editor was closed
+        entry = CachedOutline(
+            self._model, self._snapshot, self._positions, revision
+        )
+        entry.level = self._expandedLevel
+        entry.scroll = self._tree.verticalScrollBar().value()
+        entry.expanded = [
+            node
+            for node in self._model.fetchedNodes()
+            if self._tree.isExpanded(self._model.nodeIndex(node))
+        ]
+        self._cache.put(id(editor), entry)
+
+    def _restoreOutline(self, editor, entry):
+        """ _restoreOutline(editor, entry)
+        Show the outline of an editor as it was left
+        """
+        self._setModel(entry.model)
+        model = self._model
+        if model.sortMode != self._config.sortMode:
+            model.setSortMode(self._config.sortMode)
+        self._snapshot = entry.snapshot
+        self._positions = entry.positions
+        if entry.snapshot.showTypes != self._config.showTypes:
+            self._positions = PositionIndex(
+                entry.snapshot.roots, self._config.showTypes
+            )
+        self._expandedLevel = entry.level
+        self._setFilter(entry.snapshot)
+        self._updateHidden()
+        self._model.refresh()
+        for node in entry.expanded:
+            if model.isAlive(node):
+                self._tree.expand(model.nodeIndex(node))
+        self._tree.verticalScrollBar().setValue(entry.scroll)
+
+        if entry.level != self._showLevel():
+            # The level to show changed since
+            self._showSnapshot(editor, entry.snapshot)
+        else:
+            self._currentLine = 0
+            self.onCursorPositionChanged()
+
     def _getCurrentNav(self):
         if not self._currentEditorId:
             return None
@@ -269,14 +436,18 @@ class PyzoOutline(QtWidgets.QWidget):
         if old_linenr is not None:
             nav.back.append(old_linenr)
 
-    def onItemClick(self, item):
+    def onItemClick(self, index):
         """ Go to the right line in the editor and give focus. """
 
+        node = self._model.nodeFromIndex(index)
+        if node.object is None:
+            return
+
         # If item is attribute, get parent
-        if not item.linenr:
-            item = item.parent()
+        if not node.linenr:
+            node = node.parent
 
-        old_linenr = self._navigate_to_line(item.linenr)
+        old_linenr = self._navigate_to_line(node.linenr)
 
         if old_linenr is not None:
             nav = self._getCurrentNav()
@@ -317,140 +488,326 @@ class PyzoOutline(QtWidgets.QWidget):
         if id0 != id1 or id0 != id2:
             return
 
+        # The items of the parse are made in a worker thread
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.result is result:
+            self._showSnapshot(editor, snapshot)
+        else:
+            self._builder.build(
+                result, self._config.showTypes, self._snapshot
+            )
+
+    def onSnapshotBuilt(self, snapshot):
+        """ Show the items of a parse when it is still the current one. """
+        editor = pyzo.editors.getCurrentEditor()
+        if not editor or pyzo.parser._getResult() is not snapshot.result:
+            return  # a newer parse is on its way
+
+        # Do the ids match?
+        result = snapshot.result
+        id0, id1, id2 = self._currentEditorId, id(editor), result.editorId
+        if id0 != id1 or id0 != id2:
+            return
+
+        # The same items as shown, for a document that did not change
+        previous = self._snapshot
+        if (
+            previous is not None
+            and snapshot.roots is previous.roots
+            and snapshot.showTypes == self._config.showTypes
+            and self._expandedLevel == self._showLevel()
+        ):
+            self._snapshot = snapshot
+            return
+
+        self._snapshot = snapshot
+        self._showSnapshot(editor, snapshot)
+
+    def _showSnapshot(self, editor, snapshot):
+        """ _showSnapshot(editor, snapshot)
+        Update the rows to the items of a parse, only the rows that
+        changed are touched
+        """
+
         # Get current line number and the structure
         ln = editor.textCursor().blockNumber()
         ln += 1  # is ln as in line number area
 
-        # Define colours
-
-        colours = {
-            "cell": self.getThemeItem(item="syntax.python.cellcomment")["fore"],
-            "class": self.getThemeItem(item="syntax.classname")["fore"],
-            "def": self.getThemeItem(item="syntax.functionname")["fore"],
-            "attribute": self.getThemeItem(item="syntax.identifier")["fore"],
-            "import": self.getThemeItem(item="syntax.unterminatedstring")[
-                "fore"
-            ],
-            "todo": self.getThemeItem(item="syntax.todocomment")["fore"],
-            "nameismain": self.getThemeItem(item="syntax.keyword")[
-                "fore"
-            ],  # "#859900",
-        }
-
-        bolds = {
-            "cell": self.getThemeItem(item="syntax.python.cellcomment")["bold"],
-            "class": self.getThemeItem(item="syntax.classname")["bold"],
-            "def": self.getThemeItem(item="syntax.functionname")["bold"],
-            "attribute": self.getThemeItem(item="syntax.identifier")["bold"],
-            "import": self.getThemeItem(item="syntax.unterminatedstring")[
-                "bold"
-            ],
-            "todo": self.getThemeItem(item="syntax.todocomment")["bold"],
-            "nameismain": self.getThemeItem(item="syntax.keyword")[
-                "bold"
-            ],  # "#859900",
-        }
-        # colours = {
-        #     "cell": "#b58900",
-        #     "class": "#cb4b16",
-        #     "def": "#073642",
-        #     "attribute": "#657b83",
-        #     "import": "#268bd2",
-        #     "todo": "#d33682",
-        #     "nameismain": "#859900",
-        # }
-        # colours = {'cell':'#007F00', 'class':'#0000FF', 'def':'#007F7F',
-        #            'attribute':'#444444', 'import':'#8800BB', 'todo':'#FF3333',
-        #            'nameismain':'#007F00'}
+        # Follow the theme, rows get their style when painted
+        style = currentStyle()
+        if style is not self._model.style:
+            self._model.style = style
+            style.applyTo(self._tree)
+            self._tree.viewport().update()
 
         # Define what to show
-        showTypes = self._config.showTypes
+        self._model.showTypes = self._config.showTypes
 
         # Define to what level to show (now is also a good time to save)
-        showLevel = int(self._slider.value())
-        self._config.level = showLevel
-        showLevel = showLevel if showLevel < 5 else 99
-
-        # Define function to set items
-        selectedItem = [None]
-
-        def SetItems(parentItem, fictiveObjects, level):
-            level += 1
-            for object in fictiveObjects:
-                type = object.type
-                if type not in showTypes and type != "nameismain":
-                    continue
-                # Construct text
-                if type == "import":
-                    text = "→ %s (%s)" % (object.name, object.text)
-                elif type == "todo":
-                    text = object.name
-                elif type == "nameismain":
-                    text = object.text
-                elif type == "class":
-                    text = object.name
-                elif type == "def":
-                    text = object.name + "()"
-                elif type == "attribute":
-                    text = "- " + object.name
-                elif type in ("cell", "##", "#%%", "# %%"):
-                    type = "cell"
-                    text = "## " + object.name + " " * 120
-                else:
-                    text = "%s %s" % (type, object.name)
-                # Create item
-                thisItem = QtWidgets.QTreeWidgetItem(parentItem, [text])
-                color = QtGui.QColor(colours[object.type])
-                bold = bolds[object.type]
-                thisItem.setForeground(0, QtGui.QBrush(color))
-                font = thisItem.font(0)
-
-                if bold == "yes":
-                    font.setBold(True)
-                else:
-                    font.setBold(False)
-
-                if type == "cell":
-                    font.setUnderline(True)
-                thisItem.setFont(0, font)
-                thisItem.linenr = object.linenr
-                # Is this the current item?
-                if ln and object.linenr <= ln and object.linenr2 > ln:
-                    selectedItem[0] = thisItem
-                # Any children that we should display?
-                if object.children:
-                    SetItems(thisItem, object.children, level)
-                # Set visibility
-                thisItem.setExpanded(bool(level < showLevel))
+        self._config.level = int(self._slider.value())
+        showLevel = self._showLevel()
+
+        # Existing rows keep their state when the level did not change
+        resetExpanded = showLevel != self._expandedLevel
+        self._expandedLevel = showLevel
 
         # Go
-        self._tree.setUpdatesEnabled(False)
-        self._tree.clear()
-        SetItems(self._tree, result.rootItem.children, 0)
-        self._tree.setUpdatesEnabled(True)
+        self._setFilter(snapshot)
+        self._model.update(snapshot.roots)
+        if snapshot.showTypes == self._model.showTypes:
+            self._positions = snapshot.positions
+        else:
+            self._positions = PositionIndex(
+                snapshot.roots, self._model.showTypes
+            )
+        if resetExpanded:
+            self._expandToLevel(self._model.root.children, showLevel, True)
+        else:
+            self._expandToLevel(self._model.added, showLevel)
+        if self._model.filterIds is not None:
+            self._updateHidden()
 
-        # Handle selected item
-        selectedItem = selectedItem[0]
-        if selectedItem:
-            selectedItem.setBackground(0, QtGui.QBrush(QtGui.QColor("#CCC")))
-            self._tree.scrollToItem(selectedItem)  # ensure visible
+        # Handle selected item, scroll only when it changed
+        self._setCurrentLine(ln)
 
-    def onReloadPress(self):
-        self._tree.setSortingEnabled(False)
-        self.updateStructure()
+    def _filterQuery(self):
+        """ _filterQuery()
+        Get the lowercase text of the search field without spaces, ""
+        when the outline is not filtered
+        """
+        if self._projectbut.isChecked():
+            return ""
+        return "".join(self._search.text().lower().split())
+
+    def _setFilter(self, snapshot):
+        """ _setFilter(snapshot)
+        Let the model know the items of snapshot that match the filter,
+        get the indices of the matches
+        """
+        query = self._filterQuery()
+        if not query or snapshot is None:
+            self._model.filterIds = None
+            return []
+        self._model.filterIds, matches = filterItems(snapshot, query)
+        return matches
+
+    def _updateHidden(self, nodes=None):
+        """ _updateHidden(nodes=None)
+        Hide the rows that are not shown and show the others again. Only
+        the rows of nodes are checked, all rows when nodes is None.
+        """
+        model, tree = self._model, self._tree
+        wasHidden = hidden = self._hiddenNodes
+        if nodes is None:
+            nodes = model.madeNodes()
+            hidden = self._hiddenNodes = set()
+        for node in nodes:
+            if hidden is wasHidden and not model.isAlive(node):
+                hidden.discard(node)
+                continue
+            hide = not model.isShown(node.object)
+            if hide != (node in wasHidden):
+                parentIndex = model.nodeIndex(node.parent)
+                tree.setRowHidden(node.row, parentIndex, hide)
+            if hide:
+                hidden.add(node)
+            else:
+                hidden.discard(node)
+
+    def onRowsInserted(self, parent, first, last):
+        """ Hide the new rows that are not shown. """
+        model = self._model
+        node = model.nodeFromIndex(parent)
+        for child in node.children[first : last + 1]:
+            if not model.isShown(child.object):
+                self._tree.setRowHidden(child.row, parent, True)
+                self._hiddenNodes.add(child)
+
+    def _expandMatches(self, matches):
+        """ _expandMatches(matches)
+        Expand the rows above the matches of the filter, when there are
+        not too many
+        """
+        snapshot = self._snapshot
+        if snapshot is None or not matches or len(matches) > EXPAND_MAX:
+            return
+        model = self._model
+        expanded = set()
+        for i in matches:
+            path = itemPath(snapshot, i)[:-1]
+            node = model.nodeForPath(path) if path else None
+            while node is not None and node not in expanded:
+                expanded.add(node)
+                self._tree.expand(model.nodeIndex(node))
+                node = node.parent if node.parent is not model.root else None
+
+    def _showLevel(self):
+        """ _showLevel()
+        Get the depth the rows are expanded to, from the slider
+        """
+        showLevel = int(self._slider.value())
+        return showLevel if showLevel < 5 else 99
 
-    def onSortPress(self):
-        """ Sort the tree alphabetically. """
+    def _expandToLevel(self, nodes, showLevel, reset=False):
+        """ _expandToLevel(nodes, showLevel, reset=False)
+        Expand the rows above showLevel, their rows are made now. With
+        reset the rows below showLevel are collapsed.
+        """
+        model = self._model
+        for node in nodes:
+            index = model.nodeIndex(node)
+            if node.depth < showLevel:
+                if model.canFetchMore(index):
+                    model.fetchMore(index)
+                self._tree.expand(index)
+            elif reset:
+                self._tree.collapse(index)
+            else:
+                continue
+            self._expandToLevel(node.children, showLevel, reset)
+
+    def _followCursor(self, editor):
+        """ _followCursor(editor)
+        Highlight the row at the cursor of editor when it moves
+        """
+        if self._cursorEditor is not None:
+            try:
+                self._cursorEditor.cursorPositionChanged.disconnect(
+                    self.onCursorPositionChanged
+                )
+            except (TypeError, RuntimeError):
+                pass  # no longer connected or deleted
+        self._cursorEditor = editor
+        if editor is not None:
+            editor.cursorPositionChanged.connect(self.onCursorPositionChanged)
+
+    def onCursorPositionChanged(self):
+        """ Highlight the row of the line of the cursor. """
+        editor = self._cursorEditor
+        if editor is None or id(editor) != self._currentEditorId:
+            return
+        ln = editor.textCursor().blockNumber() + 1
+        if ln != self._currentLine:
+            self._setCurrentLine(ln)
 
-        self._tree.setSortingEnabled(True)
+    def _setCurrentLine(self, ln):
+        """ _setCurrentLine(ln)
+        Highlight the deepest row that holds line ln and scroll to it
+        """
+        self._currentLine = ln
+        model = self._model
+        path = self._positions.find(ln)
+        current = model.nodeForPath(path) if path else None
+        if current is not model.currentNode:
+            model.setCurrent(current)
+            if current is not None:
+                self._tree.scrollTo(model.nodeIndex(current))
+
+    def onReloadPress(self):
+        if self._projectbut.isChecked():
+            self._updateProject()
+            return
+        self._snapshot = None  # flatten the parse again
+        self.updateStructure()
 
-        if self._sort_order in [None, "DSC"]:
-            self._tree.sortItems(0, QtCore.Qt.AscendingOrder)
-            self._sort_order = "ASC"
-            self._sortbut.setText("A-z")
-            self._sortbut.setArrowType(QtCore.Qt.DownArrow)
+    def onProjectToggled(self, checked):
+        """ Show the symbols of the project or the current file. """
+        self._tree.setVisible(not checked)
+        self._symbols.setVisible(checked)
+        if checked:
+            self._search.setPlaceholderText("Search symbols")
+            self._updateProject()
+            self._search.setFocus()
+        else:
+            self._search.setPlaceholderText("Filter")
+        self.onSearchChanged(self._search.text())
 
-        elif self._sort_order == "ASC":
-            self._tree.sortItems(0, QtCore.Qt.DescendingOrder)
-            self._sort_order = "DSC"
-            self._sortbut.setText("Z-a")
+    def _updateProject(self):
+        """ _updateProject()
+        Index the project of the current file, only files that changed
+        since they were indexed are parsed
+        """
+        editor = pyzo.editors.getCurrentEditor()
+        filename = editor.filename if editor is not None else ""
+        if not filename or not os.path.isabs(filename):
+            return  # not saved yet
+        self._project.pythonExe = self._config.pythonExe
+        self._project.setRoot(project_root(os.path.dirname(filename)))
+        self._project.refresh()
+
+    def onProjectUpdated(self):
+        """ Show the symbols found so far. """
+        if self._projectbut.isChecked():
+            self.onSearchChanged(self._search.text())
+
+    def onSearchChanged(self, text):
+        """ Filter the outline, or show the symbols of the project that
+        match text. """
+        if not self._projectbut.isChecked():
+            model = self._model
+            oldIds = model.filterIds
+            matches = self._setFilter(self._snapshot)
+            newIds = model.filterIds
+            if oldIds is None and newIds is None:
+                return
+            # Only the rows of the items that match or not since
+            if oldIds is None:
+                self._updateHidden()
+            elif newIds is None:
+                self._updateHidden(list(self._hiddenNodes))
+            else:
+                objectNodes = model.objectNodes
+                self._updateHidden(
+                    [
+                        objectNodes[objectId]
+                        for objectId in oldIds ^ newIds
+                        if objectId in objectNodes
+                    ]
+                )
+            model.refresh()
+            self._expandMatches(matches)
+            return
+        self._symbols.clear()
+        index = self._project.index
+        if index is None:
+            return
+        if not text.strip():
+            if self._project.busy:
+                status = "Indexing %s ..." % index.root
+            else:
+                status = "%i symbols in %i files" % (
+                    index.count(),
+                    len(index.files),
+                )
+            QtWidgets.QTreeWidgetItem(self._symbols, [status])
+            return
+        style = self._model.style
+        for relpath, kind, qualname, linenr in index.search(text):
+            name = qualname + "()" if kind == "def" else qualname
+            item = QtWidgets.QTreeWidgetItem(
+                self._symbols, [name, "%s:%i" % (relpath, linenr)]
+            )
+            themeItem = "syntax.classname"
+            if kind == "def":
+                themeItem = "syntax.functionname"
+            item.setForeground(0, style.brush(themeItem))
+            item.setFont(0, style.font(themeItem))
+            item.path = os.path.join(index.root, relpath)
+            item.linenr = linenr
+        self._symbols.resizeColumnToContents(0)
+
+    def onSymbolClick(self, item):
+        """ Open the file of the symbol at its line. """
+        if not hasattr(item, "path"):
+            return
+        editor = pyzo.editors.loadFile(item.path)
+        if editor is not None:
+            editor.gotoLine(item.linenr)
+            pyzo.callLater(editor.setFocus)
+
+    def onSortMenuTriggered(self, action):
+        """ Sort the tree in the mode of the action. """
+        mode = action.data()
+        self._config.sortMode = mode
+        self._sortbut.setText(SORT_LABELS[mode])
+        self._model.setSortMode(mode)
@@ -0,0 +1,213 @@
+""" Building the outline off the GUI thread
+
+The fictive objects of a parse are copied into OutlineItem tuples in a
+worker thread: their text is formatted, their children are frozen and
+their lowercase names are indexed for the filter, so the GUI thread
+only compares the new items with the rows it shows.
+Only the last request is built, a request made while the worker is
+busy replaces the one that waits. When the items are the same as those
+of the previous snapshot, as after a parse of a document that did not
+change, the previous items are handed back so nothing has to be shown
+again.
+"""
+
+import collections
+import threading
+
+from pyzo.util.qt import QtCore
+
+from .positions import PositionIndex
+from .symbols import FuzzyMatcher
+
+CELL_TYPES = ("cell", "##", "#%%", "# %%")
+
+# The order of the types when the outline is sorted by kind
+KIND_ORDER = ["class", "def", "attribute", "import", "cell", "todo"]
+
+# A fictive object as shown in the outline, children is a tuple. order
+# is its place in the source, the keys are its sort keys for the names,
+# the kinds and the sizes.
+OutlineItem = collections.namedtuple(
+    "OutlineItem",
+    [
+        "type",
+        "name",
+        "text",
+        "linenr",
+        "linenr2",
+        "children",
+        "order",
+        "nameKey",
+        "kindKey",
+        "sizeKey",
+    ],
+)
+
+# The items of a parse, roots are the top level items and items all of
+# them, parents before their children. parents[i] is the index of the
+# parent of items[i], -1 at the top level. matcher finds the items by
+# their lowercase name and positions the items of showTypes at a line.
+OutlineSnapshot = collections.namedtuple(
+    "OutlineSnapshot",
+    [
+        "result",
+        "roots",
+        "items",
+        "parents",
+        "matcher",
+        "showTypes",
+        "positions",
+    ],
+)
+
+
+def objectText(object):
+    """ objectText(object)
+    Get the text shown for a fictive object
+    """
+    type = object.type
+    if type == "import":
+        return "→ %s (%s)" % (object.name, object.text)
+    elif type == "todo":
+        return object.name
+    elif type == "nameismain":
+        return object.text
+    elif type == "class":
+        return object.name
+    elif type == "def":
+        return object.name + "()"
+    elif type == "attribute":
+        return "- " + object.name
+    elif type in CELL_TYPES:
+        return "## " + object.name + " " * 120
+    else:
+        return "%s %s" % (type, object.name)
+
+
+def flatten(objects):
+    """ flatten(objects)
+    Get (roots, items, parents) of the OutlineItem of each fictive
+    object
+    """
+    items = []
+    parents = []
+    kindRanks = {type: rank for rank, type in enumerate(KIND_ORDER)}
+    kindRanks.update({type: kindRanks["cell"] for type in CELL_TYPES})
+
+    def makeItem(object, parent):
+        i = len(items)
+        items.append(None)
+        parents.append(parent)
+        children = tuple(makeItem(child, i) for child in object.children)
+        type, name = object.type, object.name
+        item = OutlineItem(
+            type,
+            name,
+            objectText(object),
+            object.linenr,
+            object.linenr2,
+            children,
+            i,
+            (name.lower(), i),
+            (kindRanks.get(type, len(KIND_ORDER)), i),
+            (object.linenr - object.linenr2, i),
+        )
+        items[i] = item
+        return item
+
+    roots = tuple(makeItem(object, -1) for object in objects)
+    return roots, items, parents
+
+
+def filterItems(snapshot, query):
+    """ filterItems(snapshot, query)
+    Get (ids, matches): the ids of the items whose name holds the
+    letters of query in order and of their ancestors, and the indices
+    of the items that match
+    """
+    items, parents = snapshot.items, snapshot.parents
+    matches = snapshot.matcher.matches(query)
+    ids = set()
+    for i in matches:
+        while i >= 0 and id(items[i]) not in ids:
+            ids.add(id(items[i]))
+            i = parents[i]
+    return ids, matches
+
+
+def itemPath(snapshot, i):
+    """ itemPath(snapshot, i)
+    Get the items from the top level down to the item at index i
+    """
+    items, parents = snapshot.items, snapshot.parents
+    path = []
+    while i >= 0:
+        path.append(items[i])
+        i = parents[i]
+    return path[::-1]
+
+
+class OutlineBuilder(QtCore.QObject):
+    """ Flattens parser results in a worker thread """
+
+    # Emitted with the OutlineSnapshot of a result, on the GUI thread
+    done = QtCore.Signal(object)
+
+    def __init__(self, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._request = None
+        self._thread = None
+
+    def build(self, result, showTypes, previous=None):
+        """ build(result, showTypes, previous=None)
+        Flatten the fictive objects of a parser result, done is emitted
+        when it is ready. The snapshot of the same editor shown before
+        is given as previous.
+        """
+        with self._lock:
+            self._request = (result, list(showTypes), previous)
+        self._wake.set()
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="pyzoOutline builder", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            with self._lock:
+                request, self._request = self._request, None
+                self._wake.clear()
+            if request is None:
+                continue
+            result, showTypes, previous = request
+            try:
+                roots, items, parents = flatten(result.rootItem.children)
+            except (AttributeError, RecursionError):
+                continue  # not a result of the parser
+            if (
+                previous is not None
+                and previous.showTypes == showTypes
+                and previous.roots == roots
+            ):
+                snapshot = previous._replace(result=result)
+            else:
+                matcher = FuzzyMatcher([item.name.lower() for item in items])
+                positions = PositionIndex(roots, showTypes)
+                positions.find(0)  # the segments of the top level
+                snapshot = OutlineSnapshot(
+                    result,
+                    roots,
+                    items,
+                    parents,
+                    matcher,
+                    showTypes,
+                    positions,
+                )
+            try:
+                self.done.emit(snapshot)
+            except RuntimeError:
+                return  # the outline was deleted
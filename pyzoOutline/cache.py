@@ -0,0 +1,83 @@
+""" The outlines of recently shown editors
+
+When another editor becomes current the model of the outline is kept
+with the state of the view: the expanded rows and the scroll position.
+Switching back to the editor shows them again at once, as long as its
+document revision is the same as when it was left. The least recently
+shown outlines are dropped when there are more than size.
+"""
+
+import collections
+
+
+class CachedOutline:
+    """ The outline of an editor that is not current """
+
+    def __init__(self, model, snapshot, positions, revision):
+        self.model = model
+        self.snapshot = snapshot
+        self.positions = positions
+        self.revision = revision
+        # The expanded nodes, parents before their children
+        self.expanded = []
+        self.scroll = 0
+        self.level = None
+
+
+class OutlineCache:
+    """ Keeps up to size CachedOutline by editor id """
+
+    def __init__(self, size=10):
+        self.size = size
+        # editor id -> CachedOutline, the least recently shown first
+        self._entries = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, editorId, entry):
+        """ put(editorId, entry)
+        Keep the outline of an editor that is no longer current
+        """
+        self.discard(editorId)
+        self._entries[editorId] = entry
+        while len(self._entries) > max(self.size, 0):
+            self._drop(self._entries.popitem(last=False)[1])
+
+    def holds(self, model):
+        """ holds(model)
+        Get whether model is the model of a kept outline
+        """
+        return any(entry.model is model for entry in self._entries.values())
+
+    def take(self, editorId, revision):
+        """ take(editorId, revision)
+        Get the outline of an editor and forget it, None if there is
+        none or the document changed since
+        """
+        entry = self._entries.pop(editorId, None)
+        if entry is not None and entry.revision != revision:
+            self._drop(entry)
+            entry = None
+        return entry
+
+    def discard(self, editorId):
+        """ discard(editorId)
+        Drop the outline of an editor
+        """
+        entry = self._entries.pop(editorId, None)
+        if entry is not None:
+            self._drop(entry)
+
+    def prune(self, editorIds):
+        """ prune(editorIds)
+        Drop the outlines of the editors that are closed
+        """
+        editorIds = set(editorIds)
+        for editorId in list(self._entries):
+            if editorId not in editorIds:
+                self.discard(editorId)
+
+    def _drop(self, entry):
+        entry.model.deleteLater()
+        entry.model = None
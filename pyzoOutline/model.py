@@ -0,0 +1,486 @@
+""" The outline as a Qt item model
+
+OutlineModel shows the OutlineItems of a parse (see builder.py). The
+rows of a node are made when the view expands it (canFetchMore /
+fetchMore), so the rows of collapsed branches are never made. An update
+matches the new items with the existing rows by type and name under the
+same parent, only rows that changed are added, removed or moved, so the
+view keeps expanded rows, selection and scroll position.
+
+The rows are sorted in sortMode on keys made once per parse. An update
+sorts the siblings again, which takes about one pass when few of them
+moved, and only the rows whose place changed are moved.
+
+There are rows for the items of all types. isShown() tells the view
+which rows to hide: those of a type that is not in showTypes and, while
+the outline is filtered, those that do not match and hold no match.
+"""
+
+from operator import attrgetter
+
+from pyzo.util.qt import QtCore
+
+from .builder import CELL_TYPES
+
+# Theme item that gives the colour and font of each type
+THEME_ITEMS = {
+    "cell": "syntax.python.cellcomment",
+    "class": "syntax.classname",
+    "def": "syntax.functionname",
+    "attribute": "syntax.identifier",
+    "import": "syntax.unterminatedstring",
+    "todo": "syntax.todocomment",
+    "nameismain": "syntax.keyword",
+}
+
+# The sort modes: the sort key of the items and whether it is reversed,
+# the keys are made in the worker thread
+SORT_KEYS = {
+    "source": (attrgetter("order"), False),
+    "a-z": (attrgetter("nameKey"), False),
+    "z-a": (attrgetter("nameKey"), True),
+    "kind": (attrgetter("kindKey"), False),
+    "size": (attrgetter("sizeKey"), False),
+}
+
+# The text shown for each sort mode
+SORT_LABELS = {
+    "source": "Source",
+    "a-z": "A-z",
+    "z-a": "Z-a",
+    "kind": "Kind",
+    "size": "Size",
+}
+
+
+class OutlineNode:
+    """ A row of the outline. Its children are made when it is fetched,
+    until then the items to make them from are kept in pending.
+    """
+
+    __slots__ = [
+        "parent",
+        "row",
+        "depth",
+        "object",
+        "key",
+        "type",
+        "text",
+        "children",
+        "pending",
+        "fetched",
+    ]
+
+    def __init__(self, parent, object=None, text=""):
+        self.parent = parent
+        self.row = 0
+        self.depth = parent.depth + 1 if parent is not None else 0
+        self.object = object
+        self.children = []
+        self.pending = []
+        self.fetched = False
+        if object is None:
+            self.key = None
+            self.type = None
+            self.text = text
+        else:
+            self.key = (object.type, object.name)
+            self.type = "cell" if object.type in CELL_TYPES else object.type
+            self.text = object.text
+
+    @property
+    def linenr(self):
+        return self.object.linenr if self.object is not None else 0
+
+
+class OutlineModel(QtCore.QAbstractItemModel):
+    """ Rows of the outline items """
+
+    def __init__(self, parent=None):
+        QtCore.QAbstractItemModel.__init__(self, parent)
+        self.root = OutlineNode(None)
+        self.root.fetched = True
+        self.showTypes = []
+        # ids of the items that match the filter and of their ancestors,
+        # None when the outline is not filtered
+        self.filterIds = None
+        self.style = None
+        self.currentNode = None
+        self.currentBrush = None
+        # A key of SORT_KEYS
+        self.sortMode = "source"
+        # Nodes made by the last update
+        self.added = []
+        # id of an outline item -> its node, for the nodes made
+        self.objectNodes = {}
+
+    # Qt model interface
+
+    def index(self, row, column, parent=QtCore.QModelIndex()):
+        node = self.nodeFromIndex(parent)
+        if column != 0 or row < 0 or row >= len(node.children):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        return self.nodeIndex(index.internalPointer().parent)
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        return len(self.nodeFromIndex(parent).children)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QtCore.QModelIndex()):
+        node = self.nodeFromIndex(parent)
+        if node.fetched:
+            return bool(node.children)
+        return any(self.isShown(object) for object in node.pending)
+
+    def canFetchMore(self, parent):
+        node = self.nodeFromIndex(parent)
+        return not node.fetched and bool(node.pending)
+
+    def fetchMore(self, parent):
+        node = self.nodeFromIndex(parent)
+        if node.fetched:
+            return
+        node.fetched = True
+        children = self._sorted(
+            [self._makeNode(node, object) for object in node.pending]
+        )
+        node.pending = []
+        if children:
+            self.beginInsertRows(parent, 0, len(children) - 1)
+            node.children = children
+            self._renumber(node)
+            self.endInsertRows()
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == QtCore.Qt.DisplayRole:
+            return node.text
+        if node.type is None or self.style is None:
+            return None
+        themeItem = THEME_ITEMS.get(node.type, "syntax.identifier")
+        if role == QtCore.Qt.ForegroundRole:
+            return self.style.brush(themeItem)
+        elif role == QtCore.Qt.FontRole:
+            return self.style.font(themeItem, underline=node.type == "cell")
+        elif role == QtCore.Qt.BackgroundRole:
+            if node is self.currentNode:
+                return self.currentBrush
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return QtCore.Qt.NoItemFlags
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        """ sort(column, order=QtCore.Qt.AscendingOrder)
+        Sort the rows on their name, column -1 restores the order of the
+        source
+        """
+        if column < 0:
+            self.setSortMode("source")
+        elif order == QtCore.Qt.DescendingOrder:
+            self.setSortMode("z-a")
+        else:
+            self.setSortMode("a-z")
+
+    def setSortMode(self, mode):
+        """ setSortMode(mode)
+        Sort the rows in a mode of SORT_KEYS, the rows made later are
+        sorted the same way
+        """
+        if mode not in SORT_KEYS:
+            mode = "source"
+        self.sortMode = mode
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        nodes = [index.internalPointer() for index in persistent]
+        self._sortTree(self.root)
+        self.changePersistentIndexList(
+            persistent, [self.nodeIndex(node) for node in nodes]
+        )
+        self.layoutChanged.emit()
+
+    # Nodes
+
+    def nodeFromIndex(self, index):
+        if index.isValid():
+            return index.internalPointer()
+        return self.root
+
+    def nodeIndex(self, node):
+        if node is None or node is self.root:
+            return QtCore.QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def isShown(self, object):
+        """ isShown(object)
+        Get whether the row of an item is shown, the rows of its
+        ancestors aside
+        """
+        if object is None:
+            return True
+        if object.type not in self.showTypes and object.type != "nameismain":
+            return False
+        return self.filterIds is None or id(object) in self.filterIds
+
+    def madeNodes(self):
+        """ madeNodes()
+        Iterate over the nodes that have a row, parents before their
+        children
+        """
+        stack = list(reversed(self.root.children))
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.fetched:
+                stack.extend(reversed(node.children))
+
+    def fetchedNodes(self):
+        """ fetchedNodes()
+        Get the nodes whose rows were made and that have rows, parents
+        before their children
+        """
+        nodes = []
+        stack = list(reversed(self.root.children))
+        while stack:
+            node = stack.pop()
+            if node.fetched and node.children:
+                nodes.append(node)
+                stack.extend(reversed(node.children))
+        return nodes
+
+    def _renumber(self, node):
+        for row, child in enumerate(node.children):
+            child.row = row
+
+    def _sorted(self, nodes, inSource=True):
+        """ _sorted(nodes, inSource=True)
+        Get the nodes in the sort order, inSource tells they are in the
+        order of the source
+        """
+        if inSource and self.sortMode == "source":
+            return nodes
+        key, reverse = SORT_KEYS[self.sortMode]
+        return sorted(
+            nodes, key=lambda node: key(node.object), reverse=reverse
+        )
+
+    def _sortedObjects(self, objects):
+        """ _sortedObjects(objects)
+        Get the items, in the order of the source, in the sort order
+        """
+        if self.sortMode == "source":
+            return objects
+        key, reverse = SORT_KEYS[self.sortMode]
+        return sorted(objects, key=key, reverse=reverse)
+
+    def _sortTree(self, node):
+        node.children = self._sorted(node.children, False)
+        self._renumber(node)
+        for child in node.children:
+            if child.fetched:
+                self._sortTree(child)
+
+    # Updates
+
+    def clear(self, message=""):
+        """ clear(message="")
+        Remove all rows, a message is shown as the only row
+        """
+        self.beginResetModel()
+        self.root = OutlineNode(None)
+        self.root.fetched = True
+        if message:
+            self.root.children = [OutlineNode(self.root, text=message)]
+        self.currentNode = None
+        self.objectNodes = {}
+        self.endResetModel()
+
+    def update(self, objects):
+        """ update(objects)
+        Show the outline items, the rows of the previous update are
+        kept for the objects with the same type and name under the same
+        parent. The new rows are listed in added.
+        """
+        self.added = []
+        self.objectNodes = {}
+        self._update(self.root, objects)
+
+    def _makeNode(self, parent, object):
+        node = OutlineNode(parent, object)
+        node.pending = object.children
+        self.objectNodes[id(object)] = node
+        return node
+
+    def nodeForPath(self, path):
+        """ nodeForPath(path)
+        Get the node of the last item of a path of items from the
+        top level down, the nodes on the path are made if needed
+        """
+        node = self.root
+        for object in path:
+            if not node.fetched:
+                self.fetchMore(self.nodeIndex(node))
+            child = self.objectNodes.get(id(object))
+            if child is None or child.parent is not node:
+                break
+            node = child
+        return node if node is not self.root else None
+
+    def _update(self, node, objects):
+        if not node.fetched:
+            node.pending = objects
+            return
+        if self._updateSame(node, objects):
+            return
+        parentIndex = self.nodeIndex(node)
+
+        # Existing children by key, duplicates in order
+        oldNodes = {}
+        for child in node.children:
+            if child.key is not None:
+                oldNodes.setdefault(child.key, []).append(child)
+
+        targets = []
+        kept = set()
+        for object in objects:
+            matches = oldNodes.get((object.type, object.name))
+            if matches:
+                child = matches.pop(0)
+                child.object = object
+                self.objectNodes[id(object)] = child
+                kept.add(child)
+                if object.text != child.text:
+                    child.text = object.text
+                    index = self.nodeIndex(child)
+                    self.dataChanged.emit(index, index)
+            else:
+                child = self._makeNode(node, object)
+                self.added.append(child)
+            targets.append(child)
+        targets = self._sorted(targets)
+
+        # Remove the rows that are gone, from the bottom up
+        rows = [child.row for child in node.children if child not in kept]
+        for first, last in reversed(_runs(rows)):
+            self.beginRemoveRows(parentIndex, first, last)
+            del node.children[first : last + 1]
+            self._renumber(node)
+            self.endRemoveRows()
+
+        # Put the kept rows in order, the view keeps their state
+        order = [child for child in targets if child in kept]
+        if order != node.children:
+            parents = [QtCore.QPersistentModelIndex(parentIndex)]
+            self.layoutAboutToBeChanged.emit(parents)
+            persistent = [
+                index
+                for index in self.persistentIndexList()
+                if index.internalPointer().parent is node
+            ]
+            nodes = [index.internalPointer() for index in persistent]
+            node.children = order
+            self._renumber(node)
+            self.changePersistentIndexList(
+                persistent, [self.nodeIndex(child) for child in nodes]
+            )
+            self.layoutChanged.emit(parents)
+
+        # Insert the new rows
+        rows = [row for row, child in enumerate(targets) if child not in kept]
+        for first, last in _runs(rows):
+            self.beginInsertRows(parentIndex, first, last)
+            node.children[first:first] = targets[first : last + 1]
+            self._renumber(node)
+            self.endInsertRows()
+
+        # Update the children of the kept rows
+        for child in node.children:
+            if child in kept:
+                self._update(child, child.object.children)
+
+    def _updateSame(self, node, objects):
+        """ _updateSame(node, objects)
+        Update the rows of node when the objects have the keys of its
+        children in the same order, as for most rows after an edit.
+        Get whether they had.
+        """
+        children = node.children
+        if len(children) != len(objects):
+            return False
+        objects = self._sortedObjects(objects)
+        for child, object in zip(children, objects):
+            if child.key != (object.type, object.name):
+                return False
+        objectNodes = self.objectNodes
+        for child, object in zip(children, objects):
+            child.object = object
+            objectNodes[id(object)] = child
+            if object.text != child.text:
+                child.text = object.text
+                index = self.nodeIndex(child)
+                self.dataChanged.emit(index, index)
+            if not child.fetched:
+                child.pending = object.children
+            elif object.children or child.children:
+                self._update(child, object.children)
+        return True
+
+    def refresh(self):
+        """ refresh()
+        Let the views ask again which rows have children, after the
+        types to show or the filter changed
+        """
+        self.layoutAboutToBeChanged.emit()
+        self.layoutChanged.emit()
+
+    def isAlive(self, node):
+        """ isAlive(node)
+        Get whether node is still a row of the model
+        """
+        while node is not None and node is not self.root:
+            parent = node.parent
+            if parent is None or not parent.fetched:
+                return False
+            children = parent.children
+            if node.row >= len(children) or children[node.row] is not node:
+                return False
+            node = parent
+        return node is self.root
+
+    def setCurrent(self, node):
+        """ setCurrent(node)
+        Highlight the row of the current line
+        """
+        if node is self.currentNode:
+            return
+        old, self.currentNode = self.currentNode, node
+        for n in (old, node):
+            if n is not None and self.isAlive(n):
+                index = self.nodeIndex(n)
+                self.dataChanged.emit(index, index)
+
+
+def _runs(rows):
+    """ _runs(rows)
+    Get the ascending rows as [(first, last), ...] of consecutive rows
+    """
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    return [tuple(run) for run in runs]
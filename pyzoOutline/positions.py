@@ -0,0 +1,115 @@
+""" The outline object at each line
+
+A PositionIndex is made once per parse. For a list of sibling objects
+it cuts the lines into segments at the first and last line of every
+sibling and keeps the sibling that holds each segment. When siblings
+overlap, as a cell and the classes after it do, the one that comes last
+wins. Finding the object at a line is a binary search per level, going
+down into the children of the sibling found. The segments of a level
+are made the first time a search goes through it, so a parse costs
+nothing until the cursor is looked up.
+"""
+
+import bisect
+import heapq
+
+
+def segments(objects):
+    """ segments(objects)
+    Get (starts, owners), owners[i] is the last of the sibling objects
+    that holds the lines from starts[i], or None
+    """
+    starts = []
+    owners = []
+
+    def add(line, owner):
+        if starts and starts[-1] == line:
+            owners[-1] = owner  # the later sibling wins
+            if len(owners) > 1 and owners[-2] is owner:
+                starts.pop()
+                owners.pop()
+        elif not owners or owners[-1] is not owner:
+            starts.append(line)
+            owners.append(owner)
+
+    inOrder = all(
+        objects[i].linenr <= objects[i + 1].linenr
+        for i in range(len(objects) - 1)
+    )
+    if inOrder:
+        # The last started sibling that did not end is the one that wins
+        active = []
+        for object in objects:
+            while active and active[-1].linenr2 <= object.linenr:
+                end = active.pop().linenr2
+                while active and active[-1].linenr2 <= end:
+                    active.pop()  # ended below the top
+                add(end, active[-1] if active else None)
+            active.append(object)
+            add(object.linenr, object)
+        while active:
+            end = active.pop().linenr2
+            while active and active[-1].linenr2 <= end:
+                active.pop()
+            add(end, active[-1] if active else None)
+    else:
+        # The sibling that comes last wins, found with a heap
+        byStart = sorted(range(len(objects)), key=lambda i: objects[i].linenr)
+        bounds = sorted(
+            {object.linenr for object in objects}
+            | {object.linenr2 for object in objects}
+        )
+        heap = []
+        j = 0
+        for line in bounds:
+            while j < len(byStart) and objects[byStart[j]].linenr <= line:
+                i = byStart[j]
+                heapq.heappush(heap, (-i, objects[i].linenr2))
+                j += 1
+            while heap and heap[0][1] <= line:
+                heapq.heappop(heap)
+            add(line, objects[-heap[0][0]] if heap else None)
+    return starts, owners
+
+
+class PositionIndex:
+    """ The deepest object at each line of a parse. Only objects of
+    showTypes are found when it is given.
+    """
+
+    def __init__(self, objects=(), showTypes=None):
+        self._objects = list(objects)
+        self._showTypes = showTypes
+        # id of the parent object (None at the top) -> segments
+        self._levels = {}
+
+    def _segments(self, parent, objects):
+        key = None if parent is None else id(parent)
+        level = self._levels.get(key)
+        if level is None:
+            showTypes = self._showTypes
+            if showTypes is not None:
+                objects = [
+                    object
+                    for object in objects
+                    if object.type in showTypes or object.type == "nameismain"
+                ]
+            level = self._levels[key] = segments(objects)
+        return level
+
+    def find(self, line):
+        """ find(line)
+        Get the path of objects from the top level to the deepest object
+        that holds line, None if no object does
+        """
+        path = ()
+        parent, objects = None, self._objects
+        while objects:
+            starts, owners = self._segments(parent, objects)
+            i = bisect.bisect_right(starts, line) - 1
+            if i < 0 or owners[i] is None:
+                break
+            parent = owners[i]
+            path += (parent,)
+            objects = parent.children
+        return path or None
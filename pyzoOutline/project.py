@@ -0,0 +1,176 @@
+""" The symbol index of the project of the current file
+
+ProjectSymbols lists the python files of the project in a thread, like
+the "Project" scope of the linter does, and parses the ones that
+changed since they were indexed in a few processes running symbols.py.
+The index is saved when they are done.
+"""
+
+import json
+import os
+import sys
+import threading
+
+from pyzo.util.qt import QtCore
+
+from ..pyzoShared.discovery import ProjectFiles
+from .symbols import SYMBOLS_SCRIPT, SymbolIndex
+
+# Parser processes at most
+MAX_WORKERS = 4
+
+
+def defaultPython():
+    """ defaultPython()
+    Get the interpreter that runs the parser processes
+    """
+    if getattr(sys, "frozen", False) or not sys.executable:
+        return "python"
+    return sys.executable
+
+
+class _Worker:
+    def __init__(self, process, mtimes):
+        self.process = process
+        # absolute path -> (relative path, modification time)
+        self.mtimes = mtimes
+        self.buffer = b""
+
+
+class ProjectSymbols(QtCore.QObject):
+    """ Keeps the SymbolIndex of a project up to date """
+
+    # Emitted when symbols were added or removed
+    updated = QtCore.Signal()
+    # Emitted by the listing thread with the index and its files
+    _listed = QtCore.Signal(object, object)
+
+    def __init__(self, folder, parent=None):
+        QtCore.QObject.__init__(self, parent)
+        self.folder = folder
+        self.projectFiles = ProjectFiles(os.path.join(folder, "discovery"))
+        self.pythonExe = ""
+        self.index = None
+        self._workers = []
+        # The index whose files are being listed
+        self._listing = None
+        self._listed.connect(self._onListed)
+
+    @property
+    def busy(self):
+        return bool(self._workers) or self._listing is not None
+
+    def setRoot(self, root):
+        """ setRoot(root)
+        Show the index of the project in root, it is read from disk
+        """
+        if self.index is not None and self.index.root == root:
+            return
+        self.stop()
+        self.index = SymbolIndex(root, self.folder)
+        self.index.load()
+        self.updated.emit()
+
+    def refresh(self):
+        """ refresh()
+        List the files of the project in a thread, then parse the ones
+        that changed since they were indexed
+        """
+        if self.index is None or self.busy:
+            return
+        self._listing = self.index
+        thread = threading.Thread(
+            target=self._list,
+            args=(self.index,),
+            name="pyzoOutline project",
+            daemon=True,
+        )
+        thread.start()
+
+    def _list(self, index):
+        # relative path -> modification time
+        files = {}
+        for path in self.projectFiles.files(index.root):
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            files[os.path.relpath(path, index.root)] = mtime
+        try:
+            self._listed.emit(index, files)
+        except RuntimeError:
+            pass  # the outline was deleted
+
+    def _onListed(self, index, files):
+        if index is not self._listing:
+            return  # stopped or another project
+        self._listing = None
+        root = index.root
+        stale = index.stale(files)
+        if not stale:
+            self.index.save()
+            self.updated.emit()
+            return
+
+        count = min(MAX_WORKERS, os.cpu_count() or 1, len(stale))
+        for i in range(count):
+            mtimes = {}
+            for relpath in stale[i::count]:
+                path = os.path.join(root, relpath)
+                mtimes[path] = (relpath, files[relpath])
+            process = QtCore.QProcess(self)
+            process.setProcessChannelMode(QtCore.QProcess.SeparateChannels)
+            worker = _Worker(process, mtimes)
+            process.readyReadStandardOutput.connect(
+                lambda worker=worker: self._onOutput(worker)
+            )
+            process.finished.connect(
+                lambda *args, worker=worker: self._onFinished(worker)
+            )
+            process.errorOccurred.connect(
+                lambda error, worker=worker: self._onError(worker, error)
+            )
+            self._workers.append(worker)
+            process.start(
+                self.pythonExe or defaultPython(), ["-u", SYMBOLS_SCRIPT]
+            )
+            paths = "".join(path + "\n" for path in mtimes)
+            process.write(paths.encode("utf-8"))
+            process.closeWriteChannel()
+        self.updated.emit()
+
+    def stop(self):
+        """ stop()
+        Stop the parser processes, what they found is dropped
+        """
+        self._listing = None
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.process.finished.disconnect()
+            worker.process.kill()
+            worker.process.waitForFinished(1000)
+
+    def _onOutput(self, worker):
+        data = worker.buffer + worker.process.readAllStandardOutput().data()
+        lines = data.split(b"\n")
+        worker.buffer = lines.pop()
+        for line in lines:
+            try:
+                record = json.loads(line.decode("utf-8"))
+                relpath, mtime = worker.mtimes[record["path"]]
+            except (ValueError, KeyError, TypeError):
+                continue
+            self.index.set(relpath, mtime, record["symbols"])
+
+    def _onError(self, worker, error):
+        if error == QtCore.QProcess.FailedToStart:
+            self._onFinished(worker)
+
+    def _onFinished(self, worker):
+        if worker not in self._workers:
+            return
+        self._onOutput(worker)
+        self._workers.remove(worker)
+        if not self._workers:
+            self.index.save()
+        self.updated.emit()
@@ -0,0 +1,260 @@
+""" Symbols of the python files of a project
+
+Run as a script it reads file names from stdin, one per line, parses
+each file with ast and writes a JSON line per file with its classes and
+functions. The outline runs it in a few processes at a time.
+
+SymbolIndex keeps the symbols of a project on disk, per file with the
+modification time it was parsed at, so only the files that changed are
+parsed again. search() finds symbols by a fuzzy match of their name:
+names that start with the query are a range of the sorted names, the
+other matches are found by a regular expression over the qualified
+names joined in one lowercase text, each name once. A query that
+extends the previous one only checks the previous matches.
+"""
+
+import ast
+import bisect
+import hashlib
+import heapq
+import json
+import os
+import re
+import sys
+
+SYMBOLS_SCRIPT = os.path.abspath(__file__)
+
+# Changes when the format of the file on disk changes
+VERSION = 1
+
+
+def sourceSymbols(source):
+    """ sourceSymbols(source)
+    Get [[kind, qualified name, line number], ...] of the classes and
+    functions in source. Functions inside functions are left out.
+    """
+    symbols = []
+    stack = [("", node) for node in reversed(ast.parse(source).body)]
+    while stack:
+        prefix, node = stack.pop()
+        if isinstance(node, ast.ClassDef):
+            kind = "class"
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            kind = "def"
+        else:
+            continue
+        qualname = prefix + node.name
+        symbols.append([kind, qualname, node.lineno])
+        if kind == "class":
+            for child in reversed(node.body):
+                stack.append((qualname + ".", child))
+    return symbols
+
+
+class SymbolIndex:
+    """ The symbols of the python files of a project """
+
+    def __init__(self, root, folder):
+        self.root = root
+        name = hashlib.sha1(os.path.normcase(root).encode("utf-8"))
+        self.path = os.path.join(folder, name.hexdigest()[:16] + ".json")
+        # relative path -> [modification time, symbols]
+        self.files = {}
+        self._search = None
+
+    def load(self):
+        """ load()
+        Read the index of the project from disk
+        """
+        try:
+            with open(self.path, encoding="utf-8") as fd:
+                data = json.load(fd)
+        except (OSError, ValueError):
+            data = {}
+        if data.get("version") == VERSION and data.get("root") == self.root:
+            self.files = data.get("files", {})
+        else:
+            self.files = {}
+        self._search = None
+
+    def save(self):
+        """ save()
+        Write the index of the project to disk
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmpPath = self.path + ".tmp"
+        with open(tmpPath, "w", encoding="utf-8") as fd:
+            json.dump(
+                {"version": VERSION, "root": self.root, "files": self.files},
+                fd,
+            )
+        os.replace(tmpPath, self.path)
+
+    def stale(self, files):
+        """ stale(files)
+        Forget the files that are gone, get the relative paths of the
+        files in {relative path: modification time} that changed
+        """
+        for relpath in list(self.files):
+            if relpath not in files:
+                del self.files[relpath]
+                self._search = None
+        return [
+            relpath
+            for relpath, mtime in files.items()
+            if self.files.get(relpath, [None])[0] != mtime
+        ]
+
+    def set(self, relpath, mtime, symbols):
+        """ set(relpath, mtime, symbols)
+        Keep the symbols of a file parsed at mtime
+        """
+        self.files[relpath] = [mtime, symbols]
+        self._search = None
+
+    def count(self):
+        """ count()
+        Get the number of symbols in the index
+        """
+        return sum(len(entry[1]) for entry in self.files.values())
+
+    def _searchData(self):
+        if self._search is None:
+            symbols = []
+            for relpath in sorted(self.files):
+                for kind, qualname, linenr in self.files[relpath][1]:
+                    symbols.append((relpath, kind, qualname, linenr))
+            self._search = _SearchData(symbols)
+        return self._search
+
+    def search(self, query, limit=100):
+        """ search(query, limit=100)
+        Get up to limit (relative path, kind, qualified name, line
+        number) of the symbols whose name holds the letters of query in
+        order, best matches first
+        """
+        query = "".join(query.lower().split())
+        if not query:
+            return []
+        data = self._searchData()
+        qualnames, names = data.qualnames, data.names
+
+        # Names that start with query are a range of the sorted names
+        lo = bisect.bisect_left(data.sortedNames, query)
+        hi = bisect.bisect_left(data.sortedNames, query + "\uffff")
+        prefixed = data.byName[lo:hi]
+        ranked = heapq.nsmallest(
+            limit,
+            (
+                (0 if names[i] == query else 1, len(qualnames[i]), i)
+                for i in prefixed
+            ),
+        )
+
+        # Other names that hold the letters of query in order
+        if len(ranked) < limit:
+            prefixed = set(prefixed)
+            fuzzy = (
+                (
+                    2 if query in names[i] else 3 if query in qualnames[i]
+                    else 4,
+                    len(qualnames[i]),
+                    i,
+                )
+                for i in data.matcher.matches(query)
+                if i not in prefixed
+            )
+            ranked += heapq.nsmallest(limit - len(ranked), fuzzy)
+        return [data.symbols[item[2]] for item in ranked]
+
+
+class FuzzyMatcher:
+    """ Finds the names that hold the letters of a query in order. The
+    names are lowercase, each different name is in the text once.
+    """
+
+    # A narrower query checks the matches of the previous one when
+    # there are not more than this
+    REFINE_MAX = 20000
+
+    def __init__(self, names):
+        groups = {}
+        for i, name in enumerate(names):
+            groups.setdefault(name, []).append(i)
+        self.groups = list(groups.values())
+        self.unique = list(groups)
+        self.offsets = []
+        offset = 0
+        for name in self.unique:
+            self.offsets.append(offset)
+            offset += len(name) + 1
+        self.text = "\n".join(self.unique)
+        self._lastQuery = None
+        self._lastMatches = []
+
+    def matches(self, query):
+        """ matches(query)
+        Get the indices of the names that hold the letters of the
+        lowercase query in order
+        """
+        # Each letter is found at its first place after the previous
+        # one, so the expression never backtracks
+        pattern = re.escape(query[0])
+        for char in query[1:]:
+            char = re.escape(char)
+            pattern += "[^%s\n]*%s" % (char, char)
+        pattern = re.compile(pattern + "[^\n]*")
+
+        last = self._lastQuery
+        if (
+            last is not None
+            and query.startswith(last)
+            and len(self._lastMatches) <= self.REFINE_MAX
+        ):
+            unique = self.unique
+            matches = [
+                i for i in self._lastMatches if pattern.search(unique[i])
+            ]
+        else:
+            offsets = self.offsets
+            matches = [
+                bisect.bisect_right(offsets, match.start()) - 1
+                for match in pattern.finditer(self.text)
+            ]
+        self._lastQuery = query
+        self._lastMatches = matches
+        groups = self.groups
+        return [i for match in matches for i in groups[match]]
+
+
+class _SearchData:
+    """ The symbols of an index prepared for search """
+
+    def __init__(self, symbols):
+        self.symbols = symbols
+        self.qualnames = [symbol[2].lower() for symbol in symbols]
+        self.names = [name.rsplit(".", 1)[-1] for name in self.qualnames]
+        self.byName = sorted(range(len(symbols)), key=self.names.__getitem__)
+        self.sortedNames = [self.names[i] for i in self.byName]
+        self.matcher = FuzzyMatcher(self.qualnames)
+
+
+def main():
+    """Parse the files named on stdin, write their symbols to stdout"""
+    # The outline writes the names in UTF-8, whatever the locale
+    for line in sys.stdin.buffer:
+        path = line.decode("utf-8").rstrip("\r\n")
+        if not path:
+            continue
+        try:
+            with open(path, "rb") as fd:
+                symbols = sourceSymbols(fd.read())
+        except (OSError, SyntaxError, ValueError, RecursionError):
+            symbols = []
+        sys.stdout.write(json.dumps({"path": path, "symbols": symbols}))
+        sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
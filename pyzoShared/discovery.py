@@ -0,0 +1,266 @@
+""" Discovery of the project of a file and of its python files
+
+The project of a file is its git repository, else the nearest folder
+with a setup or pyproject file. Its folders are listed with os.scandir,
+a listing is kept on disk and only read again when the modification
+time of the folder changed. Files ignored by .gitignore are skipped,
+ignored, hidden and virtual environment folders are not entered at all.
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+
+# Files marking the top folder of a project without git
+PROJECT_FILES = ["pyproject.toml", "setup.py", "setup.cfg"]
+
+# Folders that hold no code of the project
+SKIP_FOLDERS = {"__pycache__", "node_modules", "site-packages"}
+
+
+def git(args, cwd):
+    """ git(args, cwd)
+    Run git, returns its output or None if it failed
+    """
+    try:
+        proc = subprocess.run(
+            ["git", "-c", "core.quotePath=false"] + args,
+            cwd=cwd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=60,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if proc.returncode != 0:
+        return None
+    return proc.stdout.decode("utf-8", "replace")
+
+
+def git_root(path):
+    """returns the top folder of the git repository of path or None"""
+    output = git(["rev-parse", "--show-toplevel"], path)
+    if not output:
+        return None
+    return os.path.normpath(output.strip())
+
+
+def project_root(path):
+    """ project_root(path)
+    Get the top folder of the project of the folder path: the git
+    repository, else the nearest folder with a setup or pyproject file,
+    else path
+    """
+    root = git_root(path)
+    if root:
+        return root
+    folder = os.path.abspath(path)
+    while True:
+        for name in PROJECT_FILES:
+            if os.path.isfile(os.path.join(folder, name)):
+                return folder
+        parent = os.path.dirname(folder)
+        if parent == folder:
+            return os.path.abspath(path)
+        folder = parent
+
+
+def _glob_regex(pattern):
+    """translate a gitignore glob to a regular expression"""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end < 0:
+                regex += re.escape(char)
+            else:
+                regex += "[" + pattern[i + 1:end].replace("!", "^", 1) + "]"
+                i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(char)
+        i += 1
+    return regex
+
+
+class GitIgnore:
+    """The rules of one .gitignore file, relative to its folder"""
+
+    def __init__(self, folder, lines):
+        self.folder = folder
+        # [(regex, negate, folders_only), ...]
+        self.rules = []
+        for line in lines:
+            line = line.rstrip("\n\r")
+            if not line.strip() or line.startswith("#"):
+                continue
+            line = line.rstrip(" ")
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            folders_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            if "/" in line:
+                # relative to the folder of the .gitignore
+                regex = _glob_regex(line.lstrip("/"))
+            else:
+                regex = "(?:.*/)?" + _glob_regex(line)
+            self.rules.append(
+                (re.compile(regex + r"\Z"), negate, folders_only)
+            )
+
+    @classmethod
+    def read(cls, folder, path):
+        """returns the rules of the file path or None"""
+        try:
+            with open(path, encoding="utf-8", errors="replace") as fd:
+                return cls(folder, fd.readlines())
+        except OSError:
+            return None
+
+    def match(self, path, is_dir):
+        """ match(path, is_dir)
+        Returns True if ignored, False if included again by a negated
+        rule and None if no rule matches
+        """
+        relative = os.path.relpath(path, self.folder).replace("\\", "/")
+        result = None
+        for regex, negate, folders_only in self.rules:
+            if folders_only and not is_dir:
+                continue
+            if regex.match(relative):
+                result = not negate
+        return result
+
+
+def gitignored(rules, path, is_dir):
+    """returns True if the last matching rule of rules ignores path"""
+    result = False
+    for gitignore in rules:
+        match = gitignore.match(path, is_dir)
+        if match is not None:
+            result = match
+    return result
+
+
+class ProjectFiles:
+    """ ProjectFiles finds the python files of a project. The listing
+    of every folder is cached with the modification time of the folder.
+    One instance lists one project at a time.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+
+    def _cache_path(self, root):
+        name = hashlib.sha1(os.path.normcase(root).encode("utf-8"))
+        return os.path.join(self.folder, name.hexdigest() + ".json")
+
+    def _load(self, root):
+        try:
+            with open(self._cache_path(root), encoding="utf-8") as fd:
+                return json.load(fd)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, root, listings):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = self._cache_path(root) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fd:
+            json.dump(listings, fd)
+        os.replace(tmp_path, self._cache_path(root))
+
+    @staticmethod
+    def _list(path):
+        """returns [folders, python files, other names of interest]"""
+        folders = []
+        files = []
+        markers = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    name = entry.name
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            folders.append(name)
+                        elif name.endswith(".py"):
+                            files.append(name)
+                        elif name in (".gitignore", "pyvenv.cfg"):
+                            markers.append(name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return [sorted(folders), sorted(files), markers]
+
+    def files(self, root, ignore=None):
+        """ files(root, ignore=None)
+        Get the python files of the project in root. The files and
+        folders for which ignore.ignored(path) is True are skipped too.
+        """
+        old = self._load(root)
+        listings = {}
+        exclude = GitIgnore.read(
+            root, os.path.join(root, ".git", "info", "exclude")
+        )
+        result = []
+        stack = [(root, [exclude] if exclude else [])]
+        while stack:
+            path, rules = stack.pop()
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            listing = old.get(path)
+            if listing is None or listing[0] != mtime:
+                listing = [mtime] + self._list(path)
+            listings[path] = listing
+            _, folders, files, markers = listing
+
+            if "pyvenv.cfg" in markers and path != root:
+                continue  # a virtual environment
+            if ".gitignore" in markers:
+                gitignore = GitIgnore.read(
+                    path, os.path.join(path, ".gitignore")
+                )
+                if gitignore is not None:
+                    rules = rules + [gitignore]
+
+            for name in files:
+                filepath = os.path.join(path, name)
+                if ignore is not None and ignore.ignored(filepath):
+                    continue
+                if not gitignored(rules, filepath, False):
+                    result.append(filepath)
+            for name in reversed(folders):
+                if name.startswith(".") or name in SKIP_FOLDERS:
+                    continue
+                folder = os.path.join(path, name)
+                if ignore is not None and ignore.ignored(folder):
+                    continue
+                if not gitignored(rules, folder, True):
+                    stack.append((folder, rules))
+
+        # Folders that are gone or ignored now are dropped
+        self._save(root, listings)
+        return sorted(result)
@@ -0,0 +1,123 @@
+""" Theme styles shared by the plugins
+
+The items of a pyzo theme are strings like "fore:#657b83, back:#fff,
+bold:yes". ThemeStyle parses the items of the active theme once and
+hands out QColor, QBrush and QFont objects made once per item. The
+style is made again only when another theme becomes active.
+
+pyzoShared has no __init__.py so the tool manager does not take it for
+a tool. The plugins import it as pyzo.tools.pyzoShared, a relative
+import found in the tools folder of pyzo. pyzo does not look in the
+user tools folder for the packages of pyzo.tools, a plugin there adds
+that folder to pyzo.tools when the relative import fails.
+"""
+
+import pyzo
+from pyzo.util.qt import QtGui
+
+
+class ThemeStyle:
+    """ The parsed items of a theme, with the Qt objects made from them
+    """
+
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+        self._items = {}
+        for key, value in data.items():
+            parts = {}
+            for part in value.split(","):
+                if ":" in part:
+                    partKey, partValue = part.split(":", 1)
+                    parts[partKey.strip()] = partValue.strip()
+            self._items[key] = parts
+        self._colors = {}
+        self._brushes = {}
+        self._fonts = {}
+
+    def item(self, key):
+        """ item(key)
+        Get the parts of a theme item as a dict, e.g. {"fore": "#000"}
+        """
+        return self._items.get(key, {})
+
+    def value(self, key, part="fore", default=""):
+        """ value(key, part="fore", default="")
+        Get a part of a theme item as a string
+        """
+        return self._items.get(key, {}).get(part, default)
+
+    def color(self, key, part="fore"):
+        """ color(key, part="fore")
+        Get the colour of a part of a theme item as a QColor
+        """
+        color = self._colors.get((key, part))
+        if color is None:
+            color = QtGui.QColor(self.value(key, part))
+            self._colors[(key, part)] = color
+        return color
+
+    def brush(self, key, part="fore"):
+        """ brush(key, part="fore")
+        Get the colour of a part of a theme item as a QBrush
+        """
+        brush = self._brushes.get((key, part))
+        if brush is None:
+            brush = QtGui.QBrush(self.color(key, part))
+            self._brushes[(key, part)] = brush
+        return brush
+
+    def font(self, key, underline=False):
+        """ font(key, underline=False)
+        Get a QFont that is bold, italic or underlined like a theme item
+        """
+        font = self._fonts.get((key, underline))
+        if font is None:
+            font = QtGui.QFont()
+            font.setBold(self.value(key, "bold") == "yes")
+            font.setItalic(self.value(key, "italic") == "yes")
+            font.setUnderline(
+                underline or self.value(key, "underline", "no") != "no"
+            )
+            self._fonts[(key, underline)] = font
+        return font
+
+    def styleSheet(
+        self, widget, background="editor.text", foreground="syntax.identifier"
+    ):
+        """ styleSheet(widget, background="editor.text",
+        foreground="syntax.identifier")
+        Get a style sheet giving widget the background colour of one item
+        and the text colour of another
+        """
+        return "%s{background-color:%s; color:%s;}" % (
+            widget.metaObject().className(),
+            self.value(background, "back"),
+            self.value(foreground, "fore"),
+        )
+
+    def applyTo(
+        self, widget, background="editor.text", foreground="syntax.identifier"
+    ):
+        """ applyTo(widget, background="editor.text",
+        foreground="syntax.identifier")
+        Set the style sheet of widget to the colours of the theme
+        """
+        widget.setStyleSheet(self.styleSheet(widget, background, foreground))
+        widget.setAutoFillBackground(True)
+
+
+_current = None
+
+
+def currentStyle():
+    """ currentStyle()
+    Get the ThemeStyle of the active theme. It is made again only when
+    another theme is active or the theme was loaded again.
+    """
+    global _current
+    name = pyzo.config.settings.theme.lower()
+    data = pyzo.themes[name]["data"]
+    if _current is None or _current.name != name or _current.data is not data:
+        _current = ThemeStyle(name, data)
+    return _current
@@ -10,11 +10,19 @@
 
 import os
 import re
-from json import load
 
 import pyzo
 from pyzo.util.qt import QtCore, QtGui, QtWidgets
-from pyzo import translate
+from pyzo import tools, translate
+
+try:
+    from ..pyzoShared.theme import currentStyle
+except ImportError:
+    # The plugins are in the user tools folder, see pyzoShared
+    tools.__path__.append(os.path.dirname(os.path.dirname(__file__)))
+    from ..pyzoShared.theme import currentStyle
+
+from .index import Snippet, SnippetIndex, fileCategory
 
 tool_name = translate("pyzoSnippetManager", "Snippet Manager")
 tool_summary = "Shows the python snippets."
@@ -34,12 +42,14 @@ class PyzoSnippetManager(QtWidgets.QWidget):
         #     self._config.level = 2
 
         # Keep track of sorting order
-        self._sort_order = None
+        self._sort_order = "ASC"
 
         # Snippet folder
         self.snippet_folder = os.path.join(
             pyzo.appDataDir, "tools", "pyzoSnippetManager", "snippets"
         )
+        # The snippets of the folder, files are read again when changed
+        self._index = SnippetIndex(self.snippet_folder)
 
         # Create button for reload
         self._reload = QtWidgets.QToolButton(self)
@@ -82,6 +92,15 @@ class PyzoSnippetManager(QtWidgets.QWidget):
         # self._options._menu = QtWidgets.QMenu()
         # self._options.setMenu(self._options._menu)
 
+        # Create search field, shows the snippets matching a prefix or
+        # the words of a description
+        self._search = QtWidgets.QLineEdit(self)
+        self._search.setPlaceholderText("Search snippets")
+        self._search.setClearButtonEnabled(True)
+        # event
+        self._search.textChanged.connect(self.onSearchChanged)
+        self._search.returnPressed.connect(self.onSearchReturn)
+
         # Create tree widget
         self._tree = QtWidgets.QTreeWidget(self)
         self._tree.setColumnCount(2)
@@ -91,7 +110,7 @@ class PyzoSnippetManager(QtWidgets.QWidget):
         self._tree.setSortingEnabled(True)
         self._tree.sortItems(0, QtCore.Qt.AscendingOrder)
         # style
-        self.setWidgetTextStyle(self._tree)
+        currentStyle().applyTo(self._tree, foreground="editor.text")
 
         # Create two sizers
         self._sizer1 = QtWidgets.QVBoxLayout(self)
@@ -101,6 +120,7 @@ class PyzoSnippetManager(QtWidgets.QWidget):
 
         # Set layout
         self._sizer1.addLayout(self._sizer2, 0)
+        self._sizer1.addWidget(self._search, 0)
         self._sizer1.addWidget(self._tree, 1)
         # self._sizer2.addWidget(self._sliderIcon, 0)
         self._sizer2.addWidget(self._reload, 0)
@@ -113,71 +133,61 @@ class PyzoSnippetManager(QtWidgets.QWidget):
         # Init current-file name
         self._currentEditorId = 0
 
+        self._index.refresh()
         self.fillTree()
 
         # Bind to events
         self._tree.clicked.connect(self.onItemClicked)
 
-    # Style
-    def getThemeItem(self, item="editor.text"):
-        theme = pyzo.themes[pyzo.config.settings.theme.lower()]["data"]
-        for k, v in theme.items():
-            key = k
-            val_dict = {}
-            if key == item:
-                for x in v.split(","):
-                    item = x.split(":")
-                    item_key = item[0].strip()
-                    item_value = item[1].strip()
-                    val_dict[item_key] = item_value
-                break
-        return val_dict
-
-    def setWidgetStyleSheet(self, widget, keys, values):
-        wdg = str(type(widget))
-        wdg = wdg.replace("<class 'PyQt5.QtWidgets.", "").replace("'>", "")
-        t = ""
-        for n in range(len(keys)):
-            t = t + keys[n] + ":" + values[n] + ";"
-        ss = wdg + "{" + t + "}"
-        widget.setStyleSheet(ss)
-        widget.setAutoFillBackground(True)
-
-    def setWidgetTextStyle(self, widget):
-        theme = pyzo.themes[pyzo.config.settings.theme.lower()]["data"]
-        background = self.getThemeItem(item="editor.text")["back"]
-        textcolor = self.getThemeItem(item="editor.text")["fore"]
-        wdg = str(type(widget))
-        wdg = wdg.replace("<class 'PyQt5.QtWidgets.", "").replace("'>", "")
-        ss = wdg + "{background-color:%s; color:%s;}" % (background, textcolor)
-        widget.setStyleSheet(ss)
-        widget.setAutoFillBackground(True)
-
     # ---------
 
     def fillTree(self):
-        # fill tree
-        self._snippet = {}
-        self._part = {}
-        for f in os.listdir(self.snippet_folder):
-
-            root = f.replace(".json", "").title()
-            sf = os.path.join(self.snippet_folder, f)
-            with open(sf) as snippet:
-                self._part[root] = load(snippet)
-                self._snippet.update(self._part)
-                root = QtWidgets.QTreeWidgetItem(self._tree, [root])
-                for k, v in self._part.items():
-                    for kk, vv in v.items():
-
-                        QtWidgets.QTreeWidgetItem(
-                            root, [str(kk), str(vv["prefix"])]
-                        )
-                self._part.clear()
-        self._tree.sortItems(0, QtCore.Qt.AscendingOrder)
-        self._sort_order = "ASC"
-        self._sortbut.setText("A-z")
-        self._sortbut.setArrowType(QtCore.Qt.DownArrow)
+        """ fillTree()
+        Show the snippets by category, or the ones matching the search.
+        The snippet files are not read, see refresh().
+        """
+        self._tree.clear()
+        query = self._search.text()
+        if query.strip():
+            # The best matches first
+            self._tree.setSortingEnabled(False)
+            for snippet in self._index.search(query):
+                self._snippetItem(self._tree, snippet)
+            return
+
+        for fileName in self._index.files:
+            root = QtWidgets.QTreeWidgetItem(
+                self._tree, [fileCategory(fileName)]
+            )
+            root.setData(0, QtCore.Qt.UserRole, fileName)
+            for snippet in self._index.snippets(fileName):
+                self._snippetItem(root, snippet)
+        self._tree.setSortingEnabled(True)
+        if self._sort_order == "DSC":
+            self._tree.sortItems(0, QtCore.Qt.DescendingOrder)
+        else:
+            self._tree.sortItems(0, QtCore.Qt.AscendingOrder)
+
+    def refresh(self):
+        """ refresh()
+        Read the snippet files that changed since they were read, and
+        show their snippets if there were any
+        """
+        if self._index.refresh():
+            self.fillTree()
+
+    def showEvent(self, event):
+        QtWidgets.QWidget.showEvent(self, event)
+        self.refresh()
+
+    def _snippetItem(self, parent, snippet):
+        item = QtWidgets.QTreeWidgetItem(
+            parent, [snippet.name, ", ".join(snippet.prefixes)]
+        )
+        item.setData(0, QtCore.Qt.UserRole, snippet)
+        if snippet.description:
+            item.setToolTip(0, snippet.description)
+        return item
 
     def _insertSnippet(self, body):
 
@@ -242,14 +252,17 @@ class PyzoSnippetManager(QtWidgets.QWidget):
         If item clicked in the workspace tree insert snippet
         """
         item = self._tree.currentItem()
-
-        try:
-            parent = item.parent()
-            parent_val = self._tree.indexFromItem(parent, 0).data()
-            code = self._snippet[parent_val][item.text(0)]["body"]
-            self._insertSnippet(code)
-        except:
-            pass
+        if item is None:
+            return
+        snippet = item.data(0, QtCore.Qt.UserRole)
+        if isinstance(snippet, Snippet):
+            body = snippet.body
+            if isinstance(body, tuple):
+                body = list(body)
+            try:
+                self._insertSnippet(body)
+            except:
+                pass
 
     # def onOptionsPress(self):
     #     """ Create the menu for the button, Do each time to make sure
@@ -279,33 +292,56 @@ class PyzoSnippetManager(QtWidgets.QWidget):
     #         self._config.showTypes.append(type)
 
     def onReloadPress(self):
-        self._tree.clear()
+        self._index.refresh()
+        self.fillTree()
+
+    def onSearchChanged(self, text):
+        """ onSearchChanged(text)
+        Show the snippets matching the search, or all of them when it
+        is cleared
+        """
         self.fillTree()
 
+    def onSearchReturn(self):
+        """ onSearchReturn()
+        Insert the best match of the search
+        """
+        item = self._tree.topLevelItem(0)
+        if self._search.text().strip() and item is not None:
+            self._tree.setCurrentItem(item)
+            self.onItemClicked()
+
     def onSortPress(self):
         """ Sort the tree alphabetically. """
 
-        self._tree.setSortingEnabled(True)
-
         if self._sort_order in [None, "DSC"]:
-            self._tree.sortItems(0, QtCore.Qt.AscendingOrder)
             self._sort_order = "ASC"
             self._sortbut.setText("A-z")
             self._sortbut.setArrowType(QtCore.Qt.DownArrow)
 
         elif self._sort_order == "ASC":
-            self._tree.sortItems(0, QtCore.Qt.DescendingOrder)
             self._sort_order = "DSC"
             self._sortbut.setText("Z-a")
             self._sortbut.setArrowType(QtCore.Qt.UpArrow)
 
+        # The matches of a search stay in the order of the best match
+        if not self._search.text().strip():
+            self._tree.setSortingEnabled(True)
+            if self._sort_order == "ASC":
+                self._tree.sortItems(0, QtCore.Qt.AscendingOrder)
+            else:
+                self._tree.sortItems(0, QtCore.Qt.DescendingOrder)
+
     def onOpenFile(self):
 
-        try:
-            item = self._tree.currentItem().text(0)
-        except:
+        item = self._tree.currentItem()
+        if item is None:
+            return
+        data = item.data(0, QtCore.Qt.UserRole)
+        if isinstance(data, Snippet):
+            data = data.fileName
+        if not data:
             return
 
-        fname = "{}.json".format(item.lower())
-        fpath = os.path.join(self.snippet_folder, fname)
+        fpath = os.path.join(self.snippet_folder, data)
         pyzo.editors.loadFile(fpath)
@@ -0,0 +1,286 @@
+""" The snippets of the snippet folder
+
+SnippetIndex reads the JSON snippet files of a folder once and keeps
+their snippets in memory with the modification time of the file, so a
+refresh only reads the files that changed. The prefixes of the snippets
+are kept in a trie, as are the words of their descriptions: the
+snippets whose prefix starts with a query are in the node of the query,
+found without looking at the other snippets.
+"""
+
+import collections
+import heapq
+import json
+import os
+import re
+
+# A snippet as read from a file. name is its key in the file, prefixes
+# a tuple, body a string or a tuple of lines and description the text
+# of its description field. fileName is the file in the snippet folder.
+Snippet = collections.namedtuple(
+    "Snippet",
+    ["category", "name", "prefixes", "body", "description", "fileName"],
+)
+
+# The words of a description
+WORD_RE = re.compile(r"\w+")
+
+
+def fileCategory(fileName):
+    """ fileCategory(fileName)
+    Get the category shown for the snippets of a file
+    """
+    return fileName.replace(".json", "").title()
+
+
+def readSnippets(path):
+    """ readSnippets(path)
+    Get the Snippet of each entry of a snippet file, none when the file
+    can not be read
+    """
+    fileName = os.path.basename(path)
+    category = fileCategory(fileName)
+    try:
+        with open(path, encoding="utf-8") as fd:
+            data = json.load(fd)
+    except (OSError, ValueError):
+        return []
+    if not isinstance(data, dict):
+        return []
+    snippets = []
+    for name, entry in data.items():
+        if not isinstance(entry, dict) or "body" not in entry:
+            continue
+        prefixes = entry.get("prefix", ())
+        if isinstance(prefixes, str):
+            prefixes = (prefixes,)
+        body = entry["body"]
+        if isinstance(body, list):
+            body = tuple(str(line) for line in body)
+        snippets.append(
+            Snippet(
+                category,
+                name,
+                tuple(str(prefix) for prefix in prefixes),
+                body,
+                str(entry.get("description", "")),
+                fileName,
+            )
+        )
+    return snippets
+
+
+class _TrieNode:
+    __slots__ = ("children", "values", "below")
+
+    def __init__(self):
+        self.children = {}
+        # The values kept under the key that ends here
+        self.values = set()
+        # value -> the number of its keys that go through here
+        self.below = {}
+
+
+class PrefixTrie:
+    """ Finds the values kept under the keys that start with a text """
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def add(self, key, value):
+        """ add(key, value)
+        Keep value under key
+        """
+        path = [self._root]
+        for char in key:
+            path.append(path[-1].children.setdefault(char, _TrieNode()))
+        if value in path[-1].values:
+            return
+        path[-1].values.add(value)
+        for node in path:
+            node.below[value] = node.below.get(value, 0) + 1
+
+    def remove(self, key, value):
+        """ remove(key, value)
+        Forget value under key
+        """
+        path = [self._root]
+        for char in key:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        if value not in path[-1].values:
+            return
+        path[-1].values.discard(value)
+        for node in path:
+            count = node.below.pop(value) - 1
+            if count:
+                node.below[value] = count
+        # Drop the nodes that hold nothing anymore
+        for i in range(len(key), 0, -1):
+            if path[i].below:
+                break
+            del path[i - 1].children[key[i - 1]]
+
+    def exact(self, key):
+        """ exact(key)
+        Get the values kept under key
+        """
+        node = self._find(key)
+        return node.values if node is not None else set()
+
+    def startingWith(self, text):
+        """ startingWith(text)
+        Get the values kept under the keys that start with text
+        """
+        node = self._find(text)
+        return node.below.keys() if node is not None else set()
+
+    def _find(self, key):
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                break
+        return node
+
+
+class SnippetIndex:
+    """ The snippets of the JSON files in a folder """
+
+    def __init__(self, folder):
+        self.folder = folder
+        # file name -> ((modification time, size), snippet ids)
+        self.files = {}
+        # snippet id -> Snippet, the tries keep the ids
+        self._snippets = {}
+        self._nextId = 0
+        self._prefixes = PrefixTrie()
+        self._words = PrefixTrie()
+
+    def refresh(self):
+        """ refresh()
+        Read the snippet files that changed since they were read and
+        forget the ones that are gone, get whether there were any
+        """
+        stamps = {}
+        try:
+            entries = list(os.scandir(self.folder))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    stamps[entry.name] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+
+        changed = False
+        for fileName in list(self.files):
+            if fileName not in stamps:
+                self._remove(fileName)
+                changed = True
+        for fileName, stamp in stamps.items():
+            if fileName in self.files:
+                if self.files[fileName][0] == stamp:
+                    continue
+                self._remove(fileName)
+            snippets = readSnippets(os.path.join(self.folder, fileName))
+            self._add(fileName, stamp, snippets)
+            changed = True
+        return changed
+
+    def snippets(self, fileName):
+        """ snippets(fileName)
+        Get the snippets of a file, in the order of the file
+        """
+        ids = self.files.get(fileName, (None, []))[1]
+        return [self._snippets[i] for i in ids]
+
+    def search(self, query, limit=100):
+        """ search(query, limit=100)
+        Get up to limit Snippet whose prefix starts with query or whose
+        description has a word starting with each word of query, best
+        matches first
+        """
+        words = query.lower().split()
+        if not words:
+            return []
+
+        # Prefixes that are query, then the ones that start with it
+        snippets = self._snippets
+        ranked = []
+        found = set()
+        if len(words) == 1:
+            query = words[0]
+            found.update(self._prefixes.startingWith(query))
+            exact = self._prefixes.exact(query)
+            ranked = heapq.nsmallest(
+                limit,
+                (
+                    (
+                        0 if i in exact else 1,
+                        self._prefixLength(snippets[i], query),
+                        snippets[i].name.lower(),
+                        i,
+                    )
+                    for i in found
+                ),
+            )
+
+        # Descriptions with a word starting with each word of query
+        if len(ranked) < limit:
+            sets = sorted(
+                (self._words.startingWith(word) for word in words), key=len
+            )
+            matches = set(sets[0])
+            for values in sets[1:]:
+                matches.intersection_update(values)
+            ranked += heapq.nsmallest(
+                limit - len(ranked),
+                (
+                    (2, len(snippets[i].name), snippets[i].name.lower(), i)
+                    for i in matches
+                    if i not in found
+                ),
+            )
+        return [snippets[item[-1]] for item in ranked]
+
+    def _prefixLength(self, snippet, query):
+        return min(
+            len(prefix)
+            for prefix in snippet.prefixes
+            if prefix.lower().startswith(query)
+        )
+
+    def _keys(self, snippet):
+        prefixes = {prefix.lower() for prefix in snippet.prefixes}
+        text = snippet.name + " " + snippet.description
+        return prefixes, set(WORD_RE.findall(text.lower()))
+
+    def _add(self, fileName, stamp, snippets):
+        ids = []
+        for snippet in snippets:
+            i = self._nextId
+            self._nextId += 1
+            self._snippets[i] = snippet
+            ids.append(i)
+            prefixes, words = self._keys(snippet)
+            for prefix in prefixes:
+                self._prefixes.add(prefix, i)
+            for word in words:
+                self._words.add(word, i)
+        self.files[fileName] = (stamp, ids)
+
+    def _remove(self, fileName):
+        stamp, ids = self.files.pop(fileName)
+        for i in ids:
+            prefixes, words = self._keys(self._snippets.pop(i))
+            for prefix in prefixes:
+                self._prefixes.remove(prefix, i)
+            for word in words:
+                self._words.remove(word, i)
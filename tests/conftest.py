@@ -0,0 +1,26 @@
+""" Lets the tests import the modules of the plugins that need neither
+pyzo nor Qt
+
+Pyzo imports a plugin as a package of pyzo.tools. Here every plugin
+folder is made a package of a "tools" package without running its
+__init__.py, so "from tools.pyzoLinter.cache import rating" works and
+the relative imports between the plugins resolve as they do in pyzo.
+"""
+
+import os
+import sys
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _package(name, path):
+    module = types.ModuleType(name)
+    module.__path__ = [path]
+    sys.modules[name] = module
+
+
+_package("tools", ROOT)
+for _name in os.listdir(ROOT):
+    if _name.startswith("pyzo") and os.path.isdir(os.path.join(ROOT, _name)):
+        _package("tools." + _name, os.path.join(ROOT, _name))
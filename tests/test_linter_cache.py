@@ -0,0 +1,77 @@
+""" Tests of the cache keys and the rating """
+
+import ast
+
+from tools.pyzoLinter.cache import RunKeys, rating
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_rating_like_pylint():
+    assert rating({"statements": 10, "E": 1, "W": 2}) == 3.0
+    assert rating({"statements": 10, "C": 1, "R": 1}) == 8.0
+
+
+def test_rating_bounds():
+    assert rating({}) == 10.0
+    assert rating({"statements": 0, "E": 3}) == 10.0
+    assert rating({"statements": 5, "F": 1}) == 0.0
+    assert rating({"statements": 1, "E": 10}) == 0.0
+
+
+def test_key_counts_statements(tmp_path):
+    a = write(tmp_path / "a.py", "x = 1\nif x:\n    y = 2\n")
+    keys = RunKeys("env", str(tmp_path))
+    keys.key(a)
+    assert keys.statements[a] == 3
+
+
+def test_key_covers_content_and_environment(tmp_path):
+    a = write(tmp_path / "a.py", "x = 1\n")
+    first = RunKeys("env", str(tmp_path)).key(a)
+    assert RunKeys("env", str(tmp_path)).key(a) == first
+    assert RunKeys("other", str(tmp_path)).key(a) != first
+    write(tmp_path / "a.py", "x = 2\n")
+    assert RunKeys("env", str(tmp_path)).key(a) != first
+
+
+def test_key_of_unsaved_text(tmp_path):
+    a = write(tmp_path / "a.py", "x = 1\n")
+    keys = RunKeys("env", str(tmp_path))
+    assert keys.key(a, "x = 1\n") == keys.key(a)
+    assert keys.key(a, "x = 2\n") != keys.key(a)
+
+
+def test_key_covers_imported_modules(tmp_path):
+    a = write(tmp_path / "a.py", "import b\n")
+    write(tmp_path / "b.py", "y = 1\n")
+    write(tmp_path / "c.py", "z = 1\n")
+    first = RunKeys("env", str(tmp_path)).key(a)
+    write(tmp_path / "c.py", "z = 2\n")
+    assert RunKeys("env", str(tmp_path)).key(a) == first
+    write(tmp_path / "b.py", "y = 2\n")
+    assert RunKeys("env", str(tmp_path)).key(a) != first
+
+
+def test_imports_of_a_package(tmp_path):
+    package = tmp_path / "pkg"
+    package.mkdir()
+    init = write(package / "__init__.py", "")
+    a = write(package / "a.py", "from . import b\nfrom .c import name\n")
+    b = write(package / "b.py", "")
+    c = write(package / "c.py", "name = 1\n")
+    write(tmp_path / "b.py", "")
+    keys = RunKeys("env", str(tmp_path))
+    with open(a, encoding="utf-8") as fd:
+        tree = ast.parse(fd.read())
+    assert keys.imports(a, tree) == sorted([init, b, c])
+
+
+def test_syntax_error_has_a_key(tmp_path):
+    a = write(tmp_path / "a.py", "def (:\n")
+    keys = RunKeys("env", str(tmp_path))
+    assert keys.key(a)
+    assert keys.statements[a] == 0
@@ -0,0 +1,65 @@
+""" Tests of the files pylint is told to ignore """
+
+import os
+
+from tools.pyzoLinter.discovery import ProjectFiles, PylintIgnore
+
+
+def write(path, text=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_defaults():
+    ignore = PylintIgnore()
+    assert ignore.ignored(os.path.join("pkg", "CVS"))
+    assert ignore.ignored(os.path.join("pkg", ".#a.py"))
+    assert not ignore.ignored(os.path.join("pkg", "a.py"))
+
+
+def test_ini_options(tmp_path):
+    rcfile = write(
+        tmp_path / "pylintrc",
+        "[MAIN]\n"
+        "ignore = gen, build\n"
+        "ignore-patterns = ^test_.*\\.py$\n"
+        "ignore-paths = ^src/pkg/a\\.py$,\n"
+        "    .*/vendor/.*\n",
+    )
+    ignore = PylintIgnore(rcfile, str(tmp_path))
+    assert ignore.ignored(str(tmp_path / "gen"))
+    assert ignore.ignored(str(tmp_path / "src" / "test_b.py"))
+    assert ignore.ignored(str(tmp_path / "src" / "pkg" / "a.py"))
+    assert ignore.ignored(str(tmp_path / "src" / "vendor" / "c.py"))
+    assert not ignore.ignored(str(tmp_path / "CVS"))
+    assert not ignore.ignored(str(tmp_path / "src" / "pkg" / "b.py"))
+
+
+def test_toml_options(tmp_path):
+    rcfile = write(
+        tmp_path / "pyproject.toml",
+        "[tool.pylint.main]\n"
+        'ignore = ["gen"]\n'
+        'ignore-paths = ["^docs/"]\n',
+    )
+    ignore = PylintIgnore(rcfile, str(tmp_path))
+    assert ignore.ignored(str(tmp_path / "gen"))
+    assert ignore.ignored(str(tmp_path / "docs" / "conf.py"))
+    assert not ignore.ignored(str(tmp_path / "src" / "docs.py"))
+
+
+def test_unreadable_options(tmp_path):
+    rcfile = write(tmp_path / "pylintrc", "[MAIN]\nignore-paths = [\n")
+    ignore = PylintIgnore(rcfile, str(tmp_path))
+    assert not ignore.ignored(str(tmp_path / "a.py"))
+    assert not PylintIgnore(str(tmp_path / "missing")).ignored("a.py")
+
+
+def test_project_files_skip_ignored(tmp_path):
+    root = tmp_path / "project"
+    write(root / "setup.cfg", "[MAIN]\nignore = gen\n")
+    write(root / "a.py")
+    write(root / "gen" / "b.py")
+    files = ProjectFiles(str(tmp_path / "listings")).files(str(root))
+    assert files == [str(root / "a.py")]
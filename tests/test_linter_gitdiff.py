@@ -0,0 +1,67 @@
+""" Tests of reading the changed lines of a git diff """
+
+import os
+
+from tools.pyzoLinter.gitdiff import IntervalIndex, parse_diff, unquote_path
+
+ROOT = os.path.abspath("project")
+
+
+def test_hunks_of_a_file():
+    diff = (
+        "diff --git a/pkg/a.py b/pkg/a.py\n"
+        "--- a/pkg/a.py\n"
+        "+++ b/pkg/a.py\n"
+        "@@ -3 +3 @@\n"
+        "-x = 1\n"
+        "+x = 2\n"
+        "@@ -10,0 +11,3 @@\n"
+        "+a\n+b\n+c\n"
+        "@@ -20,2 +23,0 @@\n"
+        "-gone\n-gone\n"
+    )
+    path = os.path.join(ROOT, "pkg", "a.py")
+    assert parse_diff(diff, ROOT) == {path: [(3, 3), (11, 13)]}
+
+
+def test_new_and_deleted_files():
+    diff = (
+        "--- /dev/null\n"
+        "+++ b/new.py\n"
+        "@@ -0,0 +1,2 @@\n"
+        "+a\n+b\n"
+        "--- a/old.py\n"
+        "+++ /dev/null\n"
+        "@@ -1,2 +0,0 @@\n"
+        "-a\n-b\n"
+    )
+    assert parse_diff(diff, ROOT) == {os.path.join(ROOT, "new.py"): [(1, 2)]}
+
+
+def test_quoted_names():
+    diff = (
+        '+++ "b/sp\\303\\244ce \\"q\\".py"\n'
+        "@@ -1 +1 @@\n"
+        "+++ b/with space.py\t\n"
+        "@@ -2 +2 @@\n"
+    )
+    assert parse_diff(diff, ROOT) == {
+        os.path.join(ROOT, 'späce "q".py'): [(1, 1)],
+        os.path.join(ROOT, "with space.py"): [(2, 2)],
+    }
+
+
+def test_unquote_path():
+    assert unquote_path("b/a.py") == "b/a.py"
+    assert unquote_path("b/a b.py\t") == "b/a b.py"
+    assert unquote_path('"b/tab\\there.py"') == "b/tab\there.py"
+    assert unquote_path('"b/back\\\\slash.py"') == "b/back\\slash.py"
+    assert unquote_path('"b/\\346\\227\\245.py"') == "b/日.py"
+
+
+def test_interval_index():
+    index = IntervalIndex([(10, 12), (1, 3), (4, 5), (20, 20)])
+    assert len(index) == 3
+    assert [line in index for line in [0, 1, 5, 6, 9, 12, 13, 20, 21]] == [
+        False, True, True, False, False, True, False, True, False,
+    ]
@@ -0,0 +1,81 @@
+""" Tests of decoding pylint's JSON output while it arrives """
+
+import json
+
+from tools.pyzoLinter.jsonstream import JsonStream, record_message
+
+RECORDS = [
+    {"path": "a.py", "line": 1, "column": -1, "message": "x"},
+    {"path": "b ä\U0001f600.py", "line": 20, "score": -1.5e-3},
+    {"path": "c.py", "line": None, "ok": True, "fail": False, "n": None},
+    {"path": "d.py", "message": 'escaped "quote" and {braces}'},
+    {"path": "e.py", "line": 0, "values": [0, 10, 1.25, 3e+2]},
+]
+
+
+def feed_cut(text, size):
+    """returns the records of text fed in chunks of size characters"""
+    stream = JsonStream()
+    records = []
+    for start in range(0, len(text), size):
+        records.extend(stream.feed(text[start:start + size]))
+    return records
+
+
+def test_json_lines():
+    text = "".join(json.dumps(record) + "\n" for record in RECORDS)
+    assert JsonStream().feed(text) == RECORDS
+
+
+def test_json_array():
+    text = json.dumps(RECORDS, indent=2)
+    assert JsonStream().feed(text) == RECORDS
+
+
+def test_every_cut():
+    # Escapes, numbers and literals may all be cut by a chunk
+    text = json.dumps(RECORDS, ensure_ascii=True)
+    for size in range(1, len(text) + 1):
+        assert feed_cut(text, size) == RECORDS, size
+
+
+def test_every_split_in_two():
+    text = "".join(json.dumps(record) + "\n" for record in RECORDS)
+    for i in range(len(text)):
+        stream = JsonStream()
+        assert stream.feed(text[:i]) + stream.feed(text[i:]) == RECORDS, i
+
+
+def test_other_text_is_skipped():
+    text = (
+        "Warning: something\n"
+        + json.dumps(RECORDS[0])
+        + "\n************* Module x\n{not json}\n[1, 2]\n"
+        + json.dumps(RECORDS[1])
+        + "\n"
+    )
+    assert JsonStream().feed(text) == RECORDS[:2]
+    assert feed_cut(text, 7) == RECORDS[:2]
+
+
+def test_flush_drops_the_rest():
+    stream = JsonStream()
+    assert stream.feed('{"path": "a.py", "li') == []
+    stream.flush()
+    assert stream.feed('{"path": "b.py"}') == [{"path": "b.py"}]
+
+
+def test_record_message():
+    record = {
+        "path": "a.py",
+        "line": 3,
+        "column": 4,
+        "message-id": "W0611",
+        "message": "Unused import os",
+        "symbol": "unused-import",
+    }
+    assert record_message(record) == (
+        "a.py",
+        [3, 4, "W0611", "Unused import os (unused-import)"],
+    )
+    assert record_message({"line": None}) == ("", [0, 0, "", ""])
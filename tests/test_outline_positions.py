@@ -0,0 +1,74 @@
+""" Tests of finding the outline object at a line """
+
+from types import SimpleNamespace
+
+from tools.pyzoOutline.positions import PositionIndex
+
+
+def obj(name, type, linenr, linenr2, *children):
+    return SimpleNamespace(
+        name=name,
+        type=type,
+        linenr=linenr,
+        linenr2=linenr2,
+        children=list(children),
+    )
+
+
+def found(index, line):
+    """returns the names of the path found at line, None if none is"""
+    path = index.find(line)
+    return None if path is None else [o.name for o in path]
+
+
+def test_nested_objects():
+    f = obj("f", "def", 2, 5)
+    g = obj("g", "def", 5, 9)
+    index = PositionIndex(
+        [obj("A", "class", 1, 10, f, g), obj("h", "def", 12, 14)]
+    )
+    assert found(index, 0) is None
+    assert found(index, 1) == ["A"]
+    assert found(index, 3) == ["A", "f"]
+    assert found(index, 5) == ["A", "g"]
+    assert found(index, 9) == ["A"]
+    assert found(index, 10) is None
+    assert found(index, 13) == ["h"]
+    assert found(index, 100) is None
+
+
+def test_later_sibling_wins():
+    # A cell holds the classes after it
+    index = PositionIndex(
+        [
+            obj("cell", "cell", 1, 20),
+            obj("B", "class", 3, 8),
+            obj("C", "class", 8, 12),
+        ]
+    )
+    assert [found(index, line) for line in [1, 3, 8, 12, 19, 20]] == [
+        ["cell"], ["B"], ["C"], ["cell"], ["cell"], None,
+    ]
+
+
+def test_siblings_out_of_order():
+    late = obj("late", "def", 10, 15)
+    early = obj("early", "def", 1, 5)
+    wide = obj("wide", "cell", 0, 30)
+    # wide comes last, it wins wherever it is
+    assert found(PositionIndex([late, early, wide]), 3) == ["wide"]
+    index = PositionIndex([wide, late, early])
+    assert [found(index, line) for line in [0, 3, 7, 12, 20]] == [
+        ["wide"], ["early"], ["wide"], ["late"], ["wide"],
+    ]
+
+
+def test_show_types():
+    f = obj("f", "def", 2, 5)
+    index = PositionIndex(
+        [obj("A", "class", 1, 10, f), obj("main", "nameismain", 12, 14)],
+        showTypes={"class"},
+    )
+    assert found(index, 3) == ["A"]
+    assert found(index, 13) == ["main"]
+    assert found(PositionIndex([], {"class"}), 1) is None
@@ -0,0 +1,69 @@
+""" Tests of finding the python files of a project """
+
+from tools.pyzoShared.discovery import GitIgnore, ProjectFiles, gitignored
+
+
+def write(path, text=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_gitignore_rules(tmp_path):
+    rules = GitIgnore(
+        str(tmp_path),
+        ["# comment\n", "\n", "*.gen.py\n", "/build/\n", "!keep.gen.py\n"],
+    )
+    assert rules.match(str(tmp_path / "pkg" / "a.gen.py"), False)
+    assert rules.match(str(tmp_path / "keep.gen.py"), False) is False
+    assert rules.match(str(tmp_path / "build"), True)
+    assert rules.match(str(tmp_path / "build"), False) is None
+    assert rules.match(str(tmp_path / "pkg" / "build"), True) is None
+
+
+def test_nested_gitignore_rules(tmp_path):
+    top = GitIgnore(str(tmp_path), ["data/\n"])
+    sub = GitIgnore(str(tmp_path / "pkg"), ["!data/\n", "**/tmp_*.py\n"])
+    data = str(tmp_path / "pkg" / "data")
+    assert gitignored([top], data, True)
+    assert not gitignored([top, sub], data, True)
+    temporary = str(tmp_path / "pkg" / "x" / "tmp_a.py")
+    assert gitignored([top, sub], temporary, False)
+
+
+def test_project_files(tmp_path):
+    root = tmp_path / "project"
+    write(root / ".gitignore", "ignored/\n*_pb2.py\n")
+    expected = [
+        write(root / "a.py"),
+        write(root / "pkg" / "__init__.py"),
+        write(root / "pkg" / "b.py"),
+    ]
+    write(root / "notes.txt")
+    write(root / "pkg" / "b_pb2.py")
+    write(root / "ignored" / "c.py")
+    write(root / ".hidden" / "d.py")
+    write(root / "__pycache__" / "e.py")
+    write(root / "node_modules" / "f.py")
+    write(root / "venv" / "pyvenv.cfg")
+    write(root / "venv" / "g.py")
+    listings = str(tmp_path / "listings")
+    assert ProjectFiles(listings).files(str(root)) == sorted(expected)
+
+    # A folder that changed is listed again
+    expected.append(write(root / "pkg" / "h.py"))
+    (root / "pkg" / "b.py").unlink()
+    expected.remove(str(root / "pkg" / "b.py"))
+    assert ProjectFiles(listings).files(str(root)) == sorted(expected)
+
+
+def test_project_files_ignore(tmp_path):
+    class Ignore:
+        def ignored(self, path):
+            return path.endswith("skip")
+
+    root = tmp_path / "project"
+    a = write(root / "a.py")
+    write(root / "skip" / "b.py")
+    files = ProjectFiles(str(tmp_path / "listings")).files(str(root), Ignore())
+    assert files == [a]
@@ -0,0 +1,51 @@
+""" Tests of the trie that finds snippets by prefix """
+
+from tools.pyzoSnippetManager.index import PrefixTrie
+
+
+def test_starting_with():
+    trie = PrefixTrie()
+    trie.add("for", 1)
+    trie.add("fori", 2)
+    trie.add("if", 3)
+    assert set(trie.startingWith("f")) == {1, 2}
+    assert set(trie.startingWith("for")) == {1, 2}
+    assert set(trie.startingWith("fori")) == {2}
+    assert set(trie.startingWith("")) == {1, 2, 3}
+    assert set(trie.startingWith("x")) == set()
+    assert trie.exact("for") == {1}
+    assert trie.exact("fo") == set()
+
+
+def test_value_under_several_keys():
+    trie = PrefixTrie()
+    trie.add("class", 1)
+    trie.add("cls", 1)
+    trie.add("cls", 1)
+    assert set(trie.startingWith("c")) == {1}
+    trie.remove("class", 1)
+    assert set(trie.startingWith("c")) == {1}
+    assert set(trie.startingWith("cla")) == set()
+    trie.remove("cls", 1)
+    assert set(trie.startingWith("")) == set()
+
+
+def test_remove_drops_empty_nodes():
+    trie = PrefixTrie()
+    trie.add("while", 1)
+    trie.add("with", 2)
+    trie.remove("while", 1)
+    assert set(trie.startingWith("w")) == {2}
+    assert "h" not in trie._find("w").children
+    trie.remove("with", 2)
+    assert trie._find("w") is None
+
+
+def test_remove_what_is_not_there():
+    trie = PrefixTrie()
+    trie.add("try", 1)
+    trie.remove("tr", 1)
+    trie.remove("try", 2)
+    trie.remove("nothing", 1)
+    assert trie.exact("try") == {1}
+    assert set(trie.startingWith("t")) == {1}